@@ -0,0 +1,143 @@
+"""
+성취(배지) 규칙 테이블과 증분 평가
+
+규칙은 지표(metric)별로 임계값 순으로 정렬해 두고, 이벤트가 바꾼 지표 값만 받아
+해당 지표의 규칙만 확인합니다. 해제된 성취는 user_achievements 테이블에 한 행씩 저장합니다.
+새 배지는 ACHIEVEMENTS에 한 줄 추가하면 됩니다.
+"""
+
+import json
+from bisect import bisect_right
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .models import UserAchievement, UserProgress
+
+# (성취 ID, 지표, 임계값)
+ACHIEVEMENTS = [
+    # AI 정보 학습 성취
+    ("first_learn", "total_learned", 1),
+    ("beginner", "total_learned", 3),
+    ("learner", "total_learned", 5),
+    ("first_10", "total_learned", 10),
+    ("knowledge_seeker", "total_learned", 20),
+    ("first_50", "total_learned", 50),
+    # 용어 학습 성취
+    ("first_term", "total_terms_learned", 1),
+    ("term_collector", "total_terms_learned", 5),
+    ("term_master", "total_terms_learned", 10),
+    # 연속 학습 성취
+    ("three_day_streak", "streak_days", 3),
+    ("week_streak", "streak_days", 7),
+    ("two_week_streak", "streak_days", 14),
+    # 퀴즈 성취
+    ("quiz_beginner", "quiz_score", 60),
+    ("quiz_master", "quiz_score", 80),
+    ("perfect_quiz", "quiz_score", 100),
+]
+
+
+def _build_registry():
+    registry: Dict[str, tuple] = {}
+    for metric in dict.fromkeys(metric for _, metric, _ in ACHIEVEMENTS):
+        rules = sorted((threshold, achievement_id) for achievement_id, m, threshold in ACHIEVEMENTS if m == metric)
+        registry[metric] = ([threshold for threshold, _ in rules], [achievement_id for _, achievement_id in rules])
+    return registry
+
+
+# metric -> (정렬된 임계값 목록, 같은 순서의 성취 ID 목록)
+ACHIEVEMENT_REGISTRY = _build_registry()
+
+_INSERT_SQL = text("""
+    INSERT INTO user_achievements (session_id, achievement_id, metric, notified, unlocked_at)
+    VALUES (:session_id, :achievement_id, :metric, :notified, CURRENT_TIMESTAMP)
+    ON CONFLICT (session_id, achievement_id) DO NOTHING
+    RETURNING achievement_id
+""")
+
+
+def evaluate_achievements(db: Session, session_id: str, metrics: Dict[str, int], notified: bool = False) -> List[str]:
+    """이벤트로 바뀐 지표 값(metrics)에 해당하는 규칙만 확인해 새로 달성한 성취를 저장합니다. (커밋하지 않음)
+
+    notified=False로 저장된 성취는 다음 check 요청에서 new_achievements로 한 번 전달됩니다.
+    """
+    candidates = []
+    for metric, value in metrics.items():
+        if metric not in ACHIEVEMENT_REGISTRY or value is None:
+            continue
+        thresholds, achievement_ids = ACHIEVEMENT_REGISTRY[metric]
+        reached = bisect_right(thresholds, value)
+        candidates.extend((achievement_id, metric) for achievement_id in achievement_ids[:reached])
+    if not candidates:
+        return []
+
+    unlocked = {row.achievement_id for row in db.query(UserAchievement.achievement_id).filter(
+        UserAchievement.session_id == session_id,
+        UserAchievement.achievement_id.in_([achievement_id for achievement_id, _ in candidates])
+    )}
+
+    new_achievements = []
+    for achievement_id, metric in candidates:
+        if achievement_id in unlocked:
+            continue
+        if db.bind.dialect.name in ("postgresql", "sqlite"):
+            inserted = db.execute(_INSERT_SQL, {
+                "session_id": session_id, "achievement_id": achievement_id, "metric": metric, "notified": notified
+            }).scalar()
+            if inserted:
+                new_achievements.append(achievement_id)
+        else:
+            db.add(UserAchievement(session_id=session_id, achievement_id=achievement_id, metric=metric, notified=notified))
+            new_achievements.append(achievement_id)
+    db.flush()
+    return new_achievements
+
+
+def get_unlocked_achievements(db: Session, session_id: str) -> List[str]:
+    rows = db.query(UserAchievement.achievement_id).filter(
+        UserAchievement.session_id == session_id
+    ).order_by(UserAchievement.id).all()
+    return [row.achievement_id for row in rows]
+
+
+def pop_unnotified_achievements(db: Session, session_id: str) -> List[str]:
+    """아직 사용자에게 알리지 않은 성취를 반환하고 알림 처리합니다. (커밋하지 않음)"""
+    rows = db.query(UserAchievement).filter(
+        UserAchievement.session_id == session_id,
+        UserAchievement.notified.is_(False)
+    ).order_by(UserAchievement.id).all()
+    for row in rows:
+        row.notified = True
+    return [row.achievement_id for row in rows]
+
+
+def migrate_legacy_achievements(engine) -> int:
+    """'__stats__' 행 JSON에 저장되어 있던 achievements 목록을 user_achievements로 옮깁니다."""
+    registry_metrics = {achievement_id: metric for achievement_id, metric, _ in ACHIEVEMENTS}
+    progress = UserProgress.__table__
+    achievements = UserAchievement.__table__
+    migrated = 0
+    with engine.begin() as conn:
+        existing = {(row.session_id, row.achievement_id) for row in conn.execute(
+            achievements.select().with_only_columns(achievements.c.session_id, achievements.c.achievement_id)
+        )}
+        rows = conn.execute(progress.select().where(progress.c.date == "__stats__", progress.c.stats.isnot(None))).all()
+        for row in rows:
+            try:
+                legacy = json.loads(row.stats).get("achievements", [])
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            for achievement_id in legacy:
+                if (row.session_id, achievement_id) in existing:
+                    continue
+                conn.execute(achievements.insert().values(
+                    session_id=row.session_id,
+                    achievement_id=achievement_id,
+                    metric=registry_metrics.get(achievement_id, "legacy"),
+                    notified=True
+                ))
+                existing.add((row.session_id, achievement_id))
+                migrated += 1
+    return migrated
@@ -0,0 +1,164 @@
+"""
+세션별 학습 달력 (연 단위 비트 배열)
+
+1년을 46바이트(366비트)로 표현하며 1월 1일이 0번 비트입니다.
+비트 번호는 PostgreSQL set_bit()과 같이 바이트 안에서 하위 비트부터 셉니다.
+AI 정보/용어 학습 기록을 쓸 때 해당 날짜의 비트를 켜 두므로
+연간 히트맵은 행 하나만 읽으면 됩니다.
+"""
+
+import base64
+import json
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from .models import ActivityCalendar, UserProgress
+
+BYTES_PER_YEAR = 46
+
+CALENDAR_ENCODINGS = ("base64", "rle")
+
+_TERMS_PREFIX = "__terms__"
+
+
+def parse_activity_date(date_key: str) -> Optional[date]:
+    """user_progress.date 값('YYYY-MM-DD' 또는 '__terms__YYYY-MM-DD_n')에서 학습 날짜를 꺼냅니다."""
+    if date_key.startswith(_TERMS_PREFIX):
+        date_key = date_key[len(_TERMS_PREFIX):len(_TERMS_PREFIX) + 10]
+    try:
+        return date.fromisoformat(date_key)
+    except (TypeError, ValueError):
+        return None
+
+
+def day_of_year_bit(day: date) -> int:
+    return day.timetuple().tm_yday - 1
+
+
+def days_in_year(year: int) -> int:
+    return date(year, 12, 31).timetuple().tm_yday
+
+
+def set_bits(bits: bytearray, positions: Iterable[int]) -> bytearray:
+    for position in positions:
+        bits[position // 8] |= 1 << (position % 8)
+    return bits
+
+
+def iter_bits(bits: bytes, length: int) -> Iterable[bool]:
+    for position in range(length):
+        yield bool(bits[position // 8] >> (position % 8) & 1)
+
+
+def _group_by_year(days: Iterable[date]) -> Dict[int, List[int]]:
+    grouped: Dict[int, List[int]] = {}
+    for day in days:
+        grouped.setdefault(day.year, []).append(day_of_year_bit(day))
+    return grouped
+
+
+def mark_active_dates(db: Session, session_id: str, date_keys: Iterable[str]):
+    """학습 기록을 쓴 날짜들의 비트를 켭니다. (커밋하지 않음)"""
+    days = {day for day in map(parse_activity_date, date_keys) if day is not None}
+    for year, positions in _group_by_year(days).items():
+        positions = sorted(set(positions))
+        if db.bind.dialect.name == "postgresql":
+            # 행 잠금 아래에서 기존 값에 set_bit를 적용하므로 동시 쓰기에도 비트가 유실되지 않음
+            update_expr = "activity_calendars.bits"
+            params = {"session_id": session_id, "year": year,
+                      "bits": bytes(set_bits(bytearray(BYTES_PER_YEAR), positions))}
+            for n, position in enumerate(positions):
+                update_expr = f"set_bit({update_expr}, :bit_{n}, 1)"
+                params[f"bit_{n}"] = position
+            db.execute(text(f"""
+                INSERT INTO activity_calendars (session_id, year, bits, updated_at)
+                VALUES (:session_id, :year, :bits, now())
+                ON CONFLICT (session_id, year) DO UPDATE SET bits = {update_expr}, updated_at = now()
+            """), params)
+            continue
+
+        calendar = db.query(ActivityCalendar).filter(
+            ActivityCalendar.session_id == session_id,
+            ActivityCalendar.year == year
+        ).with_for_update().first()
+        if calendar:
+            calendar.bits = bytes(set_bits(bytearray(calendar.bits), positions))
+        else:
+            db.add(ActivityCalendar(session_id=session_id, year=year,
+                                    bits=bytes(set_bits(bytearray(BYTES_PER_YEAR), positions))))
+    db.flush()
+
+
+def get_year_bits(db: Session, session_id: str, year: int) -> bytes:
+    bits = db.query(ActivityCalendar.bits).filter(
+        ActivityCalendar.session_id == session_id,
+        ActivityCalendar.year == year
+    ).scalar()
+    return bytes(bits) if bits else bytes(BYTES_PER_YEAR)
+
+
+def encode_rle(bits: bytes, length: int) -> List[int]:
+    """비활성 구간부터 시작하는 교대 구간 길이 목록. 예: [3, 2, 360] = 1~3일 쉼, 4~5일 학습, 나머지 쉼"""
+    runs = [0]
+    current = False
+    for active in iter_bits(bits, length):
+        if active != current:
+            runs.append(0)
+            current = active
+        runs[-1] += 1
+    return runs
+
+
+def encode_calendar(bits: bytes, year: int, encoding: str = "base64") -> dict:
+    length = days_in_year(year)
+    result = {
+        "year": year,
+        "days_in_year": length,
+        "active_days": sum(iter_bits(bits, length)),
+        "encoding": encoding,
+    }
+    if encoding == "rle":
+        result["data"] = encode_rle(bits, length)
+    else:
+        result["data"] = base64.b64encode(bits).decode("ascii")
+    return result
+
+
+def backfill_activity_calendars(engine) -> int:
+    """기존 user_progress 기록으로 달력을 채웁니다. 이미 켜진 비트는 유지하므로 여러 번 실행해도 됩니다."""
+    progress = UserProgress.__table__
+    calendars = ActivityCalendar.__table__
+    grouped: Dict[tuple, set] = {}
+    with engine.begin() as conn:
+        rows = conn.execute(select(progress.c.session_id, progress.c.date, progress.c.learned_info).where(
+            progress.c.learned_info.isnot(None),
+            progress.c.learned_info.notin_(("", "[]"))
+        ))
+        for row in rows:
+            day = parse_activity_date(row.date)
+            if day is None:
+                continue
+            try:
+                if not json.loads(row.learned_info):
+                    continue
+            except json.JSONDecodeError:
+                continue
+            grouped.setdefault((row.session_id, day.year), set()).add(day_of_year_bit(day))
+
+        for (session_id, year), positions in grouped.items():
+            existing = conn.execute(calendars.select().where(
+                calendars.c.session_id == session_id,
+                calendars.c.year == year
+            )).first()
+            if existing:
+                conn.execute(calendars.update().where(calendars.c.id == existing.id).values(
+                    bits=bytes(set_bits(bytearray(existing.bits), positions))
+                ))
+            else:
+                conn.execute(calendars.insert().values(
+                    session_id=session_id, year=year, bits=bytes(set_bits(bytearray(BYTES_PER_YEAR), positions))
+                ))
+    return len(grouped)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Response, Request
 from sqlalchemy.orm import Session
 from typing import List
 import json
@@ -7,6 +7,10 @@ import re
 from ..database import get_db
 from ..models import AIInfo
 from ..schemas import AIInfoCreate, AIInfoResponse, AIInfoItem, TermItem
+from ..search import invalidate_search_index
+from ..serialization import FastJSONResponse
+from ..http_cache import bump_content_version, conditional_response
+from ..rate_limit import rate_limit, single_flight
 
 router = APIRouter()
 
@@ -18,12 +22,12 @@ def normalize_text(text):
     text = re.sub(r'\s+', '', text)
     return text
 
-@router.get("/{date}", response_model=List[AIInfoItem])
-def get_ai_info_by_date(date: str, db: Session = Depends(get_db)):
-    try:
+@router.get("/{date}", response_model=List[AIInfoItem], response_class=FastJSONResponse)
+def get_ai_info_by_date(date: str, request: Request, db: Session = Depends(get_db)):
+    def build():
         ai_info = db.query(AIInfo).filter(AIInfo.date == date).first()
         if not ai_info:
-            return []
+            return FastJSONResponse([])
         
         infos = []
         if ai_info.info1_title and ai_info.info1_content:
@@ -57,7 +61,10 @@ def get_ai_info_by_date(date: str, db: Session = Depends(get_db)):
                 "terms": terms3
             })
         
-        return infos
+        return FastJSONResponse(infos)
+    
+    try:
+        return conditional_response(request, "ai_info_by_date", build)
     except Exception as e:
         print(f"Error in get_ai_info_by_date: {e}")
         return []
@@ -122,8 +129,10 @@ def add_ai_info(ai_info_data: AIInfoCreate, db: Session = Depends(get_db)):
                         setattr(existing_info, title_field, info.title)
                         setattr(existing_info, content_field, info.content)
                         setattr(existing_info, terms_field, json.dumps(terms_to_dict(info.terms or [])))
+            bump_content_version(db, "ai_info")
             db.commit()
             db.refresh(existing_info)
+            invalidate_search_index()
             return {
                 "id": existing_info.id,
                 "date": existing_info.date,
@@ -145,8 +154,10 @@ def add_ai_info(ai_info_data: AIInfoCreate, db: Session = Depends(get_db)):
                 info3_terms=json.dumps(terms_to_dict(ai_info_data.infos[2].terms or [])) if len(ai_info_data.infos) >= 3 else "[]"
             )
             db.add(db_ai_info)
+            bump_content_version(db, "ai_info")
             db.commit()
             db.refresh(db_ai_info)
+            invalidate_search_index()
             return {
                 "id": db_ai_info.id,
                 "date": db_ai_info.date,
@@ -164,15 +175,20 @@ def delete_ai_info(date: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="AI info not found")
     
     db.delete(ai_info)
+    bump_content_version(db, "ai_info")
     db.commit()
+    invalidate_search_index()
     return {"message": "AI info deleted successfully"}
 
-@router.get("/dates/all")
-def get_all_ai_info_dates(db: Session = Depends(get_db)):
-    dates = [row.date for row in db.query(AIInfo).order_by(AIInfo.date).all()]
-    return dates
+@router.get("/dates/all", response_class=FastJSONResponse)
+def get_all_ai_info_dates(request: Request, db: Session = Depends(get_db)):
+    def build():
+        dates = [date for date, in db.query(AIInfo.date).order_by(AIInfo.date).all()]
+        return FastJSONResponse(dates)
+    return conditional_response(request, "ai_info_dates", build)
 
-@router.get("/terms-quiz/{session_id}")
+@router.get("/terms-quiz/{session_id}", dependencies=[Depends(rate_limit("terms_quiz"))])
+@single_flight("terms_quiz", "session_id")
 def get_terms_quiz(session_id: str, db: Session = Depends(get_db)):
     """사용자가 학습한 날짜의 모든 용어로 퀴즈를 생성합니다."""
     try:
@@ -340,148 +356,124 @@ def get_terms_quiz_by_date(date: str, db: Session = Depends(get_db)):
         print(f"Error in get_terms_quiz_by_date: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate terms quiz: {str(e)}")
 
-@router.get("/learned-terms/{session_id}")
+@router.get("/learned-terms/{session_id}", response_class=FastJSONResponse)
 def get_learned_terms(session_id: str, db: Session = Depends(get_db)):
     """사용자가 학습한 모든 용어를 가져옵니다."""
     try:
         from ..models import UserProgress
         
         # 사용자의 학습 진행상황 가져오기
-        user_progress = db.query(UserProgress).filter(
+        user_progress = db.query(UserProgress.date, UserProgress.learned_info).filter(
             UserProgress.session_id == session_id,
             UserProgress.date != '__stats__'
         ).all()
         
         if not user_progress:
-            return {"terms": [], "message": "학습한 내용이 없습니다."}
+            return FastJSONResponse({"terms": [], "message": "학습한 내용이 없습니다."})
+        
+        # 학습 기록을 (날짜, info 인덱스 목록 또는 용어 목록)으로 정리
+        # - AI 정보 전체 학습: date = YYYY-MM-DD, learned_info = [info 인덱스...]
+        # - 개별 용어 학습: date = __terms__{date}_{info_index}, learned_info = [용어...]
+        info_records = []
+        term_records = []
+        for progress in user_progress:
+            if not progress.learned_info:
+                continue
+            try:
+                learned = json.loads(progress.learned_info)
+            except json.JSONDecodeError:
+                continue
+            if not progress.date.startswith('__terms__'):
+                info_records.append((progress.date, learned))
+                continue
+            # 예: __terms__2024-01-15_0 -> date: 2024-01-15, info_index: 0
+            date_part = progress.date.replace('__terms__', '')
+            if '_' not in date_part:
+                continue
+            date_str, info_str = date_part.rsplit('_', 1)
+            try:
+                term_records.append((date_str, int(info_str), learned))
+            except ValueError as e:
+                print(f"Error parsing date from {progress.date}: {e}")
+        
+        # 필요한 날짜의 AI 정보 용어 컬럼만 한 번에 조회하고, 용어 JSON은 (날짜, 인덱스)별로 한 번만 파싱
+        dates = {date for date, _ in info_records} | {date for date, _, _ in term_records}
+        info_terms_by_date = {}
+        if dates:
+            rows = db.query(AIInfo.date, AIInfo.info1_terms, AIInfo.info2_terms, AIInfo.info3_terms).filter(
+                AIInfo.date.in_(dates)
+            ).all()
+            for row in rows:
+                parsed = []
+                for raw in (row.info1_terms, row.info2_terms, row.info3_terms):
+                    try:
+                        parsed.append(json.loads(raw) if raw else [])
+                    except json.JSONDecodeError:
+                        parsed.append([])
+                info_terms_by_date[row.date] = parsed
+        
+        def info_terms(date, info_index):
+            parsed = info_terms_by_date.get(date)
+            if parsed is None or not isinstance(info_index, int) or not 0 <= info_index < len(parsed):
+                return []
+            return parsed[info_index]
         
         # 학습한 날짜들의 모든 용어 수집
         all_terms = []
-        learned_dates = []
-        
-        for progress in user_progress:
-            if progress.learned_info:
-                try:
-                    # AI 정보 전체 학습 기록 처리
-                    if not progress.date.startswith('__terms__'):
-                        learned_indices = json.loads(progress.learned_info)
-                        ai_info = db.query(AIInfo).filter(AIInfo.date == progress.date).first()
-                        if ai_info:
-                            learned_dates.append(progress.date)
-                            # 각 학습한 info의 용어들 가져오기
-                            for info_idx in learned_indices:
-                                if info_idx == 0 and ai_info.info1_terms:
-                                    try:
-                                        terms = json.loads(ai_info.info1_terms)
-                                        for term in terms:
-                                            term['learned_date'] = progress.date
-                                            term['info_index'] = info_idx
-                                        all_terms.extend(terms)
-                                    except json.JSONDecodeError:
-                                        pass
-                                elif info_idx == 1 and ai_info.info2_terms:
-                                    try:
-                                        terms = json.loads(ai_info.info2_terms)
-                                        for term in terms:
-                                            term['learned_date'] = progress.date
-                                            term['info_index'] = info_idx
-                                        all_terms.extend(terms)
-                                    except json.JSONDecodeError:
-                                        pass
-                                elif info_idx == 2 and ai_info.info3_terms:
-                                    try:
-                                        terms = json.loads(ai_info.info3_terms)
-                                        for term in terms:
-                                            term['learned_date'] = progress.date
-                                            term['info_index'] = info_idx
-                                        all_terms.extend(terms)
-                                    except json.JSONDecodeError:
-                                        pass
-                    
-                    # 개별 용어 학습 기록 처리
-                    elif progress.date.startswith('__terms__'):
-                        # __terms__{date}_{info_index} 형식에서 날짜와 info_index 추출
-                        # 예: __terms__2024-01-15_0 -> date: 2024-01-15, info_index: 0
-                        date_part = progress.date.replace('__terms__', '')
-                        if '_' in date_part:
-                            date_str, info_str = date_part.rsplit('_', 1)
-                            try:
-                                info_index = int(info_str)
-                                date_part = date_str
-                                
-                                ai_info = db.query(AIInfo).filter(AIInfo.date == date_part).first()
-                                if ai_info:
-                                    if date_part not in learned_dates:
-                                        learned_dates.append(date_part)
-                                    learned_terms = json.loads(progress.learned_info) if progress.learned_info else []
-                                    
-                                    # 해당 info의 모든 용어에서 학습한 용어만 필터링
-                                    info_terms = []
-                                    if info_index == 0 and ai_info.info1_terms:
-                                        try:
-                                            info_terms = json.loads(ai_info.info1_terms)
-                                        except json.JSONDecodeError:
-                                            pass
-                                    elif info_index == 1 and ai_info.info2_terms:
-                                        try:
-                                            info_terms = json.loads(ai_info.info2_terms)
-                                        except json.JSONDecodeError:
-                                            pass
-                                    elif info_index == 2 and ai_info.info3_terms:
-                                        try:
-                                            info_terms = json.loads(ai_info.info3_terms)
-                                        except json.JSONDecodeError:
-                                            pass
-                                    
-                                    # 학습한 용어만 필터링
-                                    for term in info_terms:
-                                        if term.get('term') in learned_terms:
-                                            term['learned_date'] = date_part
-                                            term['info_index'] = info_index
-                                            all_terms.append(term)
-                            except (ValueError, IndexError) as e:
-                                print(f"Error parsing date from {progress.date}: {e}")
-                                continue
-                except json.JSONDecodeError:
-                    continue
+        learned_dates = set()
+        
+        for date, learned_indices in info_records:
+            if date not in info_terms_by_date:
+                continue
+            learned_dates.add(date)
+            # 각 학습한 info의 용어들 가져오기
+            for info_idx in learned_indices:
+                for term in info_terms(date, info_idx):
+                    all_terms.append({**term, 'learned_date': date, 'info_index': info_idx})
+        
+        for date, info_index, learned_terms in term_records:
+            if date not in info_terms_by_date:
+                continue
+            learned_dates.add(date)
+            # 해당 info의 모든 용어에서 학습한 용어만 필터링
+            learned_set = {term for term in learned_terms if isinstance(term, str)}
+            for term in info_terms(date, info_index):
+                if term.get('term') in learned_set:
+                    all_terms.append({**term, 'learned_date': date, 'info_index': info_index})
         
         print(f"Debug - Total terms found: {len(all_terms)}")
-        print(f"Debug - Learned dates: {learned_dates}")
+        print(f"Debug - Learned dates: {len(learned_dates)}")
         
         if not all_terms:
-            return {"terms": [], "message": "학습한 용어가 없습니다."}
+            return FastJSONResponse({"terms": [], "message": "학습한 용어가 없습니다."})
         
         # 중복 제거 (같은 용어라도 다른 날짜에 학습했다면 모두 포함)
         unique_terms = []
         seen_terms = set()
         
         for term in all_terms:
-            term_key = f"{term.get('term')}_{term.get('learned_date')}_{term.get('info_index')}"
+            term_key = (term.get('term'), term.get('learned_date'), term.get('info_index'))
             if term_key not in seen_terms:
                 unique_terms.append(term)
                 seen_terms.add(term_key)
         
-        # 날짜별로 그룹화 (중복 제거)
+        # 날짜별로 그룹화 (같은 날짜의 같은 용어는 한 번만)
         terms_by_date = {}
+        seen_by_date = set()
         for term in unique_terms:
             date = term.get('learned_date', '')
-            if date not in terms_by_date:
-                terms_by_date[date] = []
-            # 같은 날짜에 같은 용어가 이미 있는지 확인
-            existing_term = next((t for t in terms_by_date[date] if t.get('term') == term.get('term')), None)
-            if not existing_term:
+            terms_by_date.setdefault(date, [])
+            date_key = (date, term.get('term'))
+            if date_key not in seen_by_date:
+                seen_by_date.add(date_key)
                 terms_by_date[date].append(term)
         
-        # learned_dates 중복 제거 및 정렬
-        learned_dates = list(set(learned_dates))
-        learned_dates.sort(reverse=True)  # 최신 날짜부터
-        
-        return {
+        return FastJSONResponse({
             "terms": unique_terms,
             "terms_by_date": terms_by_date,
             "total_terms": len(unique_terms),
-            "learned_dates": learned_dates
-        }
+            "learned_dates": sorted(learned_dates, reverse=True)  # 최신 날짜부터
+        })
         
     except Exception as e:
         print(f"Error in get_learned_terms: {e}")
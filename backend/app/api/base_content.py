@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Response, Query, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import logging
 import traceback
 
 from ..database import get_db
 from ..models import BaseContent
-from ..schemas import BaseContentCreate, BaseContentResponse
+from ..schemas import BaseContentCreate, BaseContentResponse, BaseContentPage
+from ..search import invalidate_search_index
+from ..serialization import FastJSONResponse, rows_to_dicts, schema_columns
+from ..http_cache import bump_content_version, conditional_response
 
 router = APIRouter()
 
@@ -14,54 +17,55 @@ router = APIRouter()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=List[BaseContentResponse])
-def get_all_base_contents(db: Session = Depends(get_db)):
+@router.get("/", response_model=List[BaseContentResponse], response_class=FastJSONResponse)
+def get_all_base_contents(request: Request, db: Session = Depends(get_db)):
+    def build():
+        rows = db.query(*schema_columns(BaseContent, BaseContentResponse)).order_by(BaseContent.created_at.desc()).all()
+        logger.info(f"Found {len(rows)} base contents")
+        return FastJSONResponse(rows_to_dicts(rows))
+    
     try:
-        logger.info("Getting all base contents...")
-        contents = db.query(BaseContent).order_by(BaseContent.created_at.desc()).all()
-        logger.info(f"Found {len(contents)} base contents")
-        
-        # 각 항목의 데이터 타입 확인
-        for i, content in enumerate(contents):
-            logger.info(f"Content {i+1}: id={content.id}, title={content.title}, created_at={content.created_at} (type: {type(content.created_at)})")
-        
-        # 응답 직렬화 테스트
-        try:
-            response_data = []
-            for content in contents:
-                # created_at이 None인 경우 현재 시간으로 설정
-                created_at = content.created_at
-                if created_at is None:
-                    from datetime import datetime
-                    created_at = datetime.now()
-                    logger.warning(f"Content {content.id} has None created_at, using current time")
-                
-                content_dict = {
-                    "id": content.id,
-                    "title": content.title,
-                    "content": content.content,
-                    "category": content.category,
-                    "created_at": created_at
-                }
-                response_data.append(content_dict)
-                logger.info(f"Serialized content {content.id} successfully")
-            
-            logger.info("All contents serialized successfully")
-            return contents
-        except Exception as serialize_error:
-            logger.error(f"Serialization error: {serialize_error}")
-            logger.error(f"Serialization traceback: {traceback.format_exc()}")
-            raise HTTPException(status_code=500, detail=f"Serialization error: {str(serialize_error)}")
-            
+        return conditional_response(request, "base_content_all", build)
     except Exception as e:
         logger.error(f"Error getting base contents: {e}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Failed to get base contents: {str(e)}")
 
+@router.get("/list", response_model=BaseContentPage)
+def list_base_contents(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """기본 컨텐츠 목록을 키셋 페이지네이션으로 조회합니다 (content 제외)."""
+    try:
+        query = db.query(BaseContent.id, BaseContent.title, BaseContent.category, BaseContent.created_at)
+        if category:
+            query = query.filter(BaseContent.category == category)
+        if cursor is not None:
+            query = query.filter(BaseContent.id < cursor)
+        rows = query.order_by(BaseContent.id.desc()).limit(limit + 1).all()
+
+        items = [dict(row._mapping) for row in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+    except Exception as e:
+        logger.error(f"Error listing base contents: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to list base contents: {str(e)}")
+
 @router.options("/")
 def options_base_content():
     return Response(status_code=200)
 
+@router.get("/{content_id}", response_model=BaseContentResponse)
+def get_base_content(content_id: int, db: Session = Depends(get_db)):
+    """기본 컨텐츠 상세(전체 content)를 조회합니다."""
+    content = db.query(BaseContent).filter(BaseContent.id == content_id).first()
+    if not content:
+        raise HTTPException(status_code=404, detail="Base content not found")
+    return content
+
 @router.post("/", response_model=BaseContentResponse)
 def add_base_content(content_data: BaseContentCreate, db: Session = Depends(get_db)):
     try:
@@ -86,8 +90,10 @@ def add_base_content(content_data: BaseContentCreate, db: Session = Depends(get_
             created_at=datetime.now()
         )
         db.add(db_content)
+        bump_content_version(db, "base_content")
         db.commit()
         db.refresh(db_content)
+        invalidate_search_index()
         logger.info(f"Base content added successfully: {db_content.id}")
         return db_content
     except HTTPException:
@@ -109,9 +115,11 @@ def update_base_content(content_id: int, content_data: BaseContentCreate, db: Se
         content.title = content_data.title
         content.content = content_data.content
         content.category = content_data.category
+        bump_content_version(db, "base_content")
         
         db.commit()
         db.refresh(content)
+        invalidate_search_index()
         logger.info(f"Base content updated successfully: {content_id}")
         return content
     except HTTPException:
@@ -130,7 +138,9 @@ def delete_base_content(content_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Base content not found")
         
         db.delete(content)
+        bump_content_version(db, "base_content")
         db.commit()
+        invalidate_search_index()
         logger.info(f"Base content deleted successfully: {content_id}")
         return {"message": "Base content deleted successfully"}
     except HTTPException:
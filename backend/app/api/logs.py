@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 import json
+import time
 
 from ..database import get_db
 from ..models import ActivityLog, User
 from ..auth import get_current_active_user
+from ..rollups import get_rollups, get_rollup_totals, invalidate_rollups, track_active_session
+from ..serialization import FastJSONResponse
+from ..table_stats import table_row_counts, truncate_tables
+from ..rate_limit import rate_limit, single_flight
+from ..backup import reset_backup_chains
 
 router = APIRouter()
 
@@ -38,6 +44,7 @@ def create_log(
         db.add(activity_log)
         db.commit()
         db.refresh(activity_log)
+        track_active_session(activity_log.session_id)
         
         return {"message": "Log created successfully", "log_id": activity_log.id}
     
@@ -45,7 +52,7 @@ def create_log(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create log: {str(e)}")
 
-@router.get("/")
+@router.get("/", response_class=FastJSONResponse)
 def get_logs(
     skip: int = 0,
     limit: int = 100,
@@ -119,16 +126,25 @@ def get_logs(
         except ValueError:
             pass
     
-    # 정렬 및 페이징
-    logs = query.order_by(ActivityLog.created_at.desc()).offset(skip).limit(limit).all()
+    # 정렬 및 페이징 (필요한 컬럼만 조회해 바로 dict로 변환)
+    rows = query.with_entities(
+        ActivityLog.id,
+        ActivityLog.created_at,
+        ActivityLog.log_type,
+        ActivityLog.log_level,
+        ActivityLog.username,
+        ActivityLog.action,
+        ActivityLog.details,
+        ActivityLog.ip_address,
+        ActivityLog.user_agent
+    ).order_by(ActivityLog.created_at.desc()).offset(skip).limit(limit).all()
     total_count = query.count()
     
     # 응답 데이터 구성
-    logs_data = []
-    for log in logs:
-        logs_data.append({
+    logs_data = [
+        {
             "id": str(log.id),
-            "timestamp": log.created_at.isoformat(),
+            "timestamp": log.created_at,
             "type": log.log_type,
             "level": log.log_level,
             "user": log.username,
@@ -136,16 +152,18 @@ def get_logs(
             "details": log.details,
             "ip": log.ip_address,
             "user_agent": log.user_agent
-        })
+        }
+        for log in rows
+    ]
     
-    return {
+    return FastJSONResponse({
         "logs": logs_data,
         "total": total_count,
         "skip": skip,
         "limit": limit
-    }
+    })
 
-@router.get("/test")
+@router.get("/test", dependencies=[Depends(rate_limit("logs_test"))])
 def test_logs_api():
     """로그 API 테스트 엔드포인트 (인증 없음)"""
     return {
@@ -160,7 +178,8 @@ def test_logs_api():
         ]
     }
 
-@router.get("/simple")
+@router.get("/simple", dependencies=[Depends(rate_limit("logs_simple"))])
+@single_flight("logs_simple", "skip", "limit")
 def get_logs_simple(
     skip: int = 0,
     limit: int = 50,
@@ -211,6 +230,7 @@ def get_logs_simple(
 
 @router.get("/stats")
 def get_log_stats(
+    days: int = Query(7, ge=1, le=365),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -222,38 +242,25 @@ def get_log_stats(
             detail="Not enough permissions"
         )
     
-    # 전체 로그 수
-    total_logs = db.query(ActivityLog).count()
-    
-    # 레벨별 통계
-    error_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'error').count()
-    warning_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'warning').count()
-    info_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'info').count()
-    success_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'success').count()
-    
-    # 타입별 통계
-    user_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'user').count()
-    system_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'system').count()
-    security_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'security').count()
-    
-    # 오늘 로그 수
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_logs = db.query(ActivityLog).filter(ActivityLog.created_at >= today).count()
+    # 일별 집계 행의 합계 (로그 테이블을 매번 스캔하지 않음)
+    totals = get_rollup_totals(db)
+    daily = get_rollups(db, days)
     
     return {
-        "total_logs": total_logs,
-        "today_logs": today_logs,
+        "total_logs": totals['total_logs'],
+        "today_logs": daily[-1]['total_logs'],
         "by_level": {
-            "error": error_logs,
-            "warning": warning_logs,
-            "info": info_logs,
-            "success": success_logs
+            "error": totals['error_logs'],
+            "warning": totals['warning_logs'],
+            "info": totals['info_logs'],
+            "success": totals['success_logs']
         },
         "by_type": {
-            "user": user_logs,
-            "system": system_logs,
-            "security": security_logs
-        }
+            "user": totals['user_logs'],
+            "system": totals['system_logs'],
+            "security": totals['security_logs']
+        },
+        "daily": daily
     }
 
 @router.delete("/")
@@ -270,22 +277,35 @@ def clear_logs(
         )
     
     try:
-        deleted_count = db.query(ActivityLog).delete()
+        # 삭제 전 행 수 (큰 테이블은 통계 기반 추정치), 삭제는 PostgreSQL에서 TRUNCATE (app/table_stats.py)
+        deleted = table_row_counts(db.connection(), ['activity_logs']).get('activity_logs', {"rows": 0, "estimated": False})
+        deleted_count = deleted["rows"]
+        started = time.perf_counter()
+        truncate_tables(db, ['activity_logs', 'daily_activity_rollup'])
+        # id가 다시 1부터 시작하므로 다음 증분 백업은 전체 백업으로 (app/backup.py)
+        reset_backup_chains(db)
         db.commit()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        invalidate_rollups()
         
         # 로그 삭제 기록
         clear_log = ActivityLog(
             user_id=current_user.id,
             username=current_user.username,
             action="시스템 로그 삭제",
-            details=f"총 {deleted_count}개의 로그가 삭제되었습니다.",
+            details=f"총 {'약 ' if deleted['estimated'] else ''}{deleted_count}개의 로그가 삭제되었습니다. ({elapsed_ms}ms)",
             log_type="system",
             log_level="warning"
         )
         db.add(clear_log)
         db.commit()
         
-        return {"message": f"Successfully deleted {deleted_count} logs"}
+        return {
+            "message": f"Successfully deleted {deleted_count} logs",
+            "deleted_count": deleted_count,
+            "count_estimated": deleted["estimated"],
+            "elapsed_ms": elapsed_ms
+        }
     
     except Exception as e:
         db.rollback()
@@ -318,6 +338,7 @@ def log_activity(
         
         db.add(activity_log)
         db.commit()
+        track_active_session(session_id)
         return activity_log
     
     except Exception as e:
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Response, Query, Request
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import logging
 import traceback
 import sys
 
 from ..database import get_db
 from ..models import Prompt
-from ..schemas import PromptCreate, PromptResponse
+from ..schemas import PromptCreate, PromptResponse, PromptPage
+from ..search import invalidate_search_index
+from ..serialization import FastJSONResponse, rows_to_dicts, schema_columns
+from ..http_cache import bump_content_version, conditional_response
 
 router = APIRouter()
 
@@ -15,50 +19,43 @@ router = APIRouter()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=List[PromptResponse])
-def get_all_prompts(db: Session = Depends(get_db)):
+@router.get("/", response_model=List[PromptResponse], response_class=FastJSONResponse)
+def get_all_prompts(request: Request, db: Session = Depends(get_db)):
+    def build():
+        rows = db.query(*schema_columns(Prompt, PromptResponse)).order_by(Prompt.created_at.desc()).all()
+        logger.info(f"Found {len(rows)} prompts")
+        return FastJSONResponse(rows_to_dicts(rows))
+    
     try:
-        logger.info("Getting all prompts...")
-        prompts = db.query(Prompt).order_by(Prompt.created_at.desc()).all()
-        logger.info(f"Found {len(prompts)} prompts")
-        
-        # 각 항목의 데이터 타입 확인
-        for i, prompt in enumerate(prompts):
-            logger.info(f"Prompt {i+1}: id={prompt.id}, title={prompt.title}, created_at={prompt.created_at} (type: {type(prompt.created_at)})")
-        
-        # 응답 직렬화 테스트
-        try:
-            response_data = []
-            for prompt in prompts:
-                # created_at이 None인 경우 현재 시간으로 설정
-                created_at = prompt.created_at
-                if created_at is None:
-                    from datetime import datetime
-                    created_at = datetime.now()
-                    logger.warning(f"Prompt {prompt.id} has None created_at, using current time")
-                
-                prompt_dict = {
-                    "id": prompt.id,
-                    "title": prompt.title,
-                    "content": prompt.content,
-                    "category": prompt.category,
-                    "created_at": created_at
-                }
-                response_data.append(prompt_dict)
-                logger.info(f"Serialized prompt {prompt.id} successfully")
-            
-            logger.info("All prompts serialized successfully")
-            return prompts
-        except Exception as serialize_error:
-            logger.error(f"Serialization error: {serialize_error}")
-            logger.error(f"Serialization traceback: {traceback.format_exc()}")
-            raise HTTPException(status_code=500, detail=f"Serialization error: {str(serialize_error)}")
-            
+        return conditional_response(request, "prompt_all", build)
     except Exception as e:
         logger.error(f"Error getting prompts: {e}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Failed to get prompts: {str(e)}")
 
+@router.get("/list", response_model=PromptPage)
+def list_prompts(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """프롬프트 목록을 키셋 페이지네이션으로 조회합니다 (content 제외)."""
+    try:
+        query = db.query(Prompt.id, Prompt.title, Prompt.category, Prompt.created_at)
+        if category:
+            query = query.filter(Prompt.category == category)
+        if cursor is not None:
+            query = query.filter(Prompt.id < cursor)
+        rows = query.order_by(Prompt.id.desc()).limit(limit + 1).all()
+
+        items = [dict(row._mapping) for row in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+    except Exception as e:
+        logger.error(f"Error listing prompts: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to list prompts: {str(e)}")
+
 @router.post("/", response_model=PromptResponse)
 def add_prompt(prompt_data: PromptCreate, db: Session = Depends(get_db)):
     try:
@@ -81,7 +78,7 @@ def add_prompt(prompt_data: PromptCreate, db: Session = Depends(get_db)):
         
         # 데이터베이스 연결 확인
         try:
-            db.execute("SELECT 1")
+            db.execute(text("SELECT 1"))
             logger.info("Database connection successful")
         except Exception as db_error:
             logger.error(f"Database connection failed: {db_error}")
@@ -105,6 +102,7 @@ def add_prompt(prompt_data: PromptCreate, db: Session = Depends(get_db)):
         # 데이터베이스에 추가
         try:
             db.add(db_prompt)
+            bump_content_version(db, "prompt")
             logger.info("Added prompt to session")
         except Exception as add_error:
             logger.error(f"Error adding prompt to session: {add_error}")
@@ -121,6 +119,8 @@ def add_prompt(prompt_data: PromptCreate, db: Session = Depends(get_db)):
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Error committing to database: {str(commit_error)}")
         
+        invalidate_search_index()
+        
         # 새로고침
         try:
             db.refresh(db_prompt)
@@ -153,9 +153,11 @@ def update_prompt(prompt_id: int, prompt_data: PromptCreate, db: Session = Depen
         prompt.title = prompt_data.title
         prompt.content = prompt_data.content
         prompt.category = prompt_data.category
+        bump_content_version(db, "prompt")
         
         db.commit()
         db.refresh(prompt)
+        invalidate_search_index()
         return prompt
     except HTTPException:
         raise
@@ -172,7 +174,9 @@ def delete_prompt(prompt_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Prompt not found")
         
         db.delete(prompt)
+        bump_content_version(db, "prompt")
         db.commit()
+        invalidate_search_index()
         return {"message": "Prompt deleted successfully"}
     except HTTPException:
         raise
@@ -205,13 +209,21 @@ def test_database_connection(db: Session = Depends(get_db)):
     """데이터베이스 연결 테스트 엔드포인트"""
     try:
         # 간단한 쿼리 실행
-        result = db.execute("SELECT 1 as test")
+        result = db.execute(text("SELECT 1 as test"))
         return {"message": "Database connection successful", "test_result": result.scalar()}
     except Exception as e:
         logger.error(f"Database test failed: {e}")
         logger.error(f"Database test traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Database test failed: {str(e)}")
 
+@router.get("/{prompt_id}", response_model=PromptResponse)
+def get_prompt(prompt_id: int, db: Session = Depends(get_db)):
+    """프롬프트 상세(전체 content)를 조회합니다."""
+    prompt = db.query(Prompt).filter(Prompt.id == prompt_id).first()
+    if not prompt:
+        raise HTTPException(status_code=404, detail="Prompt not found")
+    return prompt
+
 @router.options("/")
 def options_prompt():
     return Response(status_code=200) 
\ No newline at end of file
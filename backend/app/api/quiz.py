@@ -1,22 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Response, Request
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
+import threading
 
 from ..database import get_db
 from ..models import Quiz
-from ..schemas import QuizCreate, QuizResponse
+from ..schemas import QuizCreate, QuizResponse, QuizTopicCount
+from ..serialization import FastJSONResponse, rows_to_dicts, schema_columns
+from ..http_cache import bump_content_version, conditional_response, content_version_key
 
 router = APIRouter()
 
+# 토픽별 퀴즈 수 캐시: (quiz 콘텐츠 버전, 결과)
+# 버전이 바뀌면(다른 워커의 쓰기 포함, 최대 CONTENT_VERSION_TTL초 뒤) 다시 집계
+_topic_counts_cache: Optional[Tuple[tuple, List[dict]]] = None
+_topic_counts_generation = 0
+_topic_counts_lock = threading.Lock()
+
+def invalidate_topic_cache():
+    """이 프로세스의 토픽 캐시를 무효화합니다."""
+    global _topic_counts_cache, _topic_counts_generation
+    with _topic_counts_lock:
+        _topic_counts_cache = None
+        _topic_counts_generation += 1
+
+def get_topic_counts(db: Session) -> List[dict]:
+    """SELECT topic, count(*) GROUP BY topic 결과를 캐시와 함께 반환합니다."""
+    global _topic_counts_cache
+    # 집계 전에 버전을 읽으므로, 집계 중에 커밋된 쓰기는 다음 조회에서 버전이 달라져 다시 집계됨
+    version = content_version_key("quiz")
+    cached = _topic_counts_cache
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    generation = _topic_counts_generation
+    rows = db.query(Quiz.topic, func.count(Quiz.id)).group_by(Quiz.topic).order_by(Quiz.topic).all()
+    topic_counts = [{"topic": topic, "count": count} for topic, count in rows if topic is not None]
+
+    with _topic_counts_lock:
+        # 집계하는 동안 무효화되었으면 이번 결과는 캐시하지 않음
+        if version is not None and generation == _topic_counts_generation:
+            _topic_counts_cache = (version, topic_counts)
+    return topic_counts
+
 @router.get("/topics", response_model=List[str])
 def get_all_quiz_topics(db: Session = Depends(get_db)):
-    topics = list(set([row.topic for row in db.query(Quiz).all()]))
-    return topics
+    return [row["topic"] for row in get_topic_counts(db)]
+
+@router.get("/topics/counts", response_model=List[QuizTopicCount])
+def get_quiz_topic_counts(db: Session = Depends(get_db)):
+    """토픽별 퀴즈 수를 조회합니다."""
+    return get_topic_counts(db)
 
-@router.get("/{topic}", response_model=List[QuizResponse])
-def get_quiz_by_topic(topic: str, db: Session = Depends(get_db)):
-    quizzes = db.query(Quiz).filter(Quiz.topic == topic).all()
-    return quizzes
+@router.get("/{topic}", response_model=List[QuizResponse], response_class=FastJSONResponse)
+def get_quiz_by_topic(topic: str, request: Request, db: Session = Depends(get_db)):
+    def build():
+        rows = db.query(*schema_columns(Quiz, QuizResponse)).filter(Quiz.topic == topic).all()
+        return FastJSONResponse(rows_to_dicts(rows))
+    return conditional_response(request, "quiz_by_topic", build)
 
 @router.post("/", response_model=QuizResponse)
 def add_quiz(quiz_data: QuizCreate, db: Session = Depends(get_db)):
@@ -31,8 +73,10 @@ def add_quiz(quiz_data: QuizCreate, db: Session = Depends(get_db)):
         explanation=quiz_data.explanation
     )
     db.add(db_quiz)
+    bump_content_version(db, "quiz")
     db.commit()
     db.refresh(db_quiz)
+    invalidate_topic_cache()
     return db_quiz
 
 @router.put("/{quiz_id}", response_model=QuizResponse)
@@ -49,9 +93,11 @@ def update_quiz(quiz_id: int, quiz_data: QuizCreate, db: Session = Depends(get_d
     quiz.option4 = quiz_data.option4
     quiz.correct = quiz_data.correct
     quiz.explanation = quiz_data.explanation
+    bump_content_version(db, "quiz")
     
     db.commit()
     db.refresh(quiz)
+    invalidate_topic_cache()
     return quiz
 
 @router.delete("/{quiz_id}")
@@ -61,7 +107,9 @@ def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Quiz not found")
     
     db.delete(quiz)
+    bump_content_version(db, "quiz")
     db.commit()
+    invalidate_topic_cache()
     return {"message": "Quiz deleted successfully"}
 
 @router.options("/")
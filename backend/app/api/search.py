@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from ..database import get_db
+from ..schemas import SearchResponse
+from ..search import search, SEARCH_TYPES
+
+router = APIRouter()
+
+@router.get("/", response_model=SearchResponse)
+def search_contents(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """프롬프트, 기본 컨텐츠, AI 정보의 제목/본문을 검색합니다.
+
+    types: 쉼표로 구분한 검색 대상 (prompt, base_content, ai_info). 비우면 전체 검색.
+    """
+    type_list = None
+    if types:
+        type_list = [t.strip() for t in types.split(",") if t.strip()]
+        invalid = [t for t in type_list if t not in SEARCH_TYPES]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid search types: {', '.join(invalid)}")
+
+    try:
+        backend, total, results = search(db, q, type_list, limit, offset)
+    except Exception as e:
+        print(f"Error in search_contents: {e}")
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+    return {
+        "query": q,
+        "backend": backend,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "results": results
+    }
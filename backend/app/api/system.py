@@ -1,27 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import gzip
 import json
-import io
 import os
+import tempfile
+import time
 
-from ..database import get_db
-from ..models import User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term
+from ..database import get_db, SessionLocal
+from ..models import User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term, ActivityCalendar, DailyActivityRollup
 from ..auth import get_current_active_user
 from .logs import log_activity
+from .quiz import invalidate_topic_cache
+from ..search import invalidate_search_index
+from ..activity_calendar import backfill_activity_calendars
+from ..rollups import get_rollups, invalidate_rollups, count_active_sessions, SKETCH_STANDARD_ERROR
+from ..http_cache import CONTENT_TABLES, bump_content_version
+from ..auto_backup import stored_backup_path
+from ..table_stats import get_table_names, table_row_counts, truncate_tables
+from ..export import EXPORT_FORMATS, EXPORT_TABLE_MODELS, iter_export, parquet_available
+from ..backup import (
+    BACKUP_MODES, DEFAULT_BACKUP_TABLES, BackupFormatError, BackupStream, BackupTooLargeError, LimitedUploadRoute,
+    create_backup_file, order_backup_chain, reset_backup_chains, restore_tables
+)
 
-router = APIRouter()
+# 복원 업로드 크기 제한은 본문 파싱 전에 검사 (app/backup.py)
+router = APIRouter(route_class=LimitedUploadRoute)
 
 @router.post("/backup")
 async def create_backup(
     include_tables: Optional[List[str]] = None,
     description: Optional[str] = None,
+    mode: str = Query("full", description="full | incremental(직전 백업 이후) | differential(직전 전체 백업 이후)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """전체 시스템 데이터를 백업합니다. (관리자만)"""
+    """시스템 데이터를 백업합니다. (관리자만, 증분/차등은 app/backup.py 참고)"""
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -29,106 +46,129 @@ async def create_backup(
             detail="Not enough permissions"
         )
     
+    if mode not in BACKUP_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(BACKUP_MODES)}")
+    
+    # 기본적으로 모든 테이블 백업
+    if not include_tables:
+        include_tables = DEFAULT_BACKUP_TABLES
+    
+    def build():
+        # 테이블을 배치 단위로 읽어 임시 파일에 씀 (8MB 넘으면 디스크로)
+        spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        try:
+            backup_history, sha256 = create_backup_file(
+                db, spool, include_tables, mode, description, user=current_user
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool, backup_history, sha256
+    
     try:
-        # 기본적으로 모든 테이블 백업
-        if not include_tables:
-            include_tables = ['users', 'ai_info', 'user_progress', 'activity_logs', 'quiz', 'prompt', 'base_content', 'term']
-        
-        backup_data = {
-            "backup_info": {
-                "created_at": datetime.now().isoformat(),
-                "created_by": current_user.username,
-                "description": description or "Manual backup",
-                "tables_included": include_tables,
-                "version": "1.0.0"
-            },
-            "data": {}
-        }
-        
-        # 각 테이블 데이터 수집
-        table_models = {
-            'users': User,
-            'ai_info': AIInfo,
-            'user_progress': UserProgress,
-            'activity_logs': ActivityLog,
-            'quiz': Quiz,
-            'prompt': Prompt,
-            'base_content': BaseContent,
-            'term': Term,
-            'backup_history': BackupHistory
+        spool, backup_history, sha256 = await run_in_threadpool(build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
+    
+    filename = backup_history.filename
+    file_size = backup_history.file_size
+    
+    # 백업 생성 로그 기록
+    log_activity(
+        db=db,
+        action="시스템 백업 생성",
+        details=f"백업 파일이 생성되었습니다. 파일명: {filename}, 방식: {backup_history.backup_mode}, 크기: {file_size} bytes",
+        log_type="system",
+        log_level="success",
+        user_id=current_user.id,
+        username=current_user.username
+    )
+    
+    # 파일 스트림으로 반환 (64KB 청크, 압축 미들웨어가 청크 단위로 압축)
+    def generate(chunk_size: int = 64 * 1024):
+        try:
+            while True:
+                chunk = spool.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            spool.close()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/json",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Backup-Id": str(backup_history.id),
+            "X-Backup-Mode": backup_history.backup_mode,
+            "X-Backup-SHA256": sha256
         }
-        
-        for table_name in include_tables:
-            if table_name in table_models:
-                model = table_models[table_name]
-                records = db.query(model).all()
-                
-                # 모델 데이터를 딕셔너리로 변환
-                table_data = []
-                for record in records:
-                    record_dict = {}
-                    for column in record.__table__.columns:
-                        value = getattr(record, column.name)
-                        if isinstance(value, datetime):
-                            value = value.isoformat()
-                        record_dict[column.name] = value
-                    table_data.append(record_dict)
-                
-                backup_data["data"][table_name] = table_data
-        
-        # 백업 파일명 생성
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"ai_mastery_backup_{timestamp}.json"
-        
-        # JSON 문자열 생성
-        json_str = json.dumps(backup_data, indent=2, ensure_ascii=False)
-        file_size = len(json_str.encode('utf-8'))
-        
-        # 백업 히스토리 저장
-        backup_history = BackupHistory(
-            filename=filename,
-            file_size=file_size,
-            backup_type='manual',
-            tables_included=json.dumps(include_tables),
-            description=description,
-            created_by=current_user.id,
-            created_by_username=current_user.username
-        )
-        db.add(backup_history)
+    )
+
+def _restore_backups(db: Session, backups: List[BackupStream], preserve_user: dict,
+                     checksum: Optional[str] = None) -> List[str]:
+    """백업들을 순서대로 한 트랜잭션에서 복원하고 파생 데이터/캐시를 정리합니다."""
+    restored_tables = []
+    try:
+        for backup in backups:
+            for table in restore_tables(db, backup, preserve_user=preserve_user):
+                if table not in restored_tables:
+                    restored_tables.append(table)
+        
+        # 학습 달력/일별 집계는 파생 데이터이므로 백업하지 않고 다시 만듦
+        if 'user_progress' in restored_tables:
+            db.query(ActivityCalendar).delete()
+        if 'activity_logs' in restored_tables:
+            db.query(DailyActivityRollup).delete()
+        restored_content = [table for table in restored_tables if table in CONTENT_TABLES]
+        if restored_content:
+            bump_content_version(db, *restored_content)
+        
+        if checksum and checksum.lower() != backups[0].sha256:
+            raise BackupFormatError(f"Checksum mismatch (expected {checksum}, got {backups[0].sha256})")
         db.commit()
-        
-        # 백업 생성 로그 기록
-        log_activity(
-            db=db,
-            action="시스템 백업 생성",
-            details=f"백업 파일이 생성되었습니다. 파일명: {filename}, 크기: {file_size} bytes",
-            log_type="system",
-            log_level="success",
-            user_id=current_user.id,
-            username=current_user.username
-        )
-        
-        # 파일 스트림으로 반환
-        def generate():
-            yield json_str
-        
-        return StreamingResponse(
-            io.StringIO(json_str),
-            media_type="application/json",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-        
-    except Exception as e:
+    except Exception:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
+        raise
+    
+    invalidate_rollups()
+    invalidate_topic_cache()
+    invalidate_search_index()
+    if 'user_progress' in restored_tables:
+        backfill_activity_calendars(db.get_bind())
+    return restored_tables
+
+def _current_user_data(current_user: User) -> dict:
+    # 현재 사용자 정보 백업 (복원 후 로그인 유지용)
+    return {
+        'id': current_user.id,
+        'username': current_user.username,
+        'hashed_password': current_user.hashed_password,
+        'role': current_user.role
+    }
+
+async def _run_restore(restore):
+    try:
+        return await run_in_threadpool(restore)
+    except BackupTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (BackupFormatError, UnicodeDecodeError, EOFError, gzip.BadGzipFile) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid backup file: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to restore data: {str(e)}")
 
 @router.post("/restore")
 async def restore_backup(
     file: UploadFile = File(...),
+    checksum: Optional[str] = Query(None, description="업로드 파일의 SHA-256 (지정하면 커밋 전에 검증)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """백업 파일을 업로드하여 시스템을 복원합니다. (관리자만)"""
+    """백업 파일을 업로드하여 시스템을 복원합니다. (관리자만, .json 또는 .json.gz)"""
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -136,118 +176,84 @@ async def restore_backup(
             detail="Not enough permissions"
         )
     
-    if not file.filename.endswith('.json'):
+    if not file.filename.endswith(('.json', '.json.gz')):
         raise HTTPException(status_code=400, detail="Only JSON files are allowed")
     
-    try:
-        # 파일 내용 읽기
-        content = await file.read()
-        backup_data = json.loads(content.decode('utf-8'))
-        
-        # 백업 파일 검증
-        if "backup_info" not in backup_data or "data" not in backup_data:
-            raise HTTPException(status_code=400, detail="Invalid backup file format")
-        
-        backup_info = backup_data["backup_info"]
-        data = backup_data["data"]
-        
-        # 트랜잭션 시작
-        try:
-            # 테이블 모델 매핑
-            table_models = {
-                'users': User,
-                'ai_info': AIInfo,
-                'user_progress': UserProgress,
-                'activity_logs': ActivityLog,
-                'quiz': Quiz,
-                'prompt': Prompt,
-                'base_content': BaseContent,
-                'term': Term,
-                'backup_history': BackupHistory
-            }
-            
-            restored_tables = []
-            
-            # 현재 사용자 정보 백업 (복원 후 로그인 유지용)
-            current_user_data = {
-                'id': current_user.id,
-                'username': current_user.username,
-                'hashed_password': current_user.hashed_password
-            }
-            
-            # 각 테이블 데이터 복원
-            for table_name, table_data in data.items():
-                if table_name in table_models and table_data:
-                    model = table_models[table_name]
-                    
-                    # 기존 데이터 삭제 (사용자는 제외하고 나중에 처리)
-                    if table_name != 'users':
-                        db.query(model).delete()
-                    
-                    # 새 데이터 삽입
-                    for record_data in table_data:
-                        # 날짜 필드 변환
-                        for key, value in record_data.items():
-                            if key.endswith('_at') and isinstance(value, str):
-                                try:
-                                    record_data[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                                except:
-                                    pass
-                        
-                        new_record = model(**record_data)
-                        db.add(new_record)
-                    
-                    restored_tables.append(table_name)
-            
-            # 사용자 테이블 특별 처리 (현재 사용자 보존)
-            if 'users' in data:
-                db.query(User).delete()
-                
-                # 백업된 사용자들 복원
-                for user_data in data['users']:
-                    for key, value in user_data.items():
-                        if key.endswith('_at') and isinstance(value, str):
-                            try:
-                                user_data[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                            except:
-                                pass
-                    
-                    new_user = User(**user_data)
-                    db.add(new_user)
-                
-                # 현재 관리자 사용자가 백업에 없으면 추가
-                backup_usernames = [u['username'] for u in data['users']]
-                if current_user.username not in backup_usernames:
-                    admin_user = User(**current_user_data)
-                    db.add(admin_user)
-            
-            db.commit()
-            
-            # 복원 완료 로그 기록
-            log_activity(
-                db=db,
-                action="시스템 복원 완료",
-                details=f"백업 파일에서 시스템이 복원되었습니다. 파일: {file.filename}, 복원된 테이블: {', '.join(restored_tables)}",
-                log_type="system",
-                log_level="success",
-                user_id=current_user.id,
-                username=current_user.username
-            )
-            
-            return {
-                "message": "System restored successfully",
-                "restored_tables": restored_tables,
-                "backup_info": backup_info
-            }
-            
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(status_code=500, detail=f"Failed to restore data: {str(e)}")
-        
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON file")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to process backup file: {str(e)}")
+    current_user_data = _current_user_data(current_user)
+    
+    def restore():
+        # 헤더(backup_info)를 먼저 읽어 검증한 뒤 테이블을 레코드 단위로 스트리밍 복원
+        backup = BackupStream(file.file)
+        return backup, _restore_backups(db, [backup], current_user_data, checksum)
+    
+    backup, restored_tables = await _run_restore(restore)
+    
+    # 복원 완료 로그 기록
+    log_activity(
+        db=db,
+        action="시스템 복원 완료",
+        details=f"백업 파일에서 시스템이 복원되었습니다. 파일: {file.filename}, 복원된 테이블: {', '.join(restored_tables)}, SHA-256: {backup.sha256}",
+        log_type="system",
+        log_level="success",
+        user_id=current_user.id,
+        username=current_user.username
+    )
+    
+    return {
+        "message": "System restored successfully",
+        "restored_tables": restored_tables,
+        "backup_info": backup.backup_info,
+        "file_size": backup.size,
+        "sha256": backup.sha256
+    }
+
+@router.post("/restore-chain")
+async def restore_backup_chain(
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """전체 백업 1개와 그 뒤의 증분/차등 백업들을 순서대로 한 트랜잭션에서 복원합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    for file in files:
+        if not file.filename.endswith(('.json', '.json.gz')):
+            raise HTTPException(status_code=400, detail="Only JSON files are allowed")
+    
+    current_user_data = _current_user_data(current_user)
+    
+    def restore():
+        # 모든 파일의 헤더를 먼저 읽어 체인을 검증한 뒤 복원
+        chain = order_backup_chain([BackupStream(file.file) for file in files])
+        return chain, _restore_backups(db, chain, current_user_data)
+    
+    chain, restored_tables = await _run_restore(restore)
+    applied = [
+        {"backup_id": backup.backup_info.get("backup_id"), "mode": backup.backup_info.get("mode", "full"),
+         "created_at": backup.backup_info.get("created_at"), "sha256": backup.sha256}
+        for backup in chain
+    ]
+    
+    log_activity(
+        db=db,
+        action="시스템 복원 완료",
+        details=f"백업 체인 {len(chain)}개 파일에서 시스템이 복원되었습니다. 백업 ID: {', '.join(str(item['backup_id']) for item in applied)}, 복원된 테이블: {', '.join(restored_tables)}",
+        log_type="system",
+        log_level="success",
+        user_id=current_user.id,
+        username=current_user.username
+    )
+    
+    return {
+        "message": "System restored successfully",
+        "restored_tables": restored_tables,
+        "applied_backups": applied
+    }
 
 @router.get("/backup-history")
 def get_backup_history(
@@ -271,10 +277,15 @@ def get_backup_history(
             "filename": backup.filename,
             "file_size": backup.file_size,
             "backup_type": backup.backup_type,
+            "backup_mode": backup.backup_mode or 'full',
+            "parent_id": backup.parent_id,
+            "watermarks": json.loads(backup.watermarks) if backup.watermarks else {},
             "tables_included": json.loads(backup.tables_included) if backup.tables_included else [],
             "description": backup.description,
             "created_by": backup.created_by_username,
-            "created_at": backup.created_at.isoformat()
+            "created_at": backup.created_at.isoformat(),
+            # 자동 백업은 서버에 저장되어 내려받을 수 있음
+            "stored": stored_backup_path(backup) is not None
         })
     
     return {"backups": backup_list}
@@ -297,17 +308,97 @@ def delete_backup_history(
     if not backup:
         raise HTTPException(status_code=404, detail="Backup history not found")
     
+    path = stored_backup_path(backup)
     db.delete(backup)
     db.commit()
+    if path:
+        os.remove(path)
     
     return {"message": "Backup history deleted successfully"}
 
+@router.get("/backup-history/{backup_id}/download")
+def download_backup(
+    backup_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """서버에 저장된 자동 백업 파일을 내려받습니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    backup = db.query(BackupHistory).filter(BackupHistory.id == backup_id).first()
+    if not backup:
+        raise HTTPException(status_code=404, detail="Backup history not found")
+    
+    path = stored_backup_path(backup)
+    if not path:
+        raise HTTPException(status_code=404, detail="Backup file is not stored on the server")
+    
+    # 이미 gzip 파일이므로 압축 미들웨어는 건너뜀
+    return FileResponse(path, media_type="application/gzip", filename=backup.filename)
+
+@router.get("/export/{table_name}")
+def export_table(
+    table_name: str,
+    fmt: str = Query("csv", alias="format", description="csv (gzip) | parquet (pyarrow 필요)"),
+    flatten: bool = Query(False, description="user_progress의 learned_info/stats JSON을 컬럼으로 펼침"),
+    since: Optional[datetime] = Query(None, description="이 시각 이후 행만 (created_at 기준)"),
+    until: Optional[datetime] = Query(None, description="이 시각 이전 행만"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """분석용으로 테이블 하나를 CSV.gz 또는 Parquet로 스트리밍합니다. (관리자만, app/export.py)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if table_name not in EXPORT_TABLE_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown export table: {table_name}")
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'parquet' and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow on the server")
+    
+    log_activity(
+        db=db,
+        action="데이터 내보내기",
+        details=f"{table_name} 테이블을 {fmt} 형식으로 내보냈습니다." + (" (JSON 컬럼 펼침)" if flatten else ""),
+        log_type="system",
+        log_level="info",
+        user_id=current_user.id,
+        username=current_user.username
+    )
+    
+    media_type, suffix = EXPORT_FORMATS[fmt]
+    filename = f"{table_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}"
+    # 본문은 핸들러가 반환된 뒤 스트리밍되므로 요청 세션(get_db) 대신 전용 세션을 열고 끝나면 닫음
+    def generate():
+        export_db = SessionLocal()
+        try:
+            yield from iter_export(export_db, table_name, fmt, flatten, since, until)
+        finally:
+            export_db.close()
+    
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
 @router.get("/system-info")
 def get_system_info(
+    exact: bool = Query(False, description="true면 모든 테이블을 COUNT(*)로 정확히 셈 (큰 테이블은 느림)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """시스템 정보를 조회합니다. (관리자만)"""
+    """시스템 정보를 조회합니다. (관리자만, 행 수는 기본적으로 통계 기반 추정치)"""
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -315,18 +406,15 @@ def get_system_info(
             detail="Not enough permissions"
         )
     
-    # 테이블별 레코드 수 조회
-    stats = {
-        "users": db.query(User).count(),
-        "ai_info": db.query(AIInfo).count(),
-        "user_progress": db.query(UserProgress).count(),
-        "activity_logs": db.query(ActivityLog).count(),
-        "quiz": db.query(Quiz).count(),
-        "prompt": db.query(Prompt).count(),
-        "base_content": db.query(BaseContent).count(),
-        "term": db.query(Term).count(),
-        "backup_history": db.query(BackupHistory).count()
-    }
+    # 테이블별 레코드 수 조회 (요청 세션의 연결 하나로, app/table_stats.py)
+    tables = [
+        'users', 'ai_info', 'user_progress', 'quiz_attempts', 'quiz_score_totals', 'user_achievements',
+        'activity_calendars', 'daily_activity_rollup', 'activity_logs', 'quiz', 'prompt', 'base_content', 'term',
+        'backup_history'
+    ]
+    counts = table_row_counts(db.connection(), tables, exact=exact)
+    stats = {table: counts[table]["rows"] if table in counts else 0 for table in tables}
+    estimated_tables = [table for table in tables if counts.get(table, {}).get("estimated")]
     
     # 최근 백업 정보
     latest_backup = db.query(BackupHistory).order_by(BackupHistory.created_at.desc()).first()
@@ -335,6 +423,7 @@ def get_system_info(
         "version": "1.0.0",
         "table_stats": stats,
         "total_records": sum(stats.values()),
+        "estimated_tables": estimated_tables,
         "latest_backup": {
             "filename": latest_backup.filename if latest_backup else None,
             "created_at": latest_backup.created_at.isoformat() if latest_backup else None,
@@ -370,35 +459,47 @@ def clear_all_data(
             'role': current_user.role
         }
         
-        # 모든 테이블 데이터 삭제
-        db.query(ActivityLog).delete()
-        db.query(UserProgress).delete()
-        db.query(BackupHistory).delete()
-        db.query(AIInfo).delete()
-        db.query(Quiz).delete()
-        db.query(Prompt).delete()
-        db.query(BaseContent).delete()
-        db.query(Term).delete()
-        db.query(User).delete()
+        # 모든 테이블 데이터 삭제 (PostgreSQL은 TRUNCATE 한 문장, app/table_stats.py)
+        # 백업 기록은 서버에 저장된 자동 백업 파일과 함께 남겨 두어 삭제 후에도 내려받아 복원할 수 있게 함
+        tables = [
+            'activity_logs', 'user_progress', 'quiz_attempts', 'quiz_score_totals', 'user_achievements',
+            'activity_calendars', 'daily_activity_rollup', 'ai_info', 'quiz', 'prompt',
+            'base_content', 'term', 'users'
+        ]
+        started = time.perf_counter()
+        truncate_seconds = truncate_tables(db, tables)
+        # 비운 테이블의 id가 다시 1부터 시작하므로 다음 증분 백업은 전체 백업으로
+        reset_backup_chains(db)
         
         # 관리자 계정 복원
         admin_user = User(**admin_data)
         db.add(admin_user)
+        bump_content_version(db, *CONTENT_TABLES)
         db.commit()
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
         db.refresh(admin_user)
+        invalidate_topic_cache()
+        invalidate_search_index()
+        invalidate_rollups()
         
         # 데이터 삭제 로그 기록
         log_activity(
             db=db,
             action="전체 데이터 삭제",
-            details="관리자가 모든 시스템 데이터를 삭제했습니다. (관리자 계정은 보존)",
+            details=f"관리자가 모든 시스템 데이터를 삭제했습니다. (관리자 계정은 보존, {elapsed_ms}ms)",
             log_type="system",
             log_level="warning",
             user_id=admin_user.id,
             username=admin_user.username
         )
         
-        return {"message": "All data cleared successfully. Admin account preserved."}
+        return {
+            "message": "All data cleared successfully. Admin account preserved.",
+            "cleared_tables": tables,
+            "method": "truncate" if db.get_bind().dialect.name == "postgresql" else "delete",
+            "truncate_ms": round(truncate_seconds * 1000, 1),
+            "elapsed_ms": elapsed_ms
+        }
         
     except Exception as e:
         db.rollback()
@@ -419,19 +520,18 @@ async def init_database_tables(
     
     try:
         from ..database import Base, engine
-        from ..models import User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term
+        from ..models import User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term, QuizAttempt, QuizScoreTotal, UserAchievement, ActivityCalendar, DailyActivityRollup
         
         # 모든 테이블 생성 (이미 존재하는 테이블은 건드리지 않음)
         Base.metadata.create_all(bind=engine)
         
         # 테이블 확인
-        from sqlalchemy import inspect, text
-        inspector = inspect(engine)
-        existing_tables = inspector.get_table_names()
+        from sqlalchemy import text
+        existing_tables = get_table_names(refresh=True)
         
         expected_tables = [
-            'users', 'ai_info', 'user_progress', 'activity_logs', 
-            'backup_history', 'quiz', 'prompt', 'base_content', 'term'
+            'users', 'ai_info', 'user_progress', 'quiz_attempts', 'quiz_score_totals',
+            'user_achievements', 'activity_calendars', 'daily_activity_rollup', 'activity_logs', 'backup_history', 'quiz', 'prompt', 'base_content', 'term', 'content_versions'
         ]
         
         created_tables = []
@@ -496,11 +596,12 @@ async def init_database_tables(
         raise HTTPException(status_code=500, detail=f"Failed to initialize database: {str(e)}")
 
 @router.get("/database-status")
-async def get_database_status(
+def get_database_status(
+    exact: bool = Query(False, description="true면 모든 테이블을 COUNT(*)로 정확히 셈 (큰 테이블은 느림)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """데이터베이스 상태를 확인합니다. (관리자만)"""
+    """데이터베이스 상태를 확인합니다. (관리자만, 행 수는 기본적으로 통계 기반 추정치)"""
     
     if current_user.role != 'admin':
         raise HTTPException(
@@ -509,43 +610,66 @@ async def get_database_status(
         )
     
     try:
-        from sqlalchemy import inspect, text
-        from ..database import engine
-        
-        inspector = inspect(engine)
-        existing_tables = inspector.get_table_names()
+        existing_tables = get_table_names()
         
         expected_tables = [
-            'users', 'ai_info', 'user_progress', 'activity_logs', 
-            'backup_history', 'quiz', 'prompt', 'base_content', 'term'
+            'users', 'ai_info', 'user_progress', 'quiz_attempts', 'quiz_score_totals',
+            'user_achievements', 'activity_calendars', 'daily_activity_rollup', 'activity_logs', 'backup_history', 'quiz', 'prompt', 'base_content', 'term', 'content_versions'
         ]
         
+        present = [table for table in expected_tables if table in existing_tables]
+        try:
+            counts = table_row_counts(db.connection(), present, exact=exact)
+        except Exception:
+            db.rollback()
+            counts = {}
+        
         table_status = {}
         for table in expected_tables:
             if table in existing_tables:
                 # 테이블 행 수 확인
-                try:
-                    with engine.connect() as conn:
-                        result = conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                        count = result.scalar()
-                        table_status[table] = {"exists": True, "rows": count}
-                except Exception:
+                if table in counts:
+                    table_status[table] = {"exists": True, **counts[table]}
+                else:
                     table_status[table] = {"exists": True, "rows": "unknown"}
             else:
                 table_status[table] = {"exists": False, "rows": 0}
         
         return {
-            "database_url": "Connected" if engine else "Not connected",
+            "database_url": "Connected",
             "tables": table_status,
-            "total_existing": len([t for t in expected_tables if t in existing_tables]),
+            "total_existing": len(present),
             "total_expected": len(expected_tables)
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to check database status: {str(e)}")
 
+@router.get("/active-sessions")
+def get_active_sessions(
+    days: int = Query(7, ge=1, le=365),
+    exact: bool = False,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """최근 days일의 고유 활성 세션 수 (관리자만). exact=true면 로그에서 직접 셉니다. (감사용)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return {
+        "days": days,
+        "active_sessions": count_active_sessions(db, days, exact=exact),
+        "method": "exact" if exact else "hyperloglog",
+        "standard_error": 0 if exact else SKETCH_STANDARD_ERROR
+    }
+
 @router.get("/admin-stats")
-async def get_admin_stats(
+def get_admin_stats(
+    exact: bool = False,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -566,16 +690,8 @@ async def get_admin_stats(
         # 1. 총 사용자 수
         total_users = db.query(User).count()
         
-        # 2. 활성 사용자 수 (최근 7일간 활동)
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        
-        # 세션 ID 기반으로 활성 사용자 계산
-        active_sessions_subquery = db.query(ActivityLog.session_id).filter(
-            ActivityLog.created_at >= seven_days_ago,
-            ActivityLog.session_id.isnot(None)
-        ).distinct().subquery()
-        
-        active_users = db.query(active_sessions_subquery).count()
+        # 2. 활성 사용자 수 (최근 7일간 활동, 기본은 일별 HyperLogLog 스케치 병합 추정치)
+        active_users = count_active_sessions(db, 7, exact=exact)
         
         # 3. 총 퀴즈 수
         total_quizzes = db.query(Quiz).count()
@@ -609,29 +725,15 @@ async def get_admin_stats(
                 {"name": "컴퓨터비전", "count": max(total_quizzes // 7, 1)}
             ]
         
-        # 6. 주간 활동 (최근 7일)
+        # 6. 주간 활동 (최근 7일, 일별 집계 행 7개만 읽음)
         weekly_progress = []
         day_names = ['월', '화', '수', '목', '금', '토', '일']
         
-        for i in range(7):
-            target_date = datetime.now() - timedelta(days=6-i)
-            
-            # 해당 날짜의 활동 사용자 수 (세션 ID 기준)
-            daily_sessions = db.query(ActivityLog.session_id).filter(
-                func.date(ActivityLog.created_at) == target_date.date(),
-                ActivityLog.session_id.isnot(None)
-            ).distinct().count()
-            
-            # 해당 날짜의 퀴즈 활동 수
-            daily_quizzes = db.query(ActivityLog).filter(
-                func.date(ActivityLog.created_at) == target_date.date(),
-                ActivityLog.action.ilike('%quiz%')
-            ).count()
-            
+        for rollup in get_rollups(db, 7):
             weekly_progress.append({
-                "day": day_names[target_date.weekday()],
-                "users": daily_sessions,
-                "quizzes": daily_quizzes
+                "day": day_names[datetime.strptime(rollup["date"], '%Y-%m-%d').weekday()],
+                "users": rollup["active_sessions"],
+                "quizzes": rollup["quiz_completions"]
             })
         
         # 7. 최근 활동 (실시간)
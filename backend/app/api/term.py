@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import Term
 from ..schemas import TermResponse
+from ..serialization import FastJSONResponse, rows_to_dicts, schema_columns
+from ..http_cache import conditional_response
 import random
 
 router = APIRouter()
@@ -15,6 +17,9 @@ def get_random_term(db: Session = Depends(get_db)):
     term = random.choice(terms)
     return term
 
-@router.get("/all", response_model=list[TermResponse])
-def get_all_terms(db: Session = Depends(get_db)):
-    return db.query(Term).all() 
\ No newline at end of file
+@router.get("/all", response_model=list[TermResponse], response_class=FastJSONResponse)
+def get_all_terms(request: Request, db: Session = Depends(get_db)):
+    def build():
+        rows = db.query(*schema_columns(Term, TermResponse)).all()
+        return FastJSONResponse(rows_to_dicts(rows))
+    return conditional_response(request, "term_all", build) 
\ No newline at end of file
@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import json
 
 from ..database import get_db
 from ..models import UserProgress
-from ..schemas import UserProgressCreate, UserProgressResponse
+from ..schemas import UserProgressCreate, UserProgressResponse, ProgressBatchRequest
+from ..progress import add_learned_items, lock_stats_row, record_quiz_attempt, get_quiz_totals, ALL_TIME
+from ..achievements import ACHIEVEMENT_REGISTRY, evaluate_achievements, get_unlocked_achievements, pop_unnotified_achievements
+from ..streaks import (
+    active_day_ordinals, compute_streaks, get_streak_summary, load_active_days, month_bitmaps, ordinal_to_str,
+    today_ordinal, today_str
+)
+from ..activity_calendar import CALENDAR_ENCODINGS, encode_calendar, get_year_bits, mark_active_dates
+from ..rate_limit import rate_limit, single_flight
 from .logs import log_activity
 
 router = APIRouter()
@@ -33,35 +41,23 @@ def get_user_progress(session_id: str, db: Session = Depends(get_db)):
         except json.JSONDecodeError:
             pass
     
+    result['achievements'] = get_unlocked_achievements(db, session_id)
     return result
 
 @router.post("/{session_id}/{date}/{info_index}")
 def update_user_progress(session_id: str, date: str, info_index: int, request: Request, db: Session = Depends(get_db)):
     """사용자의 학습 진행상황을 업데이트하고 통계를 계산합니다."""
-    progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id, 
-        UserProgress.date == date
-    ).first()
-    
-    if progress:
-        learned = json.loads(progress.learned_info) if progress.learned_info else []
-        if info_index not in learned:
-            learned.append(info_index)
-            progress.learned_info = json.dumps(learned)
-    else:
-        learned = [info_index]
-        progress = UserProgress(
-            session_id=session_id, 
-            date=date, 
-            learned_info=json.dumps(learned), 
-            stats=None
-        )
-        db.add(progress)
-    
+    add_learned_items(db, session_id, date, [info_index])
+    mark_active_dates(db, session_id, [date])
     db.commit()
     
-    # 통계 업데이트
-    update_user_statistics(session_id, db)
+    # 통계 업데이트 및 변경된 지표에 대한 성취 확인
+    stats = update_user_statistics(session_id, db)
+    new_achievements = evaluate_achievements(db, session_id, {
+        'total_learned': stats['total_learned'],
+        'streak_days': stats['streak_days']
+    })
+    db.commit()
     
     # 학습 활동 로그 기록
     log_activity(
@@ -75,7 +71,7 @@ def update_user_progress(session_id: str, date: str, info_index: int, request: R
         ip_address=request.client.host if request.client else None
     )
     
-    return {"message": "Progress updated successfully", "achievement_gained": True}
+    return {"message": "Progress updated successfully", "achievement_gained": bool(new_achievements)}
 
 @router.post("/term-progress/{session_id}")
 def update_term_progress(session_id: str, term_data: dict, request: Request, db: Session = Depends(get_db)):
@@ -85,29 +81,14 @@ def update_term_progress(session_id: str, term_data: dict, request: Request, db:
     info_index = term_data.get('info_index', 0)
     
     # 용어 학습 기록 저장
-    term_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == f'__terms__{date}_{info_index}'
-    ).first()
-    
-    if not term_progress:
-        term_progress = UserProgress(
-            session_id=session_id,
-            date=f'__terms__{date}_{info_index}',
-            learned_info=json.dumps([term]),
-            stats=None
-        )
-        db.add(term_progress)
-    else:
-        learned_terms = json.loads(term_progress.learned_info) if term_progress.learned_info else []
-        if term not in learned_terms:
-            learned_terms.append(term)
-            term_progress.learned_info = json.dumps(learned_terms)
-    
+    add_learned_items(db, session_id, f'__terms__{date}_{info_index}', [term])
+    mark_active_dates(db, session_id, [date])
     db.commit()
     
-    # 통계 업데이트
-    update_user_statistics(session_id, db)
+    # 통계 업데이트 및 변경된 지표에 대한 성취 확인
+    stats = update_user_statistics(session_id, db)
+    new_achievements = evaluate_achievements(db, session_id, {'total_terms_learned': stats['total_terms_learned']})
+    db.commit()
     
     # 용어 학습 활동 로그 기록
     log_activity(
@@ -121,20 +102,75 @@ def update_term_progress(session_id: str, term_data: dict, request: Request, db:
         ip_address=request.client.host if request.client else None
     )
     
-    return {"message": "Term progress updated successfully", "achievement_gained": True}
+    return {"message": "Term progress updated successfully", "achievement_gained": bool(new_achievements)}
+
+@router.post("/batch/{session_id}")
+def update_progress_batch(session_id: str, batch: ProgressBatchRequest, request: Request, db: Session = Depends(get_db)):
+    """AI 정보/용어 학습 이벤트 목록을 한 트랜잭션으로 반영합니다. 통계 계산과 로그는 한 번만 수행합니다."""
+    if not batch.infos and not batch.terms:
+        raise HTTPException(status_code=400, detail="No learn events provided")
+    
+    # 같은 행에 대한 이벤트를 먼저 모아서 행마다 upsert 한 번으로 갱신
+    grouped: Dict[str, List[Any]] = {}
+    for event in batch.infos:
+        grouped.setdefault(event.date, []).append(event.info_index)
+    for event in batch.terms:
+        grouped.setdefault(f'__terms__{event.date}_{event.info_index}', []).append(event.term)
+    
+    try:
+        for date_key, items in grouped.items():
+            add_learned_items(db, session_id, date_key, items)
+        mark_active_dates(db, session_id, grouped.keys())
+        
+        # 통계 업데이트 (flush만 함, 성취까지 아래에서 한 번에 커밋)
+        stats = update_user_statistics(session_id, db)
+        
+        changed_metrics = {}
+        if batch.infos:
+            changed_metrics.update(total_learned=stats['total_learned'], streak_days=stats['streak_days'])
+        if batch.terms:
+            changed_metrics['total_terms_learned'] = stats['total_terms_learned']
+        new_achievements = evaluate_achievements(db, session_id, changed_metrics)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to update progress batch: {str(e)}")
+    
+    learned_dates = sorted({event.date for event in batch.infos} | {event.date for event in batch.terms})
+    log_activity(
+        db=db,
+        action="일괄 학습",
+        details=f"사용자가 AI 정보 {len(batch.infos)}개, 용어 {len(batch.terms)}개를 학습했습니다. (날짜: {', '.join(learned_dates)})",
+        log_type="user",
+        log_level="info",
+        username=session_id,
+        session_id=session_id,
+        ip_address=request.client.host if request.client else None
+    )
+    
+    return {
+        "message": "Progress batch updated successfully",
+        "info_events": len(batch.infos),
+        "term_events": len(batch.terms),
+        "achievement_gained": bool(new_achievements)
+    }
 
 def update_user_statistics(session_id: str, db: Session):
-    """사용자의 통계를 계산하고 업데이트합니다."""
+    """사용자의 통계를 계산하고 업데이트합니다. (flush만 함, 커밋은 호출자가 함)"""
+    # 기존 통계 가져오기 (행이 없으면 만들고 잠금)
+    # 학습 기록보다 먼저 잠가야 동시 요청이 늦게 읽은 기록으로 최신 통계를 덮어쓰지 않음
+    stats_progress = lock_stats_row(db, session_id)
+    
     # AI 정보 학습 기록 가져오기
     ai_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        ~UserProgress.date.like('__%')
+        ~UserProgress.date.startswith('__', autoescape=True)
     ).all()
     
     # 용어 학습 기록 가져오기
     terms_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        UserProgress.date.like('__terms__%')
+        UserProgress.date.startswith('__terms__', autoescape=True)
     ).all()
     
     total_learned = 0
@@ -147,50 +183,29 @@ def update_user_statistics(session_id: str, db: Session):
             try:
                 learned_data = json.loads(p.learned_info)
                 total_learned += len(learned_data)
-                learned_dates.append(p.date)
+                if learned_data:
+                    learned_dates.append(p.date)
             except json.JSONDecodeError:
                 continue
     
-    # 용어 학습 통계
+    # 용어 학습 통계 (용어만 학습한 날도 학습일)
     for p in terms_progress:
         if p.learned_info:
             try:
                 learned_data = json.loads(p.learned_info)
                 total_terms_learned += len(learned_data)
+                if learned_data:
+                    learned_dates.append(p.date)
             except json.JSONDecodeError:
                 continue
     
-    # 연속 학습일 계산
-    streak_days = 0
-    last_learned_date = None
-    
-    if learned_dates:
-        # 날짜 정렬
-        learned_dates.sort()
-        last_learned_date = learned_dates[-1]
-        
-        # 연속 학습일 계산
-        current_date = last_learned_date
-        streak_count = 0
-        
-        while current_date in learned_dates:
-            streak_count += 1
-            # 이전 날짜 계산
-            from datetime import datetime, timedelta
-            current_dt = datetime.strptime(current_date, '%Y-%m-%d')
-            current_dt = current_dt - timedelta(days=1)
-            current_date = current_dt.strftime('%Y-%m-%d')
-        
-        streak_days = streak_count
-    
-    # 기존 통계 가져오기
-    stats_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == '__stats__'
-    ).first()
+    # 연속 학습일 계산 (이미 읽은 날짜로 계산, 추가 조회 없음)
+    streaks = compute_streaks(active_day_ordinals(learned_dates), today_ordinal())
+    streak_days = streaks['current_streak']
+    last_learned_date = ordinal_to_str(streaks['last_learned_ordinal'])
     
     current_stats = {}
-    if stats_progress and stats_progress.stats:
+    if stats_progress.stats:
         try:
             current_stats = json.loads(stats_progress.stats)
         except json.JSONDecodeError:
@@ -202,43 +217,32 @@ def update_user_statistics(session_id: str, db: Session):
         'total_terms_learned': total_terms_learned,
         'total_terms_available': total_terms_learned,  # 프론트엔드 호환성
         'streak_days': streak_days,
-        'max_streak': current_stats.get('max_streak', streak_days),  # 최대 연속일
+        'max_streak': max(streaks['max_streak'], current_stats.get('max_streak', 0)),  # 최대 연속일
         'last_learned_date': last_learned_date,
         'quiz_score': current_stats.get('quiz_score', 0),
         'achievements': current_stats.get('achievements', [])
     }
     
     # 통계 저장
-    if stats_progress:
-        stats_progress.stats = json.dumps(new_stats)
-    else:
-        stats_progress = UserProgress(
-            session_id=session_id,
-            date='__stats__',
-            learned_info=None,
-            stats=json.dumps(new_stats)
-        )
-        db.add(stats_progress)
+    stats_progress.stats = json.dumps(new_stats)
     
-    db.commit()
+    db.flush()
+    return new_stats
 
-@router.get("/stats/{session_id}")
-def get_user_stats(session_id: str, db: Session = Depends(get_db)):
+@router.get("/stats/{session_id}", dependencies=[Depends(rate_limit("user_stats"))])
+@single_flight("user_stats", "session_id", "tz")
+def get_user_stats(session_id: str, tz: Optional[str] = None, db: Session = Depends(get_db)):
     progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id, 
         UserProgress.date == '__stats__'
     ).first()
     
-    # 오늘 날짜
-    from datetime import datetime
-    today = datetime.now().strftime('%Y-%m-%d')
+    # 오늘 날짜 (tz 또는 APP_TIMEZONE 기준)
+    today = today_str(tz)
     
     # 오늘 학습 데이터 가져오기
     today_ai_info = 0
     today_terms = 0
-    today_quiz_score = 0
-    today_quiz_correct = 0
-    today_quiz_total = 0
     
     # 오늘 AI 정보 학습 수
     today_progress = db.query(UserProgress).filter(
@@ -255,7 +259,7 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
     # 오늘 용어 학습 수
     today_terms_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__terms__{today}%')
+        UserProgress.date.startswith(f'__terms__{today}', autoescape=True)
     ).all()
     
     for term_progress in today_terms_progress:
@@ -265,63 +269,30 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
             except json.JSONDecodeError:
                 continue
     
-    # 오늘 퀴즈 점수 누적 계산
-    today_quiz_correct = 0
-    today_quiz_total = 0
-    today_quiz_score = 0
-    
-    # 오늘 날짜의 모든 퀴즈 기록 가져오기
-    today_quiz_progress_list = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__quiz__{today}%')
-    ).all()
-    
-    for quiz_progress in today_quiz_progress_list:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                today_quiz_correct += quiz_data.get('correct', 0)
-                today_quiz_total += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    # 오늘 누적 퀴즈 점수 계산
-    today_quiz_score = int((today_quiz_correct / today_quiz_total) * 100) if today_quiz_total > 0 else 0
-    
-    # 전체 누적 퀴즈 통계 계산
-    total_quiz_correct = 0
-    total_quiz_questions = 0
-    
-    # 모든 퀴즈 기록 가져오기
-    all_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like('__quiz__%')
-    ).all()
-    
-    for quiz_progress in all_quiz_progress:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                total_quiz_correct += quiz_data.get('correct', 0)
-                total_quiz_questions += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    # 전체 누적 퀴즈 점수 계산
-    cumulative_quiz_score = int((total_quiz_correct / total_quiz_questions) * 100) if total_quiz_questions > 0 else 0
+    # 오늘/전체 누적 퀴즈 점수 (집계 행 한 번 조회)
+    quiz_totals = get_quiz_totals(db, session_id, [today, ALL_TIME])
+    today_quiz_correct = quiz_totals[today]['correct']
+    today_quiz_total = quiz_totals[today]['total']
+    today_quiz_score = quiz_totals[today]['score']
+    total_quiz_correct = quiz_totals[ALL_TIME]['correct']
+    total_quiz_questions = quiz_totals[ALL_TIME]['total']
+    cumulative_quiz_score = quiz_totals[ALL_TIME]['score']
     
     # 총 AI 정보 수 계산 (모든 날짜의 AI 정보 수)
     total_ai_info_available = 0
     all_ai_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        ~UserProgress.date.like('__%')
+        ~UserProgress.date.startswith('__', autoescape=True)
     ).all()
     
+    learned_dates = []
     for p in all_ai_progress:
         if p.learned_info:
             try:
                 learned_data = json.loads(p.learned_info)
                 total_ai_info_available += len(learned_data)
+                if learned_data:
+                    learned_dates.append(p.date)
             except json.JSONDecodeError:
                 continue
     
@@ -329,7 +300,7 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
     total_terms_available = 0
     all_terms_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        UserProgress.date.like('__terms__%')
+        UserProgress.date.startswith('__terms__', autoescape=True)
     ).all()
     
     for p in all_terms_progress:
@@ -337,12 +308,20 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
             try:
                 learned_data = json.loads(p.learned_info)
                 total_terms_available += len(learned_data)
+                if learned_data:
+                    learned_dates.append(p.date)
             except json.JSONDecodeError:
                 continue
     
+    # 연속 학습일 (AI 정보/용어 학습 날짜로 계산, 날짜별 조회 없음)
+    streaks = compute_streaks(active_day_ordinals(learned_dates), today_ordinal(tz))
+    
     if progress and progress.stats:
         stats = json.loads(progress.stats)
         stats.update({
+            'achievements': get_unlocked_achievements(db, session_id),
+            'streak_days': streaks['current_streak'],
+            'max_streak': max(streaks['max_streak'], stats.get('max_streak', 0)),
             'today_ai_info': today_ai_info,
             'today_terms': today_terms,
             'today_quiz_score': today_quiz_score,
@@ -358,8 +337,9 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
     
     return {
         'total_learned': 0,
-        'streak_days': 0,
-        'last_learned_date': None,
+        'streak_days': streaks['current_streak'],
+        'max_streak': streaks['max_streak'],
+        'last_learned_date': ordinal_to_str(streaks['last_learned_ordinal']),
         'quiz_score': 0,
         'achievements': [],
         'today_ai_info': today_ai_info,
@@ -376,27 +356,14 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
 
 @router.post("/stats/{session_id}")
 def update_user_stats(session_id: str, stats: Dict[str, Any], db: Session = Depends(get_db)):
-    progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id, 
-        UserProgress.date == '__stats__'
-    ).first()
-    
-    if progress:
-        progress.stats = json.dumps(stats)
-    else:
-        progress = UserProgress(
-            session_id=session_id, 
-            date='__stats__', 
-            learned_info=None, 
-            stats=json.dumps(stats)
-        )
-        db.add(progress)
+    progress = lock_stats_row(db, session_id)
+    progress.stats = json.dumps(stats)
     
     db.commit()
     return {"message": "Stats updated successfully"}
 
 @router.post("/quiz-score/{session_id}")
-def update_quiz_score(session_id: str, score_data: dict, request: Request, db: Session = Depends(get_db)):
+def update_quiz_score(session_id: str, score_data: dict, request: Request, tz: Optional[str] = None, db: Session = Depends(get_db)):
     """퀴즈 점수를 업데이트합니다."""
     score = score_data.get('score', 0)
     total_questions = score_data.get('total_questions', 1)
@@ -404,49 +371,17 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
     # 점수 계산 (백분율)
     quiz_score = int((score / total_questions) * 100) if total_questions > 0 else 0
     
-    # 오늘 날짜
-    from datetime import datetime
-    today = datetime.now().strftime('%Y-%m-%d')
+    # 오늘 날짜 (tz 또는 APP_TIMEZONE 기준, 통계 조회와 같은 날짜 키)
+    today = today_str(tz)
     
-    # 오늘 퀴즈 세션 번호 찾기
-    existing_quiz_sessions = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__quiz__{today}%')
-    ).count()
+    # 응시 기록 추가 + 날짜별/전체 카운터 증가 (세션 번호는 DB 카운터에서 발급)
+    attempt = record_quiz_attempt(db, session_id, today, score, total_questions, quiz_score)
     
-    session_number = existing_quiz_sessions + 1
-    
-    # 오늘 퀴즈 상세 정보 저장 (세션 번호 포함)
-    today_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == f'__quiz__{today}_{session_number}'
-    ).first()
-    
-    quiz_detail = {
-        'correct': score,
-        'total': total_questions,
-        'score': quiz_score
-    }
-    
-    if today_quiz_progress:
-        today_quiz_progress.stats = json.dumps(quiz_detail)
-    else:
-        today_quiz_progress = UserProgress(
-            session_id=session_id,
-            date=f'__quiz__{today}_{session_number}',
-            learned_info=None,
-            stats=json.dumps(quiz_detail)
-        )
-        db.add(today_quiz_progress)
-    
-    # 기존 통계 가져오기
-    stats_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == '__stats__'
-    ).first()
+    # 기존 통계 가져오기 (행이 없으면 만들고 잠금)
+    stats_progress = lock_stats_row(db, session_id)
     
     current_stats = {}
-    if stats_progress and stats_progress.stats:
+    if stats_progress.stats:
         try:
             current_stats = json.loads(stats_progress.stats)
         except json.JSONDecodeError:
@@ -462,21 +397,13 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
     }
     
     # 통계 저장
-    if stats_progress:
-        stats_progress.stats = json.dumps(new_stats)
-    else:
-        stats_progress = UserProgress(
-            session_id=session_id,
-            date='__stats__',
-            learned_info=None,
-            stats=json.dumps(new_stats)
-        )
-        db.add(stats_progress)
+    stats_progress.stats = json.dumps(new_stats)
     
     db.commit()
     
-    # 성취 확인
-    check_achievements(session_id, db)
+    # 퀴즈 점수 지표에 대한 성취만 확인
+    evaluate_achievements(db, session_id, {'quiz_score': quiz_score})
+    db.commit()
     
     # 퀴즈 완료 활동 로그 기록
     log_activity(
@@ -490,89 +417,56 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
         ip_address=request.client.host if request.client else None
     )
     
-    return {"message": "Quiz score updated successfully", "quiz_score": quiz_score}
+    return {"message": "Quiz score updated successfully", "quiz_score": quiz_score, "session_number": attempt.session_number}
 
 @router.get("/achievements/{session_id}")
 def check_achievements(session_id: str, db: Session = Depends(get_db)):
     """사용자의 성취를 확인하고 업데이트합니다."""
-    stats = get_user_stats(session_id, db)
-    achievements = stats.get('achievements', [])
-    new_achievements = []
-    
-    # AI 정보 학습 성취
-    if stats['total_learned'] >= 1 and 'first_learn' not in achievements:
-        new_achievements.append('first_learn')
-        achievements.append('first_learn')
-    
-    if stats['total_learned'] >= 3 and 'beginner' not in achievements:
-        new_achievements.append('beginner')
-        achievements.append('beginner')
-    
-    if stats['total_learned'] >= 5 and 'learner' not in achievements:
-        new_achievements.append('learner')
-        achievements.append('learner')
-    
-    if stats['total_learned'] >= 10 and 'first_10' not in achievements:
-        new_achievements.append('first_10')
-        achievements.append('first_10')
-    
-    if stats['total_learned'] >= 20 and 'knowledge_seeker' not in achievements:
-        new_achievements.append('knowledge_seeker')
-        achievements.append('knowledge_seeker')
-    
-    if stats['total_learned'] >= 50 and 'first_50' not in achievements:
-        new_achievements.append('first_50')
-        achievements.append('first_50')
-    
-    # 용어 학습 성취
-    if stats.get('total_terms_learned', 0) >= 1 and 'first_term' not in achievements:
-        new_achievements.append('first_term')
-        achievements.append('first_term')
-    
-    if stats.get('total_terms_learned', 0) >= 5 and 'term_collector' not in achievements:
-        new_achievements.append('term_collector')
-        achievements.append('term_collector')
-    
-    if stats.get('total_terms_learned', 0) >= 10 and 'term_master' not in achievements:
-        new_achievements.append('term_master')
-        achievements.append('term_master')
-    
-    # 연속 학습 성취
-    if stats['streak_days'] >= 3 and 'three_day_streak' not in achievements:
-        new_achievements.append('three_day_streak')
-        achievements.append('three_day_streak')
-    
-    if stats['streak_days'] >= 7 and 'week_streak' not in achievements:
-        new_achievements.append('week_streak')
-        achievements.append('week_streak')
-    
-    if stats['streak_days'] >= 14 and 'two_week_streak' not in achievements:
-        new_achievements.append('two_week_streak')
-        achievements.append('two_week_streak')
-    
-    # 퀴즈 성취
-    if stats['quiz_score'] >= 60 and 'quiz_beginner' not in achievements:
-        new_achievements.append('quiz_beginner')
-        achievements.append('quiz_beginner')
-    
-    if stats['quiz_score'] >= 80 and 'quiz_master' not in achievements:
-        new_achievements.append('quiz_master')
-        achievements.append('quiz_master')
-    
-    if stats['quiz_score'] >= 100 and 'perfect_quiz' not in achievements:
-        new_achievements.append('perfect_quiz')
-        achievements.append('perfect_quiz')
-    
-    # 새로운 성취가 있으면 업데이트
-    if new_achievements:
-        stats['achievements'] = achievements
-        update_user_stats(session_id, stats, db)
+    # 저장된 통계 한 행으로 전체 지표를 한 번 평가 (이전 데이터 보정용)
+    stats_progress = db.query(UserProgress).filter(
+        UserProgress.session_id == session_id,
+        UserProgress.date == '__stats__'
+    ).first()
+    
+    stats = {}
+    if stats_progress and stats_progress.stats:
+        try:
+            stats = json.loads(stats_progress.stats)
+        except json.JSONDecodeError:
+            stats = {}
+    
+    evaluate_achievements(db, session_id, {metric: stats.get(metric, 0) for metric in ACHIEVEMENT_REGISTRY})
+    
+    # 학습/퀴즈 이벤트에서 해제되었지만 아직 알리지 않은 성취
+    new_achievements = pop_unnotified_achievements(db, session_id)
+    db.commit()
     
     return {
-        "current_achievements": achievements,
+        "current_achievements": get_unlocked_achievements(db, session_id),
         "new_achievements": new_achievements
     }
 
+@router.get("/streak/{session_id}")
+def get_streak(session_id: str, tz: Optional[str] = None, db: Session = Depends(get_db)):
+    """현재/최대 연속 학습일과 월별 활동 비트맵(1일 = 최하위 비트)을 반환합니다."""
+    days = load_active_days(db, session_id)
+    streaks = compute_streaks(days, today_ordinal(tz))
+    return {
+        'streak_days': streaks['current_streak'],
+        'max_streak': streaks['max_streak'],
+        'active_days': len(days),
+        'months': month_bitmaps(days)
+    }
+
+@router.get("/calendar/{session_id}")
+def get_activity_calendar(session_id: str, year: Optional[int] = None, encoding: str = "base64", tz: Optional[str] = None, db: Session = Depends(get_db)):
+    """연간 학습 달력을 반환합니다. base64: 46바이트 비트 배열(1월 1일 = 첫 바이트 최하위 비트), rle: 비활성부터 시작하는 구간 길이 목록"""
+    if encoding not in CALENDAR_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"Invalid encoding. Use one of: {', '.join(CALENDAR_ENCODINGS)}")
+    if year is None:
+        year = int(today_str(tz)[:4])
+    return encode_calendar(get_year_bits(db, session_id, year), year, encoding)
+
 @router.get("/period-stats/{session_id}")
 def get_period_stats(session_id: str, start_date: str, end_date: str, db: Session = Depends(get_db)):
     """특정 기간의 학습 통계를 가져옵니다."""
@@ -591,61 +485,51 @@ def get_period_stats(session_id: str, start_date: str, end_date: str, db: Sessio
         date_list.append(current_dt.strftime('%Y-%m-%d'))
         current_dt += timedelta(days=1)
     
+    # 기간 내 날짜별 퀴즈 집계 (한 번의 쿼리)
+    quiz_totals = get_quiz_totals(db, session_id, date_list)
+    
+    # 기간 내 AI 정보/용어 학습 기록 (날짜별 조회 대신 범위 조회 두 번)
+    ai_counts: Dict[str, int] = {}
+    for row in db.query(UserProgress.date, UserProgress.learned_info).filter(
+        UserProgress.session_id == session_id,
+        UserProgress.date >= start_date,
+        UserProgress.date <= end_date
+    ):
+        try:
+            ai_counts[row.date] = len(json.loads(row.learned_info)) if row.learned_info else 0
+        except json.JSONDecodeError:
+            continue
+    
+    day_after_end = (end_dt + timedelta(days=1)).strftime('%Y-%m-%d')
+    unique_terms_by_date: Dict[str, set] = {}
+    for row in db.query(UserProgress.date, UserProgress.learned_info).filter(
+        UserProgress.session_id == session_id,
+        UserProgress.date >= f'__terms__{start_date}',
+        UserProgress.date < f'__terms__{day_after_end}'
+    ):
+        if not row.learned_info:
+            continue
+        try:
+            terms = json.loads(row.learned_info)
+        except json.JSONDecodeError:
+            continue
+        unique_terms = unique_terms_by_date.setdefault(row.date[len('__terms__'):len('__terms__') + 10], set())
+        if isinstance(terms, list):
+            unique_terms.update(terms)  # 중복 제거
+        elif isinstance(terms, dict) and 'terms' in terms:
+            unique_terms.update(terms['terms'])  # term-progress 형식
+    
     period_data = []
     
     for date in date_list:
-        # AI 정보 학습 수 - 해당 날짜에 학습한 AI 정보 개수
-        ai_progress_list = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date == date,
-            UserProgress.info_index.isnot(None)  # AI 정보 학습 기록만
-        ).all()
-        
-        ai_count = len(ai_progress_list)  # 해당 날짜에 학습한 AI 정보 개수
-        
-        # 용어 학습 수 - 해당 날짜에 학습한 용어 개수
-        terms_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date.like(f'__terms__{date}%')
-        ).all()
-        
-        terms_count = 0
-        unique_terms = set()  # 중복 제거를 위한 set
-        
-        for term_progress in terms_progress:
-            if term_progress.learned_info:
-                try:
-                    terms = json.loads(term_progress.learned_info)
-                    if isinstance(terms, list):
-                        unique_terms.update(terms)  # 중복 제거
-                    elif isinstance(terms, dict) and 'terms' in terms:
-                        unique_terms.update(terms['terms'])  # term-progress 형식
-                except json.JSONDecodeError:
-                    continue
-        
-        terms_count = len(unique_terms)
+        ai_count = ai_counts.get(date, 0)  # 해당 날짜에 학습한 AI 정보 개수
+        terms_count = len(unique_terms_by_date.get(date, ()))
         
         # 퀴즈 점수
-        quiz_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date.like(f'__quiz__{date}%')
-        ).all()
-        
-        quiz_score = 0
-        quiz_correct = 0
-        quiz_total = 0
-        
-        for quiz_progress in quiz_progress:
-            if quiz_progress.stats:
-                try:
-                    quiz_data = json.loads(quiz_progress.stats)
-                    quiz_correct += quiz_data.get('correct', 0)
-                    quiz_total += quiz_data.get('total', 0)
-                except json.JSONDecodeError:
-                    continue
-        
-        if quiz_total > 0:
-            quiz_score = int((quiz_correct / quiz_total) * 100)
+        quiz_total_for_date = quiz_totals.get(date, {'correct': 0, 'total': 0, 'score': 0})
+        quiz_correct = quiz_total_for_date['correct']
+        quiz_total = quiz_total_for_date['total']
+        quiz_score = quiz_total_for_date['score']
         
         period_data.append({
             'date': date,
@@ -663,12 +547,11 @@ def get_period_stats(session_id: str, start_date: str, end_date: str, db: Sessio
         'total_days': len(period_data)
     }
 
-@router.get("/stats/{session_id}")
-def get_user_stats(session_id: str, db: Session = Depends(get_db)):
+@router.get("/stats/{session_id}", dependencies=[Depends(rate_limit("user_stats"))])
+@single_flight("user_stats", "session_id", "tz")
+def get_user_stats(session_id: str, tz: Optional[str] = None, db: Session = Depends(get_db)):
     """사용자 통계 정보를 조회합니다 (대시보드용)"""
-    from datetime import datetime, timedelta
-    
-    today = datetime.now().strftime('%Y-%m-%d')
+    today = today_str(tz)
     
     # 오늘 AI 정보 학습 수
     today_ai_progress = db.query(UserProgress).filter(
@@ -686,7 +569,7 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
     # 오늘 용어 학습 수
     today_terms_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__terms__{today}%')
+        UserProgress.date.startswith(f'__terms__{today}', autoescape=True)
     ).all()
     
     today_terms = 0
@@ -700,32 +583,16 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
                 continue
     today_terms = len(unique_terms)
     
-    # 오늘 퀴즈 점수
-    today_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__quiz__{today}%')
-    ).all()
-    
-    today_quiz_score = 0
-    today_quiz_correct = 0
-    today_quiz_total = 0
-    
-    for quiz_progress in today_quiz_progress:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                today_quiz_correct += quiz_data.get('correct', 0)
-                today_quiz_total += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    if today_quiz_total > 0:
-        today_quiz_score = int((today_quiz_correct / today_quiz_total) * 100)
+    # 오늘/누적 퀴즈 점수 (집계 행 한 번 조회)
+    quiz_totals = get_quiz_totals(db, session_id, [today, ALL_TIME])
+    today_quiz_correct = quiz_totals[today]['correct']
+    today_quiz_total = quiz_totals[today]['total']
+    today_quiz_score = quiz_totals[today]['score']
     
     # 총 학습량 계산
     all_ai_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        ~UserProgress.date.like('__%')
+        ~UserProgress.date.startswith('__', autoescape=True)
     ).all()
     
     total_learned = 0
@@ -739,7 +606,7 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
     # 총 용어 학습량
     all_terms_progress = db.query(UserProgress).filter(
         UserProgress.session_id == session_id,
-        UserProgress.date.like('__terms__%')
+        UserProgress.date.startswith('__terms__', autoescape=True)
     ).all()
     
     total_terms_learned = 0
@@ -754,48 +621,12 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
     total_terms_learned = len(all_unique_terms)
     
     # 누적 퀴즈 점수
-    all_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like('__quiz__%')
-    ).all()
+    cumulative_quiz_correct = quiz_totals[ALL_TIME]['correct']
+    cumulative_quiz_total = quiz_totals[ALL_TIME]['total']
+    cumulative_quiz_score = quiz_totals[ALL_TIME]['score']
     
-    cumulative_quiz_correct = 0
-    cumulative_quiz_total = 0
-    
-    for quiz_progress in all_quiz_progress:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                cumulative_quiz_correct += quiz_data.get('correct', 0)
-                cumulative_quiz_total += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    cumulative_quiz_score = 0
-    if cumulative_quiz_total > 0:
-        cumulative_quiz_score = int((cumulative_quiz_correct / cumulative_quiz_total) * 100)
-    
-    # 연속 학습일 계산 (간단한 구현)
-    streak_days = 0
-    current_date = datetime.now()
-    for i in range(30):  # 최근 30일 확인
-        check_date = (current_date - timedelta(days=i)).strftime('%Y-%m-%d')
-        day_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date == check_date
-        ).first()
-        
-        if day_progress and day_progress.learned_info:
-            try:
-                learned = json.loads(day_progress.learned_info)
-                if learned:  # 해당 날짜에 학습이 있으면
-                    streak_days += 1
-                else:
-                    break  # 학습이 없으면 연속 기록 중단
-            except json.JSONDecodeError:
-                break
-        else:
-            break
+    # 연속 학습일 계산 (날짜 목록 한 번 조회)
+    streaks = get_streak_summary(db, session_id, tz)
     
     return {
         "today_ai_info": today_ai_info,
@@ -808,5 +639,6 @@ def get_user_stats(session_id: str, db: Session = Depends(get_db)):
         "cumulative_quiz_score": cumulative_quiz_score,
         "cumulative_quiz_correct": cumulative_quiz_correct,
         "cumulative_quiz_total": cumulative_quiz_total,
-        "streak_days": streak_days
+        "streak_days": streaks['current_streak'],
+        "max_streak": streaks['max_streak']
     } 
\ No newline at end of file
@@ -0,0 +1,327 @@
+"""
+자동 백업 (로컬 디스크 저장 + 보존 정책)
+
+- 앱 안의 백그라운드 스레드가 cron 식(AUTO_BACKUP_SCHEDULE, 기본 매시 정각)에 맞춰 백업을 만듭니다.
+  AUTO_BACKUP_FULL_SCHEDULE(기본 매일 03:30)에는 전체 백업, 나머지는 AUTO_BACKUP_MODE(기본 incremental)로 만듭니다.
+  시간은 APP_TIMEZONE(없으면 서버 로컬 시간) 기준입니다.
+- 백업은 app/backup.py의 스트리밍 writer로 AUTO_BACKUP_DIR에 .json.gz로 바로 쓰고(임시 파일 → 이름 변경),
+  BackupHistory에 backup_type='auto'로 기록합니다. 요청 워커와 별도 스레드/DB 세션에서 실행됩니다.
+- gunicorn 워커가 여러 개여도 디렉터리의 잠금 파일로 한 프로세스만 실행하고, 같은 예약 시각은 한 번만 실행합니다.
+- 보존: 최근 AUTO_BACKUP_KEEP개 중 AUTO_BACKUP_MAX_AGE_DAYS일 이내 백업을 남기고 나머지 파일과 기록을 지웁니다.
+  가장 최근 백업과, 남기는 증분 백업이 의존하는 기준 백업(체인)은 기간이 지나도 남깁니다.
+
+AUTO_BACKUP=1일 때만 스케줄러가 켜집니다. 외부 cron에서 실행하려면:
+    python -m app.auto_backup [--mode full|incremental|differential] [--prune-only]
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from sqlalchemy.orm import Session
+
+from .backup import BACKUP_MODES, DEFAULT_BACKUP_TABLES, create_backup_file
+from .database import SessionLocal
+from .models import BackupHistory
+from .streaks import resolve_timezone
+
+AUTO_BACKUP_ENABLED = os.getenv("AUTO_BACKUP", "0") == "1"
+AUTO_BACKUP_DIR = os.path.abspath(os.getenv(
+    "AUTO_BACKUP_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backups")
+))
+AUTO_BACKUP_SCHEDULE = os.getenv("AUTO_BACKUP_SCHEDULE", "0 * * * *")
+AUTO_BACKUP_FULL_SCHEDULE = os.getenv("AUTO_BACKUP_FULL_SCHEDULE", "30 3 * * *")
+AUTO_BACKUP_MODE = os.getenv("AUTO_BACKUP_MODE", "incremental")
+AUTO_BACKUP_KEEP = int(os.getenv("AUTO_BACKUP_KEEP", "72"))
+AUTO_BACKUP_MAX_AGE_DAYS = float(os.getenv("AUTO_BACKUP_MAX_AGE_DAYS", "14"))
+AUTO_BACKUP_GZIP_LEVEL = int(os.getenv("AUTO_BACKUP_GZIP_LEVEL", "6"))
+
+LOCK_FILENAME = ".auto_backup.lock"
+
+
+class CronSchedule:
+    """분 시 일 월 요일 5필드 cron 식 (*, */n, a-b, a-b/n, 쉼표 목록). 요일은 0=일요일 (7도 일요일)"""
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression}")
+        self.expression = expression
+        self.minutes = self._parse(parts[0], 0, 59)
+        self.hours = self._parse(parts[1], 0, 23)
+        self.days = self._parse(parts[2], 1, 31)
+        self.months = self._parse(parts[3], 1, 12)
+        self.weekdays = {day % 7 for day in self._parse(parts[4], 0, 7)}
+        # cron 규칙: 일과 요일이 모두 지정되면 둘 중 하나만 맞아도 실행
+        self._day_or_weekday = parts[2] != "*" and parts[4] != "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            range_part, _, step = part.partition("/")
+            try:
+                step = int(step) if step else 1
+                if range_part == "*":
+                    start, end = low, high
+                elif "-" in range_part:
+                    start, end = (int(value) for value in range_part.split("-", 1))
+                else:
+                    start = int(range_part)
+                    end = high if step > 1 else start
+            except ValueError:
+                raise ValueError(f"Invalid cron field: {field}")
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        return (day or weekday) if self._day_or_weekday else (day and weekday)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """moment 이후(같은 분 제외) 처음 맞는 시각"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+@contextmanager
+def _process_lock(backup_dir: str):
+    """다른 프로세스가 백업 중이면 (False, None). 잠금 파일에는 마지막으로 실행한 예약 시각을 적어 둡니다."""
+    with open(os.path.join(backup_dir, LOCK_FILENAME), "a+") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False, None
+                return
+        try:
+            yield True, lock_file
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def stored_backup_path(backup: BackupHistory, backup_dir: str = AUTO_BACKUP_DIR) -> Optional[str]:
+    """서버에 저장된 자동 백업 파일 경로 (없으면 None)"""
+    if backup.backup_type != 'auto' or not backup.filename:
+        return None
+    path = os.path.join(backup_dir, os.path.basename(backup.filename))
+    return path if os.path.isfile(path) else None
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    # SQLite는 naive로 반환 (저장 값은 UTC)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def apply_retention(db: Session, backup_dir: str = AUTO_BACKUP_DIR, keep: int = AUTO_BACKUP_KEEP,
+                    max_age_days: float = AUTO_BACKUP_MAX_AGE_DAYS) -> List[str]:
+    """보존 정책을 넘은 자동 백업의 파일과 BackupHistory 행을 지우고 지운 파일명을 반환합니다."""
+    backups = db.query(BackupHistory).filter(BackupHistory.backup_type == 'auto').order_by(BackupHistory.id.desc()).all()
+    if not backups:
+        return []
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    by_id = {backup.id: backup for backup in backups}
+    kept = {backups[0].id}
+    for backup in backups[:keep]:
+        created_at = _as_utc(backup.created_at)
+        if created_at is None or created_at >= cutoff:
+            kept.add(backup.id)
+    # 남기는 백업의 기준 백업을 체인 끝(전체 백업)까지 남김
+    for backup_id in list(kept):
+        parent = by_id.get(by_id[backup_id].parent_id)
+        while parent is not None and parent.id not in kept:
+            kept.add(parent.id)
+            parent = by_id.get(parent.parent_id)
+
+    removed = []
+    for backup in backups:
+        if backup.id in kept:
+            continue
+        path = stored_backup_path(backup, backup_dir)
+        if path:
+            os.remove(path)
+        removed.append(backup.filename)
+        db.delete(backup)
+    db.commit()
+    return removed
+
+
+def run_auto_backup(mode: str = AUTO_BACKUP_MODE, backup_dir: str = AUTO_BACKUP_DIR,
+                    slot: Optional[str] = None) -> Optional[BackupHistory]:
+    """
+    백업 하나를 backup_dir에 gzip으로 쓰고 BackupHistory에 기록한 뒤 보존 정책을 적용합니다.
+    다른 프로세스가 실행 중이거나 같은 예약 시각(slot)을 이미 실행했으면 None을 반환합니다.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    with _process_lock(backup_dir) as (acquired, lock_file):
+        if not acquired:
+            return None
+        if slot:
+            lock_file.seek(0)
+            if lock_file.read().strip() == slot:
+                return None
+
+        db = SessionLocal()
+        path = None
+        try:
+            fd, path = tempfile.mkstemp(dir=backup_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=AUTO_BACKUP_GZIP_LEVEL) as out:
+                backup, _ = create_backup_file(
+                    db, out, DEFAULT_BACKUP_TABLES, mode, description=f"Auto {mode} backup", backup_type='auto'
+                )
+            backup.filename = f"{backup.filename[:-len('.json')]}_{backup.id}.json.gz"
+            backup.file_size = os.path.getsize(path)
+            final_path = os.path.join(backup_dir, backup.filename)
+            os.replace(path, final_path)
+            path = final_path
+            db.commit()
+            path = None
+            db.refresh(backup)
+            db.expunge(backup)
+        except Exception:
+            db.rollback()
+            if path and os.path.exists(path):
+                os.remove(path)
+            db.close()
+            raise
+
+        try:
+            removed = apply_retention(db, backup_dir)
+        except Exception as e:
+            db.rollback()
+            removed = []
+            print(f"⚠️ 자동 백업 보존 정책 적용 실패: {e}")
+        finally:
+            db.close()
+
+        if slot:
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(slot)
+            lock_file.flush()
+
+    print(f"💾 자동 백업 완료: {backup.filename} ({backup.backup_mode}, {backup.file_size} bytes)"
+          + (f", 보존 기간 지난 백업 {len(removed)}개 삭제" if removed else ""))
+    return backup
+
+
+class AutoBackupScheduler:
+    """cron 식에 맞춰 자동 백업을 실행하는 백그라운드 스레드"""
+
+    def __init__(self, schedule: str = AUTO_BACKUP_SCHEDULE, full_schedule: str = AUTO_BACKUP_FULL_SCHEDULE,
+                 mode: str = AUTO_BACKUP_MODE):
+        if mode not in BACKUP_MODES:
+            raise ValueError(f"Unknown backup mode: {mode}")
+        self.schedule = CronSchedule(schedule)
+        self.full_schedule = CronSchedule(full_schedule) if full_schedule.strip() else None
+        self.mode = mode
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def next_run(self, moment: datetime) -> Tuple[datetime, str]:
+        """다음 실행 시각과 방식. 두 일정이 겹치면 전체 백업"""
+        run_at, mode = self.schedule.next_after(moment), self.mode
+        if self.full_schedule is not None:
+            full_at = self.full_schedule.next_after(moment)
+            if full_at <= run_at:
+                run_at, mode = full_at, 'full'
+        return run_at, mode
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="auto-backup-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        tz = resolve_timezone()
+        last_run = None
+        while not self._stop.is_set():
+            now = datetime.now(tz)
+            run_at, mode = self.next_run(max(now, last_run) if last_run else now)
+            if self._stop.wait(max(0.0, (run_at - now).total_seconds())):
+                return
+            last_run = run_at
+            try:
+                run_auto_backup(mode, slot=run_at.isoformat())
+            except Exception as e:
+                print(f"⚠️ 자동 백업 실패: {e}")
+
+
+_scheduler: Optional[AutoBackupScheduler] = None
+
+
+def start_auto_backup_scheduler():
+    global _scheduler
+    if not AUTO_BACKUP_ENABLED:
+        return
+    try:
+        _scheduler = _scheduler or AutoBackupScheduler()
+    except ValueError as e:
+        print(f"⚠️ 자동 백업 설정 오류, 스케줄러를 시작하지 않습니다: {e}")
+        return
+    _scheduler.start()
+    print(f"💾 자동 백업 스케줄러 시작 ({AUTO_BACKUP_SCHEDULE}, 전체: {AUTO_BACKUP_FULL_SCHEDULE or '없음'}) → {AUTO_BACKUP_DIR}")
+
+
+def stop_auto_backup_scheduler():
+    if _scheduler is not None:
+        _scheduler.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="자동 백업을 한 번 실행합니다. (외부 cron용)")
+    parser.add_argument("--mode", choices=BACKUP_MODES, default=AUTO_BACKUP_MODE)
+    parser.add_argument("--dir", default=AUTO_BACKUP_DIR, help="백업 저장 디렉터리")
+    parser.add_argument("--prune-only", action="store_true", help="백업 없이 보존 정책만 적용")
+    args = parser.parse_args()
+
+    if args.prune_only:
+        db = SessionLocal()
+        try:
+            removed = apply_retention(db, args.dir)
+        finally:
+            db.close()
+        print(f"🧹 삭제한 백업 {len(removed)}개" + (f": {', '.join(removed)}" if removed else ""))
+        return
+    if run_auto_backup(args.mode, args.dir) is None:
+        print("⏭️ 다른 프로세스가 백업 중이라 건너뜁니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+백그라운드 작업 시작/중지 (두 진입점의 startup/shutdown 훅에서 호출)
+
+일별 집계(app/rollups.py)와 자동 백업(app/auto_backup.py) 모듈은 DB 엔진, 모델 등을 불러오므로
+startup 훅에서 바로 import하면 라우터 지연 로딩(app/routers.py)으로 줄인 부팅 시간이 다시 늘어납니다.
+여기서는 켜진 작업만 별도 스레드에서 import한 뒤 시작하므로, startup 훅은 스레드만 띄우고 바로 끝납니다.
+"""
+
+import os
+import sys
+import threading
+from typing import Optional
+
+ROLLUP_SCHEDULER_ENABLED = os.getenv("ROLLUP_SCHEDULER", "1") != "0"
+AUTO_BACKUP_ENABLED = os.getenv("AUTO_BACKUP", "0") == "1"
+
+_starter: Optional[threading.Thread] = None
+
+
+def _start_jobs():
+    try:
+        if ROLLUP_SCHEDULER_ENABLED:
+            from .rollups import start_rollup_scheduler
+            start_rollup_scheduler()
+        if AUTO_BACKUP_ENABLED:
+            from .auto_backup import start_auto_backup_scheduler
+            start_auto_backup_scheduler()
+    except Exception as e:
+        print(f"⚠️ 백그라운드 작업 시작 실패: {e}")
+
+
+def start_background_jobs():
+    global _starter
+    if not (ROLLUP_SCHEDULER_ENABLED or AUTO_BACKUP_ENABLED):
+        return
+    _starter = threading.Thread(target=_start_jobs, name="background-jobs-start", daemon=True)
+    _starter.start()
+
+
+def stop_background_jobs():
+    if _starter is not None:
+        _starter.join(timeout=10)
+    # 시작된(import된) 작업만 중지
+    for module_name, stop_name in (("rollups", "stop_rollup_scheduler"), ("auto_backup", "stop_auto_backup_scheduler")):
+        module = sys.modules.get(f"{__package__}.{module_name}")
+        if module is not None:
+            getattr(module, stop_name)()
@@ -0,0 +1,528 @@
+"""
+백업 파일 스트리밍 처리
+
+백업 파일 형식: {"backup_info": {...}, "data": {"테이블": [레코드, ...], ...}}  (gzip 압축 파일도 허용)
+
+복원은 파일 전체를 메모리에 올리지 않습니다.
+- 업로드 파일은 Starlette가 1MB를 넘으면 임시 파일로 옮겨 둡니다(SpooledTemporaryFile).
+- 그 파일을 청크 단위로 읽으면서 SHA-256을 계산하고 BACKUP_MAX_UPLOAD_MB를 넘으면 중단합니다.
+- JSON은 레코드 하나씩 디코딩하며, backup_info가 data보다 앞에 있어야 하므로 본문을 읽기 전에 헤더를 검증합니다.
+- 레코드는 RESTORE_BATCH_SIZE개씩 INSERT하므로 메모리 사용량은 백업 크기와 관계없이 일정합니다.
+
+증분/차등 백업
+- 백업마다 추가 전용 테이블(APPEND_ONLY_TABLES)의 마지막 created_at을 BackupHistory.watermarks에 기록합니다.
+- incremental은 직전 백업, differential은 직전 전체 백업의 워터마크 이후 행만 내보냅니다. 기준 백업이 없으면 전체 백업이 됩니다.
+  트랜잭션이 늦게 커밋된 행을 놓치지 않도록 BACKUP_WATERMARK_OVERLAP초(기본 300초) 겹쳐서 읽고, 겹친 행은 복원 시 id로 걸러냅니다.
+- 나머지 테이블은 행이 수정/삭제되므로 증분 백업에도 전체를 담습니다.
+- 복원: 전체 백업 → (차등 백업) → 증분 백업 순서로 적용합니다. 증분 파일의 추가 전용 테이블은 비우지 않고 덧붙입니다.
+  추가 전용 테이블에서 행을 직접 지운 경우 증분 복원에는 반영되지 않습니다.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from sqlalchemy import inspect, insert, select, text
+from sqlalchemy.orm import Session
+
+from .models import (
+    User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term,
+    QuizAttempt, QuizScoreTotal, UserAchievement
+)
+
+BACKUP_MAX_UPLOAD_BYTES = int(float(os.getenv("BACKUP_MAX_UPLOAD_MB", "1024")) * 1024 * 1024)
+RESTORE_BATCH_SIZE = int(os.getenv("RESTORE_BATCH_SIZE", "1000"))
+READ_CHUNK_SIZE = 64 * 1024
+EXPORT_BATCH_SIZE = int(os.getenv("BACKUP_EXPORT_BATCH_SIZE", "1000"))
+WATERMARK_OVERLAP = timedelta(seconds=int(os.getenv("BACKUP_WATERMARK_OVERLAP", "300")))
+
+BACKUP_VERSION = "1.1.0"
+BACKUP_MODES = ("full", "incremental", "differential")
+
+# 백업/복원 대상 테이블 모델
+BACKUP_TABLE_MODELS = {
+    'users': User,
+    'ai_info': AIInfo,
+    'user_progress': UserProgress,
+    'activity_logs': ActivityLog,
+    'quiz': Quiz,
+    'prompt': Prompt,
+    'base_content': BaseContent,
+    'term': Term,
+    'quiz_attempts': QuizAttempt,
+    'quiz_score_totals': QuizScoreTotal,
+    'user_achievements': UserAchievement,
+    'backup_history': BackupHistory
+}
+
+# 기본 백업 대상 (backup_history 제외)
+DEFAULT_BACKUP_TABLES = [
+    'users', 'ai_info', 'user_progress', 'quiz_attempts', 'quiz_score_totals', 'user_achievements',
+    'activity_logs', 'quiz', 'prompt', 'base_content', 'term'
+]
+
+# 행이 추가만 되는 테이블 (증분 백업은 워터마크 이후 행만 내보냄)
+APPEND_ONLY_TABLES = ('activity_logs', 'quiz_attempts')
+
+
+class BackupFormatError(ValueError):
+    """백업 파일 형식 오류 (400)"""
+
+
+class BackupTooLargeError(ValueError):
+    """업로드 크기 제한 초과 (413)"""
+
+
+class LimitedUploadRoute(APIRoute):
+    """
+    요청 본문이 BACKUP_MAX_UPLOAD_BYTES를 넘으면 본문(multipart)을 파싱하기 전에 413으로 거절합니다.
+    Content-Length가 없는 chunked 업로드도 받은 바이트 수를 세어 한도를 넘는 순간 중단합니다.
+    """
+
+    def get_route_handler(self):
+        original_handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            content_length = request.headers.get("content-length")
+            if content_length and content_length.isdigit() and int(content_length) > BACKUP_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {BACKUP_MAX_UPLOAD_BYTES} bytes")
+
+            received = 0
+            receive = request.receive
+
+            async def limited_receive():
+                nonlocal received
+                message = await receive()
+                received += len(message.get("body", b""))
+                if received > BACKUP_MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {BACKUP_MAX_UPLOAD_BYTES} bytes")
+                return message
+
+            return await original_handler(Request(request.scope, limited_receive))
+
+        return limited_handler
+
+
+class HashingReader(io.RawIOBase):
+    """읽은 바이트로 SHA-256과 크기를 계산하고 max_bytes를 넘으면 BackupTooLargeError를 냅니다."""
+
+    def __init__(self, fileobj, max_bytes: int = BACKUP_MAX_UPLOAD_BYTES):
+        self.fileobj = fileobj
+        self.max_bytes = max_bytes
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.fileobj.read(len(buffer))
+        if not data:
+            return 0
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise BackupTooLargeError(f"Backup exceeds {self.max_bytes} bytes")
+        self.sha256.update(data)
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class JSONStreamReader:
+    """텍스트 스트림에서 JSON 객체/배열 구조를 따라가며 값 하나씩 디코딩합니다."""
+
+    WHITESPACE = " \t\r\n"
+
+    def __init__(self, text_stream, chunk_size: int = READ_CHUNK_SIZE):
+        self.stream = text_stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """공백을 건너뛰고 다음 문자를 반환합니다. (끝이면 빈 문자열)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise BackupFormatError(f"Expected '{char}' but found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self):
+        """다음 JSON 값 하나를 디코딩합니다. 버퍼에 값이 다 들어올 때까지 더 읽습니다."""
+        if not self.peek():
+            raise BackupFormatError("Unexpected end of file")
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise BackupFormatError(f"Invalid JSON: {e.msg}") from e
+            # 버퍼 끝에서 끝난 숫자는 잘렸을 수 있으므로 더 읽어서 다시 디코딩
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _separator(self, close: str) -> bool:
+        """쉼표면 True, 닫는 괄호면 False"""
+        found = self.peek()
+        if found == ",":
+            self.pos += 1
+            return True
+        if found == close:
+            self.pos += 1
+            return False
+        raise BackupFormatError(f"Expected ',' or '{close}' but found '{found or 'EOF'}'")
+
+    def iter_object(self) -> Iterator[str]:
+        """객체의 키를 차례로 반환합니다. 호출자는 키마다 값을 하나 소비해야 합니다."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise BackupFormatError("Object key must be a string")
+            self.expect(":")
+            yield key
+            if not self._separator("}"):
+                return
+
+    def iter_array(self) -> Iterator:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if not self._separator("]"):
+                return
+
+    def skip_value(self):
+        """값을 버립니다. 배열/객체는 원소 단위로 읽어 메모리를 쓰지 않습니다."""
+        found = self.peek()
+        if found == "[":
+            for _ in self.iter_array():
+                pass
+        elif found == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        else:
+            self.value()
+
+
+class BackupStream:
+    """
+    업로드된 백업 파일을 스트리밍으로 읽습니다.
+    생성 시 backup_info를 읽어 검증하고, tables()로 (테이블, 레코드 iterator)를 차례로 받습니다.
+    """
+
+    def __init__(self, fileobj, max_bytes: int = BACKUP_MAX_UPLOAD_BYTES):
+        magic = fileobj.read(2)
+        fileobj.seek(0)
+        self.raw = HashingReader(fileobj, max_bytes)
+        binary = io.BufferedReader(self.raw, READ_CHUNK_SIZE)
+        if magic == b"\x1f\x8b":
+            binary = gzip.GzipFile(fileobj=binary, mode="rb")
+        self.reader = JSONStreamReader(io.TextIOWrapper(binary, encoding="utf-8"))
+        self._keys = self.reader.iter_object()
+        self.backup_info = self._read_header()
+
+    def _read_header(self) -> dict:
+        key = next(self._keys, None)
+        if key != "backup_info":
+            raise BackupFormatError("Invalid backup file format: backup_info must be the first key")
+        backup_info = self.reader.value()
+        if not isinstance(backup_info, dict):
+            raise BackupFormatError("Invalid backup file format: backup_info must be an object")
+        return backup_info
+
+    def tables(self) -> Iterator[Tuple[str, Iterator]]:
+        """data의 (테이블 이름, 레코드 iterator). 다 읽지 않은 레코드는 다음 테이블로 넘어가기 전에 버립니다."""
+        found_data = False
+        for key in self._keys:
+            if key != "data":
+                self.reader.skip_value()
+                continue
+            found_data = True
+            for table_name in self.reader.iter_object():
+                records = self.reader.iter_array()
+                yield table_name, records
+                for _ in records:
+                    pass
+        if not found_data:
+            raise BackupFormatError("Invalid backup file format: data is missing")
+        if self.reader.peek():
+            raise BackupFormatError("Unexpected data after backup object")
+
+    @property
+    def sha256(self) -> str:
+        return self.raw.sha256.hexdigest()
+
+    @property
+    def size(self) -> int:
+        return self.raw.size
+
+
+def _convert_dates(record: dict):
+    for key, value in record.items():
+        if key.endswith('_at') and isinstance(value, str):
+            try:
+                record[key] = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                pass
+
+
+def _insert_batch(db: Session, model, batch: List[Dict], append: bool):
+    if append:
+        # 증분 백업은 워터마크를 겹쳐 읽으므로 이미 있는 행은 건너뜀
+        ids = [record['id'] for record in batch if record.get('id') is not None]
+        existing = set(db.scalars(select(model.id).where(model.id.in_(ids)))) if ids else set()
+        batch = [record for record in batch if record.get('id') not in existing]
+    if batch:
+        db.execute(insert(model), batch)
+
+
+def restore_tables(db: Session, backup: BackupStream, preserve_user: Optional[dict] = None,
+                   batch_size: int = RESTORE_BATCH_SIZE) -> List[str]:
+    """
+    백업의 각 테이블을 비우고 레코드를 batch_size개씩 INSERT합니다. (커밋은 호출자가 함)
+    증분/차등 백업의 추가 전용 테이블은 비우지 않고 없는 행만 덧붙입니다.
+    레코드가 없는 테이블은 건드리지 않습니다. users를 복원할 때 preserve_user(현재 관리자)가
+    백업에 없으면 다시 추가해 복원 후에도 로그인이 유지되도록 합니다.
+    """
+    incremental = backup.backup_info.get('mode', 'full') != 'full'
+    restored_tables = []
+    backup_usernames = set()
+    backup_user_ids = set()
+
+    for table_name, records in backup.tables():
+        model = BACKUP_TABLE_MODELS.get(table_name)
+        if model is None:
+            continue
+        append = incremental and table_name in APPEND_ONLY_TABLES
+        columns = set(model.__table__.columns.keys())
+        batch: List[Dict] = []
+        started = False
+
+        for record in records:
+            if not isinstance(record, dict):
+                raise BackupFormatError(f"Invalid record in table '{table_name}'")
+            if not started:
+                if not append:
+                    db.query(model).delete()
+                started = True
+            record = {key: value for key, value in record.items() if key in columns}
+            _convert_dates(record)
+            if model is User:
+                backup_usernames.add(record.get('username'))
+                backup_user_ids.add(record.get('id'))
+            batch.append(record)
+            if len(batch) >= batch_size:
+                _insert_batch(db, model, batch, append)
+                batch = []
+        if batch:
+            _insert_batch(db, model, batch, append)
+        if started:
+            restored_tables.append(table_name)
+
+    if 'users' in restored_tables and preserve_user and preserve_user['username'] not in backup_usernames:
+        user_data = dict(preserve_user)
+        if user_data.get('id') in backup_user_ids:
+            user_data.pop('id')
+        # 체인 복원에서 다음 백업이 users를 다시 비울 수 있으므로 바로 INSERT
+        db.execute(insert(User), [user_data])
+
+    return restored_tables
+
+
+def order_backup_chain(backups: List[BackupStream]) -> List[BackupStream]:
+    """
+    전체 백업 1개와 증분/차등 백업들을 backup_id 순으로 정렬하고, 각 백업의 기준 백업이 앞에 있는지 확인합니다.
+    """
+    for backup in backups:
+        if backup.backup_info.get('mode', 'full') not in BACKUP_MODES:
+            raise BackupFormatError(f"Unknown backup mode: {backup.backup_info.get('mode')}")
+    full_backups = [backup for backup in backups if backup.backup_info.get('mode', 'full') == 'full']
+    if len(full_backups) != 1:
+        raise BackupFormatError("Backup chain must contain exactly one full backup")
+    incrementals = [backup for backup in backups if backup is not full_backups[0]]
+    if any(not isinstance(backup.backup_info.get('backup_id'), int) for backup in incrementals):
+        raise BackupFormatError("Incremental backup is missing backup_id")
+
+    chain = full_backups + sorted(incrementals, key=lambda backup: backup.backup_info['backup_id'])
+    applied = {full_backups[0].backup_info.get('backup_id')}
+    for backup in chain[1:]:
+        info = backup.backup_info
+        if info.get('parent_id') not in applied:
+            raise BackupFormatError(
+                f"Backup {info['backup_id']} is based on backup {info.get('parent_id')}, which is not in the chain"
+            )
+        applied.add(info['backup_id'])
+    return chain
+
+
+class HashingWriter:
+    """문자열을 UTF-8로 인코딩해 쓰면서 SHA-256과 크기를 계산합니다."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: str):
+        encoded = data.encode("utf-8")
+        self.fileobj.write(encoded)
+        self.sha256.update(encoded)
+        self.size += len(encoded)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _parse_watermark(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def reset_backup_chains(db: Session) -> int:
+    """
+    추가 전용 테이블을 비운(TRUNCATE 등) 트랜잭션 안에서 호출합니다. (커밋은 호출자가 함)
+    기존 백업의 워터마크를 지워 다음 증분/차등 백업이 전체 백업으로 새 체인을 시작하게 합니다.
+    그러지 않으면 id가 다시 1부터 시작한 새 행이 이전 체인에 붙어, 복원 시 기존 id와 겹쳐 버려집니다.
+    """
+    return db.query(BackupHistory).filter(BackupHistory.watermarks.isnot(None)).update(
+        {BackupHistory.watermarks: None}, synchronize_session=False
+    )
+
+
+def find_base_backup(db: Session, mode: str, backup_type: str = 'manual') -> Optional[BackupHistory]:
+    """같은 종류(manual/auto) 중 incremental은 워터마크가 있는 마지막 백업, differential은 마지막 전체 백업"""
+    if mode == 'full':
+        return None
+    query = db.query(BackupHistory).filter(
+        BackupHistory.watermarks.isnot(None),
+        BackupHistory.backup_type == backup_type
+    )
+    if mode == 'differential':
+        query = query.filter(BackupHistory.backup_mode == 'full')
+    return query.order_by(BackupHistory.id.desc()).first()
+
+
+def write_backup(db: Session, out: HashingWriter, tables: List[str], backup_info: dict,
+                 since: Dict[str, str]) -> Dict[str, str]:
+    """
+    백업 JSON을 테이블별 서버 측 커서로 EXPORT_BATCH_SIZE행씩 읽어 out에 씁니다.
+    since에 워터마크가 있는 추가 전용 테이블은 그 이후(겹침 포함) 행만 씁니다. 새 워터마크를 반환합니다.
+    """
+    watermarks = dict(since)
+    out.write('{"backup_info": ' + json.dumps(backup_info, ensure_ascii=False) + ', "data": {')
+    table_names = [table_name for table_name in tables if table_name in BACKUP_TABLE_MODELS]
+    for index, table_name in enumerate(table_names):
+        table = BACKUP_TABLE_MODELS[table_name].__table__
+        track = table_name in APPEND_ONLY_TABLES
+        query = select(table).order_by(table.c.id)
+        if track and since.get(table_name):
+            query = query.where(table.c.created_at >= _parse_watermark(since[table_name]) - WATERMARK_OVERLAP)
+
+        out.write((", " if index else "") + json.dumps(table_name) + ": [")
+        latest = None
+        result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for position, row in enumerate(result.mappings()):
+            record = dict(row)
+            if track and record['created_at'] is not None and (latest is None or record['created_at'] > latest):
+                latest = record['created_at']
+            out.write((", " if position else "") + json.dumps(record, default=_json_default, ensure_ascii=False))
+        out.write("]")
+        if latest is not None:
+            watermarks[table_name] = latest.isoformat()
+    out.write("}}")
+    return watermarks
+
+
+def create_backup_file(db: Session, fileobj, tables: List[str], mode: str = 'full', description: Optional[str] = None,
+                       user: Optional[User] = None, backup_type: str = 'manual') -> Tuple[BackupHistory, str]:
+    """
+    백업을 fileobj(바이너리)에 쓰고 BackupHistory 행을 추가합니다. (커밋은 호출자가 함)
+    기준 백업이 없으면 전체 백업으로 만듭니다. (BackupHistory, SHA-256)을 반환합니다.
+    """
+    if mode not in BACKUP_MODES:
+        raise ValueError(f"Unknown backup mode: {mode}")
+    base = find_base_backup(db, mode, backup_type)
+    if base is None:
+        mode = 'full'
+    since = json.loads(base.watermarks) if base else {}
+
+    now = datetime.now()
+    suffix = "" if mode == 'full' else f"_{mode}"
+    history = BackupHistory(
+        filename=f"ai_mastery_backup_{now.strftime('%Y%m%d_%H%M%S')}{suffix}.json",
+        backup_type=backup_type,
+        backup_mode=mode,
+        parent_id=base.id if base else None,
+        tables_included=json.dumps(tables),
+        description=description,
+        created_by=user.id if user else None,
+        created_by_username=user.username if user else None
+    )
+    db.add(history)
+    db.flush()  # 파일 헤더에 넣을 id
+
+    backup_info = {
+        "created_at": now.isoformat(),
+        "created_by": user.username if user else None,
+        "description": description or f"{backup_type.capitalize()} backup",
+        "tables_included": tables,
+        "version": BACKUP_VERSION,
+        "backup_id": history.id,
+        "mode": mode,
+        "parent_id": history.parent_id,
+        "since": {table_name: value for table_name, value in since.items() if table_name in tables}
+    }
+    out = HashingWriter(fileobj)
+    watermarks = write_backup(db, out, tables, backup_info, since)
+
+    history.watermarks = json.dumps(watermarks)
+    history.file_size = out.size
+    return history, out.sha256.hexdigest()
+
+
+def migrate_backup_history(engine):
+    """기존 DB에 증분 백업 컬럼과 created_at 인덱스를 추가합니다."""
+    existing = {column['name'] for column in inspect(engine).get_columns('backup_history')}
+    with engine.begin() as conn:
+        for name, definition in (("backup_mode", "VARCHAR DEFAULT 'full'"), ("parent_id", "INTEGER"), ("watermarks", "TEXT")):
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE backup_history ADD COLUMN {name} {definition}"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_activity_logs_created_at ON activity_logs (created_at)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_quiz_attempts_created_at ON quiz_attempts (created_at)"))
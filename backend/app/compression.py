@@ -0,0 +1,172 @@
+"""
+응답 압축 미들웨어 (gzip, brotli 설치 시 br 우선)
+
+- JSON/텍스트 등 압축 효과가 있는 Content-Type만 압축하고, 이미 Content-Encoding이 있는 응답
+  (압축 백업/내보내기 파일 등)과 204/304 응답은 그대로 통과시킵니다.
+- 본문이 한 번에 오는 응답은 COMPRESSION_MIN_SIZE(기본 1024바이트)보다 작으면 압축하지 않습니다.
+- StreamingResponse는 청크가 올 때마다 압축기에 넣어 나온 만큼만 내보내므로 전체 본문을 메모리에 모으지 않습니다.
+
+환경변수: COMPRESSION=0(비활성화), COMPRESSION_MIN_SIZE, GZIP_LEVEL(기본 6), BROTLI_QUALITY(기본 4)
+"""
+
+import os
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+COMPRESSION = os.getenv("COMPRESSION", "1") != "0"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Accept-Encoding 헤더를 {인코딩: q값}으로 파싱합니다."""
+    encodings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name] = q
+    return encodings
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    encodings = parse_accept_encoding(header)
+    wildcard = encodings.get("*", 0.0)
+    if brotli is not None and encodings.get("br", wildcard) > 0:
+        return "br"
+    if encodings.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.split(";")[0].strip().endswith(("+json", "+xml"))
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = gzip 헤더 포함
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if compressor is None:
+                headers = {name.lower(): value for name, value in start_message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+
+                skip = (
+                    start_message["status"] in (204, 304)
+                    or b"content-encoding" in headers
+                    or not is_compressible(content_type)
+                    or (not more_body and len(body) < self.minimum_size)
+                )
+                if skip:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                response_headers = [
+                    (name, value) for name, value in start_message.get("headers", [])
+                    if name.lower() not in (b"content-length", b"vary", b"etag")
+                ]
+                response_headers.append((b"content-encoding", encoding.encode("latin-1")))
+                vary = headers.get(b"vary")
+                response_headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                etag = headers.get(b"etag")
+                if etag:
+                    # 압축하면 바이트가 달라지므로 강한 ETag는 약한 ETag로 바꿈
+                    response_headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+
+                if not more_body:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    response_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+                    await send({**start_message, "headers": response_headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                await send({**start_message, "headers": response_headers})
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,18 +1,66 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL 환경변수가 설정되지 않았습니다. Railway 대시보드에서 환경변수를 설정해주세요.")
+# 엔진은 처음 사용할 때 만듭니다. (import만으로는 DB 드라이버를 불러오지 않고 DATABASE_URL이 없어도 실패하지 않음)
+_engine = None
+_engine_lock = threading.Lock()
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if not DATABASE_URL:
+                    raise ValueError("DATABASE_URL 환경변수가 설정되지 않았습니다. Railway 대시보드에서 환경변수를 설정해주세요.")
+
+                from sqlalchemy import create_engine
+
+                # 워커별 커넥션 풀 크기 (gunicorn.conf.py가 DB 연결 예산을 워커 수로 나눠 설정)
+                engine_options = {}
+                if os.getenv("DB_POOL_SIZE"):
+                    engine_options["pool_size"] = int(os.getenv("DB_POOL_SIZE"))
+                if os.getenv("DB_MAX_OVERFLOW"):
+                    engine_options["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW"))
+
+                _engine = create_engine(DATABASE_URL, **engine_options)
+                _session_factory.configure(bind=_engine)
+    return _engine
+
+def dispose_engine():
+    """fork 직후 호출. 부모 프로세스의 연결을 닫지 않고 풀만 비웁니다. (엔진을 만든 적이 없으면 아무 작업도 하지 않음)"""
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+def pool_status():
+    """커넥션 풀 상태 (DB 접근 없음, 엔진을 만들기 전이면 None)"""
+    if _engine is None:
+        return None
+    pool = _engine.pool
+    status = {"class": type(pool).__name__}
+    for key, method_name in (("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+        method = getattr(pool, method_name, None)
+        if callable(method):
+            status[key] = method()
+    return status
+
+def __getattr__(name):
+    # 기존 코드의 `from app.database import engine` 호환
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+
+def SessionLocal(**kwargs):
+    get_engine()
+    return _session_factory(**kwargs)
 
 Base = declarative_base()
 
@@ -21,4 +69,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
+        db.close()
@@ -0,0 +1,342 @@
+"""
+분석용 테이블 내보내기 (CSV.gz / Parquet)
+
+- 테이블을 서버 측 커서(yield_per)로 EXPORT_CHUNK_SIZE행(기본 50000)씩 읽어 청크 단위로 씁니다.
+  Parquet는 청크 하나가 row group 하나가 되며, 메모리 사용량은 청크 하나 크기로 일정합니다.
+- CSV는 gzip으로 압축하고 Parquet는 파일 안에서 EXPORT_PARQUET_COMPRESSION(기본 zstd)으로 압축합니다.
+  두 형식 모두 청크를 쓸 때마다 나온 바이트를 바로 내보내므로 HTTP 응답으로 스트리밍할 수 있습니다.
+- Parquet는 pyarrow가 설치된 경우에만 지원합니다. (선택 의존성, 처음 쓸 때 import)
+- flatten=True면 user_progress의 JSON 문자열(learned_info, stats)을 타입이 있는 컬럼으로 펼칩니다.
+- 바이너리 컬럼(HLL 스케치)은 내보내지 않고, users/backup_history는 대상이 아닙니다.
+
+CLI: python -m app.export activity_logs user_progress --format parquet --flatten --out ./exports
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, LargeBinary, Numeric, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    ActivityLog, UserProgress, QuizAttempt, QuizScoreTotal, UserAchievement, DailyActivityRollup,
+    AIInfo, Quiz, Prompt, BaseContent, Term
+)
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "50000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+EXPORT_TABLE_MODELS = {
+    'activity_logs': ActivityLog,
+    'user_progress': UserProgress,
+    'quiz_attempts': QuizAttempt,
+    'quiz_score_totals': QuizScoreTotal,
+    'user_achievements': UserAchievement,
+    'daily_activity_rollup': DailyActivityRollup,
+    'ai_info': AIInfo,
+    'quiz': Quiz,
+    'prompt': Prompt,
+    'base_content': BaseContent,
+    'term': Term
+}
+
+# 형식별 (Content-Type, 파일 확장자)
+EXPORT_FORMATS = {
+    'csv': ('application/gzip', '.csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet')
+}
+
+# since/until 필터에 쓰는 시간 컬럼 (앞에 있는 것 우선)
+TIME_COLUMNS = ('created_at', 'unlocked_at')
+
+Columns = List[Tuple[str, str]]  # (컬럼 이름, 'int' | 'float' | 'bool' | 'str' | 'datetime')
+
+_pyarrow = None
+
+
+def _load_pyarrow():
+    """(pyarrow, pyarrow.parquet). 설치되어 있지 않으면 None (import가 무거워 처음 쓸 때 불러옴)"""
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+            _pyarrow = (pyarrow, pyarrow.parquet)
+        except ImportError:
+            _pyarrow = False
+    return _pyarrow or None
+
+
+def parquet_available() -> bool:
+    return _load_pyarrow() is not None
+
+
+def _column_kind(column) -> Optional[str]:
+    column_type = column.type
+    if isinstance(column_type, LargeBinary):
+        return None
+    if isinstance(column_type, Boolean):
+        return 'bool'
+    if isinstance(column_type, Integer):
+        return 'int'
+    if isinstance(column_type, (Float, Numeric)):
+        return 'float'
+    if isinstance(column_type, DateTime):
+        return 'datetime'
+    return 'str'
+
+
+def _table_columns(table) -> Columns:
+    columns = []
+    for column in table.columns:
+        kind = _column_kind(column)
+        if kind is not None:
+            columns.append((column.name, kind))
+    return columns
+
+
+def _loads(value: Optional[str], expected: type):
+    if not value:
+        return None
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if isinstance(parsed, expected) else None
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# user_progress.stats('__stats__' 행)의 키와 타입 (app/api/user_progress.py)
+STATS_FIELDS = (
+    ('total_learned', 'int'),
+    ('total_terms_learned', 'int'),
+    ('streak_days', 'int'),
+    ('max_streak', 'int'),
+    ('last_learned_date', 'str'),
+    ('quiz_score', 'int'),
+)
+
+PROGRESS_FLAT_COLUMNS: Columns = [
+    ('id', 'int'),
+    ('session_id', 'str'),
+    ('date', 'str'),
+    ('row_type', 'str'),          # 'ai_info' | 'terms' | 'stats' | 기타 '__키__'
+    ('learned_date', 'str'),      # YYYY-MM-DD (ai_info/terms 행)
+    ('info_index', 'int'),        # terms 행의 정보 번호
+    ('learned_count', 'int'),
+    ('learned_items', 'str'),     # learned_info 항목을 '|'로 연결
+    *[(f'stats_{name}', kind) for name, kind in STATS_FIELDS],
+    ('stats_achievements_count', 'int'),
+    ('created_at', 'datetime'),
+]
+
+
+def _flatten_progress(row: dict) -> dict:
+    date_key = row['date'] or ''
+    row_type, learned_date, info_index = 'ai_info', date_key, None
+    if date_key == '__stats__':
+        row_type, learned_date = 'stats', None
+    elif date_key.startswith('__terms__'):
+        # '__terms__YYYY-MM-DD_n'
+        learned_date, _, index = date_key[len('__terms__'):].partition('_')
+        row_type, info_index = 'terms', _to_int(index)
+    elif date_key.startswith('__'):
+        row_type, learned_date = date_key.strip('_'), None
+
+    learned = _loads(row['learned_info'], list)
+    stats = _loads(row['stats'], dict)
+    flat = {
+        'id': row['id'],
+        'session_id': row['session_id'],
+        'date': row['date'],
+        'row_type': row_type,
+        'learned_date': learned_date,
+        'info_index': info_index,
+        'learned_count': len(learned) if learned is not None else None,
+        'learned_items': '|'.join(str(item) for item in learned) if learned else None,
+        'stats_achievements_count': len(stats.get('achievements') or []) if stats is not None else None,
+        'created_at': row['created_at'],
+    }
+    for name, kind in STATS_FIELDS:
+        value = stats.get(name) if stats is not None else None
+        flat[f'stats_{name}'] = _to_int(value) if kind == 'int' else (str(value) if value is not None else None)
+    return flat
+
+
+# JSON 문자열 컬럼을 펼치는 테이블: (펼친 컬럼, 변환 함수)
+FLATTENERS: Dict[str, Tuple[Columns, Callable[[dict], dict]]] = {
+    'user_progress': (PROGRESS_FLAT_COLUMNS, _flatten_progress),
+}
+
+
+def export_columns(table_name: str, flatten: bool = False) -> Columns:
+    if flatten and table_name in FLATTENERS:
+        return FLATTENERS[table_name][0]
+    return _table_columns(EXPORT_TABLE_MODELS[table_name].__table__)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite는 naive로 반환 (저장 값은 UTC)
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def iter_row_chunks(db: Session, table_name: str, flatten: bool = False, since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """기본 키 순서로 chunk_size행씩 dict 목록을 반환합니다. (서버 측 커서)"""
+    table = EXPORT_TABLE_MODELS[table_name].__table__
+    query = select(*[table.c[name] for name, _ in _table_columns(table)]).order_by(*table.primary_key.columns)
+    time_column = next((table.c[name] for name in TIME_COLUMNS if name in table.c), None)
+    if time_column is not None:
+        if since is not None:
+            query = query.where(time_column >= since)
+        if until is not None:
+            query = query.where(time_column < until)
+
+    flattener = FLATTENERS[table_name][1] if flatten and table_name in FLATTENERS else None
+    result = db.execute(query.execution_options(yield_per=chunk_size))
+    for partition in result.mappings().partitions():
+        rows = []
+        for row in partition:
+            record = dict(row)
+            for key, value in record.items():
+                if isinstance(value, datetime):
+                    record[key] = _as_utc(value)
+            rows.append(flattener(record) if flattener else record)
+        yield rows
+
+
+class _ChunkSink:
+    """쓰인 바이트를 모아 두었다가 drain()으로 꺼내는 쓰기 전용 파일 객체"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(chunks: Iterator[List[dict]], columns: Columns) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    names = [name for name, _ in columns]
+    with gzip.GzipFile(fileobj=sink, mode="wb", compresslevel=EXPORT_GZIP_LEVEL) as out:
+        text = io.StringIO()
+        csv.writer(text).writerow(names)
+        out.write(text.getvalue().encode("utf-8"))
+        for rows in chunks:
+            text = io.StringIO()
+            writer = csv.writer(text)
+            for row in rows:
+                writer.writerow([_csv_value(row.get(name)) for name in names])
+            out.write(text.getvalue().encode("utf-8"))
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def iter_parquet(chunks: Iterator[List[dict]], columns: Columns) -> Iterator[bytes]:
+    pa, pq = _load_pyarrow()
+    arrow_types = {
+        'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_(), 'str': pa.string(),
+        'datetime': pa.timestamp('us', tz='UTC')
+    }
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=EXPORT_PARQUET_COMPRESSION)
+    try:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema), row_group_size=max(len(rows), 1))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def iter_export(db: Session, table_name: str, fmt: str = 'csv', flatten: bool = False,
+                since: Optional[datetime] = None, until: Optional[datetime] = None,
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """table_name을 fmt('csv' | 'parquet') 파일 바이트로 청크마다 반환합니다."""
+    if table_name not in EXPORT_TABLE_MODELS:
+        raise ValueError(f"Unknown export table: {table_name}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == 'parquet' and not parquet_available():
+        raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+    columns = export_columns(table_name, flatten)
+    chunks = iter_row_chunks(db, table_name, flatten, since, until, chunk_size)
+    return iter_parquet(chunks, columns) if fmt == 'parquet' else iter_csv(chunks, columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석용 테이블을 CSV.gz 또는 Parquet 파일로 내보냅니다.")
+    parser.add_argument("tables", nargs="*", default=["activity_logs", "user_progress"], choices=sorted(EXPORT_TABLE_MODELS))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--flatten", action="store_true", help="learned_info/stats JSON을 컬럼으로 펼침")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="이 시각 이후 행만 (created_at 기준)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="이 시각 이전 행만")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    parser.add_argument("--out", default=".", help="저장 디렉터리")
+    args = parser.parse_args()
+
+    from .database import SessionLocal
+
+    os.makedirs(args.out, exist_ok=True)
+    db = SessionLocal()
+    try:
+        for table_name in args.tables:
+            path = os.path.join(args.out, table_name + EXPORT_FORMATS[args.format][1])
+            with open(path, "wb") as out:
+                for data in iter_export(db, table_name, args.format, args.flatten, args.since, args.until, args.chunk_size):
+                    out.write(data)
+            print(f"📦 {table_name} → {path} ({os.path.getsize(path):,} bytes)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+헬스체크 (liveness / readiness)
+
+- GET /health/live: 프로세스가 요청을 처리할 수 있는지만 봅니다. DB 등 I/O 없음.
+- GET /health/ready: 풀의 연결로 SELECT 1을 실행합니다. 결과는 HEALTH_CACHE_SECONDS(기본 5초) 동안 캐시하고,
+  동시에 들어온 probe는 진행 중인 확인 하나를 함께 기다립니다. HEALTH_TIMEOUT_SECONDS(기본 2초) 안에
+  끝나지 않으면(풀 대기, 연결 지연 포함) 준비 안 됨(503)으로 응답합니다.
+- GET /health: /health/ready와 같습니다. (기존 경로 호환)
+
+두 엔드포인트 모두 커넥션 풀 상태와 마지막 DB 확인 지연 시간을 함께 반환합니다.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+HEALTH_TIMEOUT_SECONDS = float(os.getenv("HEALTH_TIMEOUT_SECONDS", "2"))
+
+_STARTED_AT = time.monotonic()
+
+router = APIRouter()
+
+_probe_lock = threading.Lock()
+_probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-probe")
+_probe_future = None
+_last_probe: Optional[dict] = None
+_last_probe_at = 0.0
+_probe_sql = None
+
+
+def _pool_status() -> Optional[dict]:
+    # 부팅 시에는 DB 모듈을 불러오지 않으므로(app/routers.py) 이미 불러온 경우에만 확인
+    database = sys.modules.get(f"{__package__}.database")
+    return database.pool_status() if database is not None else None
+
+
+def _probe() -> dict:
+    global _probe_sql
+    from sqlalchemy import text
+    from .database import get_engine
+
+    if _probe_sql is None:
+        _probe_sql = text("SELECT 1")
+    started = time.perf_counter()
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(_probe_sql).scalar()
+        result = {"ready": True, "database": "connected"}
+    except Exception as e:
+        result = {"ready": False, "database": "disconnected", "error": str(e)}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    result["checked_at"] = datetime.now(timezone.utc).isoformat()
+    return result
+
+
+def _store(result: dict) -> dict:
+    global _last_probe, _last_probe_at
+    _last_probe = result
+    _last_probe_at = time.monotonic()
+    return result
+
+
+def check_readiness() -> dict:
+    """캐시된 DB 확인 결과, 오래되었으면 새로 확인 (진행 중인 확인이 있으면 그 결과를 기다림)"""
+    global _probe_future
+    cached = _last_probe
+    if cached is not None and time.monotonic() - _last_probe_at < HEALTH_CACHE_SECONDS:
+        return {**cached, "cached": True}
+
+    with _probe_lock:
+        if _probe_future is None or _probe_future.done():
+            _probe_future = _probe_executor.submit(_probe)
+            # 타임아웃 뒤에 끝난 확인도 결과를 캐시에 반영
+            _probe_future.add_done_callback(lambda done: _store(done.result()))
+        future = _probe_future
+    try:
+        return {**_store(future.result(timeout=HEALTH_TIMEOUT_SECONDS)), "cached": False}
+    except FutureTimeoutError:
+        # 진행 중인 확인은 계속 두고, 끝나기 전까지는 캐시된 타임아웃 결과를 반환
+        return {**_store({
+            "ready": False,
+            "database": "timeout",
+            "error": f"Database check exceeded {HEALTH_TIMEOUT_SECONDS}s",
+            "latency_ms": HEALTH_TIMEOUT_SECONDS * 1000,
+            "checked_at": datetime.now(timezone.utc).isoformat()
+        }), "cached": False}
+
+
+def _last_latency() -> Optional[float]:
+    return _last_probe["latency_ms"] if _last_probe else None
+
+
+@router.get("/health/live")
+async def liveness():
+    """프로세스 생존 확인 (I/O 없음)"""
+    return {
+        "status": "alive",
+        "uptime_seconds": round(time.monotonic() - _STARTED_AT, 1),
+        "pid": os.getpid(),
+        "pool": _pool_status(),
+        "last_probe_latency_ms": _last_latency()
+    }
+
+
+@router.get("/health/ready")
+@router.get("/health")
+def readiness():
+    """DB 연결 확인 (결과 캐시, 준비 안 됨이면 503)"""
+    result = check_readiness()
+    body = {
+        "status": "ready" if result["ready"] else "unready",
+        **{key: value for key, value in result.items() if key != "ready"},
+        "pool": _pool_status()
+    }
+    return JSONResponse(body, status_code=200 if result["ready"] else 503)
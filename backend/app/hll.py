@@ -0,0 +1,88 @@
+"""
+HyperLogLog 고유 개수 추정 (순수 파이썬)
+
+정밀도 p=14 (레지스터 16384개, 16KB)에서 표준 오차는 약 0.8%입니다.
+레지스터는 bytes로 직렬화해 DB에 저장하며, 두 스케치의 병합은 레지스터별 최댓값이므로
+여러 날/여러 워커의 스케치를 어떤 순서로 몇 번 합쳐도 결과가 같습니다.
+"""
+
+import hashlib
+import math
+from typing import Iterable, Optional
+
+DEFAULT_PRECISION = 14
+
+# 2^-r 조회 테이블 (64비트 해시이므로 r은 최대 64 - p + 1)
+_INVERSE_POWERS = [2.0 ** -r for r in range(66)]
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _alpha(m: int) -> float:
+    if m == 16:
+        return 0.673
+    if m == 32:
+        return 0.697
+    if m == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / m)
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.m = 1 << precision
+        if registers is not None and len(registers) != self.m:
+            raise ValueError(f"Invalid sketch size: {len(registers)} (expected {self.m})")
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.m)
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        """저장된 레지스터로 스케치를 만듭니다. 값이 없거나 크기가 다르면 빈 스케치"""
+        if not data or len(data) != 1 << precision:
+            return cls(precision)
+        return cls(precision, bytes(data))
+
+    @classmethod
+    def from_values(cls, values: Iterable[str], precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        sketch = cls(precision)
+        sketch.update(values)
+        return sketch
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    def add(self, value: str):
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[str]):
+        for value in values:
+            if value:
+                self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """레지스터별 최댓값으로 합칩니다. (자기 자신을 변경하고 반환)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def is_empty(self) -> bool:
+        return not any(self.registers)
+
+    def count(self) -> int:
+        m = self.m
+        estimate = _alpha(m) * m * m / sum(map(_INVERSE_POWERS.__getitem__, self.registers))
+        if estimate <= 2.5 * m:
+            # 작은 범위: 빈 레지스터 수로 선형 계수
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = m * math.log(m / zeros)
+        return int(round(estimate))
@@ -0,0 +1,191 @@
+"""
+콘텐츠 엔드포인트 조건부 요청 (ETag / Last-Modified / Cache-Control)
+
+ETag는 라우트가 읽는 테이블들의 버전(content_versions 테이블)과 요청 경로로 만듭니다.
+쓰기 핸들러는 커밋 전에 bump_content_version(db, 테이블...)을 호출해 같은 트랜잭션에서 버전을 올립니다.
+버전은 프로세스마다 CONTENT_VERSION_TTL초(기본 5초) 동안 캐시하므로, If-None-Match가 맞으면 DB를 전혀
+거치지 않고 304를 반환합니다. 같은 프로세스의 쓰기는 커밋 즉시 반영되고, 다른 워커의 쓰기는 최대 TTL 뒤에 반영됩니다.
+
+DB를 직접 수정했다면 `UPDATE content_versions SET version = version + 1, updated_at = now()`로 버전을 올려야
+클라이언트가 새 내용을 받습니다. HTTP_CACHE=0이면 검증자 없이 항상 본문을 반환합니다.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .database import get_engine
+from .models import ContentVersion
+
+HTTP_CACHE = os.getenv("HTTP_CACHE", "1") != "0"
+VERSION_TTL = float(os.getenv("CONTENT_VERSION_TTL", "5"))
+
+# 라우트별 (ETag에 반영할 테이블, Cache-Control)
+ROUTE_POLICIES: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "ai_info_by_date": (("ai_info",), "public, max-age=60, stale-while-revalidate=300"),
+    "ai_info_dates": (("ai_info",), "public, max-age=60, stale-while-revalidate=300"),
+    "quiz_by_topic": (("quiz",), "public, max-age=60, stale-while-revalidate=300"),
+    "term_all": (("term",), "public, max-age=300, stale-while-revalidate=600"),
+    "prompt_all": (("prompt",), "public, max-age=300, stale-while-revalidate=600"),
+    "base_content_all": (("base_content",), "public, max-age=300, stale-while-revalidate=600"),
+}
+
+# 버전을 관리하는 콘텐츠 테이블 (복원/전체 삭제 시 모두 올림)
+CONTENT_TABLES = ("ai_info", "quiz", "term", "prompt", "base_content")
+
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_PENDING_KEY = "content_versions_bumped"
+
+# 테이블별 (version, updated_at) 캐시
+_versions_cache: Optional[Dict[str, Tuple[int, Optional[datetime]]]] = None
+_versions_loaded_at = 0.0
+_versions_generation = 0
+_versions_lock = threading.Lock()
+
+
+def invalidate_content_versions():
+    """이 프로세스의 버전 캐시를 비웁니다."""
+    global _versions_cache, _versions_generation
+    with _versions_lock:
+        _versions_cache = None
+        _versions_generation += 1
+
+
+def bump_content_version(db: Session, *tables: str):
+    """쓰기 트랜잭션 안에서(커밋 전) 호출합니다. 커밋되면 이 프로세스의 버전 캐시를 비웁니다."""
+    now = datetime.now(timezone.utc)
+    insert = _INSERT_BY_DIALECT.get(db.bind.dialect.name)
+    for table in tables:
+        if insert is not None:
+            statement = insert(ContentVersion).values(table_name=table, version=1, updated_at=now)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=["table_name"],
+                set_={"version": ContentVersion.version + 1, "updated_at": now}
+            ))
+        else:
+            row = db.query(ContentVersion).filter(ContentVersion.table_name == table).with_for_update().first()
+            if row:
+                row.version += 1
+                row.updated_at = now
+            else:
+                db.add(ContentVersion(table_name=table, version=1, updated_at=now))
+    db.info.setdefault(_PENDING_KEY, set()).update(tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_PENDING_KEY, None):
+        invalidate_content_versions()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def get_content_versions() -> Dict[str, Tuple[int, Optional[datetime]]]:
+    global _versions_cache, _versions_loaded_at
+    cached = _versions_cache
+    if cached is not None and time.monotonic() - _versions_loaded_at < VERSION_TTL:
+        return cached
+
+    generation = _versions_generation
+    with get_engine().connect() as conn:
+        rows = conn.execute(select(ContentVersion.table_name, ContentVersion.version, ContentVersion.updated_at)).all()
+    versions = {}
+    for table_name, version, updated_at in rows:
+        if updated_at is not None:
+            # SQLite는 naive로 반환 (저장 값은 UTC)
+            updated_at = updated_at.replace(tzinfo=timezone.utc) if updated_at.tzinfo is None else updated_at.astimezone(timezone.utc)
+        versions[table_name] = (version, updated_at)
+
+    with _versions_lock:
+        # 읽는 동안 커밋된 쓰기가 있으면 이번 결과는 캐시하지 않음
+        if generation == _versions_generation:
+            _versions_cache = versions
+            _versions_loaded_at = time.monotonic()
+    return versions
+
+
+def content_version_key(*tables: str) -> Optional[tuple]:
+    """
+    tables의 현재 버전 (프로세스 캐시를 키로 쓸 때 사용, 다른 워커의 쓰기도 최대 TTL 뒤에 바뀜).
+    버전을 읽지 못하면 None을 반환하므로 호출자는 캐시하지 않아야 합니다.
+    """
+    try:
+        versions = get_content_versions()
+    except Exception as e:
+        print(f"⚠️ 콘텐츠 버전 조회 실패 ({', '.join(tables)}): {e}")
+        return None
+    return tuple(versions.get(table, (0, None)) for table in tables)
+
+
+def _validators(request: Request, tables: Sequence[str]) -> Tuple[str, Optional[datetime]]:
+    versions = get_content_versions()
+    parts = [f"{request.url.path}?{request.url.query}"]
+    last_modified = None
+    for table in tables:
+        version, updated_at = versions.get(table, (0, None))
+        parts.append(f"{table}:{version}:{updated_at.timestamp() if updated_at else ''}")
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    digest = hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+    # 압축 등으로 바이트가 달라져도 같은 내용이므로 약한 검증자
+    return f'W/"{digest}"', last_modified
+
+
+def _is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match는 약한 비교 (W/ 접두사 무시)
+        opaque = etag[2:] if etag.startswith("W/") else etag
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+                return True
+        return False
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(request: Request, route: str, build: Callable[[], Response]) -> Response:
+    """
+    route 정책의 검증자가 요청과 맞으면 DB 조회 없이 304를, 아니면 build()의 응답에 검증자 헤더를 붙여 반환합니다.
+    버전을 읽지 못하면(테이블 없음 등) 검증자 없이 build() 결과를 그대로 반환합니다.
+    """
+    if not HTTP_CACHE:
+        return build()
+    tables, cache_control = ROUTE_POLICIES[route]
+    try:
+        etag, last_modified = _validators(request, tables)
+    except Exception as e:
+        print(f"⚠️ 콘텐츠 버전 조회 실패 ({route}): {e}")
+        return build()
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if _is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response = build()
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
@@ -1,7 +1,23 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, Index, LargeBinary
 from sqlalchemy.sql import func
 from .database import Base
 
+# 스키마 버전 (단일 행, id=1). 값은 app/schema_version.py의 SCHEMA_VERSION과 비교
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# 콘텐츠 테이블별 버전 (쓰기 핸들러가 커밋 전에 1 올림, ETag/Last-Modified 계산용 - app/http_cache.py)
+class ContentVersion(Base):
+    __tablename__ = "content_versions"
+    
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
 # 사용자 모델 추가 (실제 Supabase 스키마에 맞춤)
 class User(Base):
     __tablename__ = "users"
@@ -27,7 +43,28 @@ class ActivityLog(Base):
     ip_address = Column(String, nullable=True)  # IP 주소
     user_agent = Column(Text, nullable=True)  # 사용자 에이전트
     session_id = Column(String, nullable=True)  # 세션 ID
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # 증분 백업 워터마크 조회
+
+# 일별 활동 집계 (app/rollups.py 스케줄러가 갱신, 지난 날짜는 finalized=True로 확정)
+class DailyActivityRollup(Base):
+    __tablename__ = "daily_activity_rollup"
+    
+    date = Column(String, primary_key=True)  # YYYY-MM-DD
+    active_sessions = Column(Integer, nullable=False, default=0)
+    quiz_completions = Column(Integer, nullable=False, default=0)
+    logins = Column(Integer, nullable=False, default=0)
+    learning_events = Column(Integer, nullable=False, default=0)
+    total_logs = Column(Integer, nullable=False, default=0)
+    error_logs = Column(Integer, nullable=False, default=0)
+    warning_logs = Column(Integer, nullable=False, default=0)
+    info_logs = Column(Integer, nullable=False, default=0)
+    success_logs = Column(Integer, nullable=False, default=0)
+    user_logs = Column(Integer, nullable=False, default=0)
+    system_logs = Column(Integer, nullable=False, default=0)
+    security_logs = Column(Integer, nullable=False, default=0)
+    session_sketch = Column(LargeBinary, nullable=True)  # 활성 세션 HyperLogLog 레지스터 (app/hll.py)
+    finalized = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 # 백업 히스토리 모델 추가
 class BackupHistory(Base):
@@ -41,6 +78,9 @@ class BackupHistory(Base):
     description = Column(Text, nullable=True)
     created_by = Column(Integer, nullable=True)  # 백업을 생성한 사용자 ID
     created_by_username = Column(String, nullable=True)  # 사용자명 (빠른 조회용)
+    backup_mode = Column(String, default='full')  # 'full', 'incremental', 'differential'
+    parent_id = Column(Integer, nullable=True)  # 증분/차등 백업의 기준 백업 ID
+    watermarks = Column(Text, nullable=True)  # JSON {테이블: 내보낸 마지막 created_at} (app/backup.py)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class AIInfo(Base):
@@ -83,6 +123,68 @@ class UserProgress(Base):
     stats = Column(Text)         # JSON 직렬화 문자열
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # upsert(ON CONFLICT) 대상 (app/progress.py)
+        Index("uq_user_progress_session_date", "session_id", "date", unique=True),
+    )
+
+# 퀴즈 응시 기록 (append-only, id는 DB 시퀀스로 생성)
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, index=True, nullable=False)
+    date = Column(String, index=True, nullable=False)  # YYYY-MM-DD
+    session_number = Column(Integer, nullable=False)  # 해당 날짜의 n번째 퀴즈
+    correct = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    score = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # 증분 백업 워터마크 조회
+
+# 퀴즈 누적 집계 (period: 'YYYY-MM-DD' 또는 전체 누적 '__all__')
+class QuizScoreTotal(Base):
+    __tablename__ = "quiz_score_totals"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False)
+    period = Column(String, nullable=False)
+    correct = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("uq_quiz_score_totals_session_period", "session_id", "period", unique=True),
+    )
+
+# 사용자 성취 해제 기록 (규칙은 app/achievements.py)
+class UserAchievement(Base):
+    __tablename__ = "user_achievements"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False)
+    achievement_id = Column(String, nullable=False)
+    metric = Column(String, nullable=True)  # 달성 기준 지표
+    notified = Column(Boolean, default=False, nullable=False)  # 사용자에게 알림 여부
+    unlocked_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("uq_user_achievements_session_achievement", "session_id", "achievement_id", unique=True),
+    )
+
+# 세션별 연간 학습 달력 (1월 1일 = 0번 비트, 46바이트 = 366비트)
+class ActivityCalendar(Base):
+    __tablename__ = "activity_calendars"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    bits = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("uq_activity_calendars_session_year", "session_id", "year", unique=True),
+    )
+
 class Prompt(Base):
     __tablename__ = "prompt"
     
@@ -0,0 +1,287 @@
+"""
+user_progress 학습 기록 / 퀴즈 응시 기록 쓰기 경로
+
+learned_info(JSON 배열 문자열)에 항목을 추가할 때 읽기-수정-쓰기 대신
+INSERT ... ON CONFLICT (session_id, date) DO UPDATE 한 문장으로 배열 합집합을 만듭니다.
+동시에 두 탭에서 클릭해도 행 잠금 아래에서 최신 값에 합쳐지므로 업데이트가 유실되지 않습니다.
+
+통계('__stats__' 행)도 같은 유니크 인덱스에 걸리므로 먼저 빈 행을 ON CONFLICT DO NOTHING으로
+보장한 뒤 행 잠금으로 읽어 갱신합니다. 새 세션의 첫 요청이 동시에 와도 INSERT가 충돌하지 않습니다.
+
+퀴즈 응시는 quiz_attempts에 append-only로 쌓고, 날짜별/전체 누적 정답 수는
+quiz_score_totals 카운터를 같은 방식의 upsert로 증가시켜 한 행만 읽으면 되도록 합니다.
+"""
+
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import UserProgress, QuizAttempt, QuizScoreTotal
+
+UNIQUE_INDEX_NAME = "uq_user_progress_session_date"
+
+# quiz_score_totals 전체 누적 행의 period 값
+ALL_TIME = "__all__"
+
+_UPSERT_SQL = {
+    "postgresql": text("""
+        INSERT INTO user_progress (session_id, date, learned_info, created_at)
+        VALUES (:session_id, :date, :items, now())
+        ON CONFLICT (session_id, date) DO UPDATE SET learned_info = (
+            SELECT (
+                COALESCE(user_progress.learned_info, '[]')::jsonb
+                || COALESCE(jsonb_agg(new_item.value ORDER BY new_item.ordinality), '[]'::jsonb)
+            )::text
+            FROM jsonb_array_elements(EXCLUDED.learned_info::jsonb) WITH ORDINALITY AS new_item(value, ordinality)
+            WHERE NOT COALESCE(user_progress.learned_info, '[]')::jsonb @> jsonb_build_array(new_item.value)
+        )
+    """),
+    "sqlite": text("""
+        INSERT INTO user_progress (session_id, date, learned_info, created_at)
+        VALUES (:session_id, :date, :items, CURRENT_TIMESTAMP)
+        ON CONFLICT (session_id, date) DO UPDATE SET learned_info = (
+            SELECT json_group_array(merged.item) FROM (
+                SELECT 0 AS part, old_item.key AS position, old_item.value AS item
+                FROM json_each(COALESCE(user_progress.learned_info, '[]')) AS old_item
+                UNION ALL
+                SELECT 1, new_item.key, new_item.value
+                FROM json_each(excluded.learned_info) AS new_item
+                WHERE new_item.value NOT IN (SELECT value FROM json_each(COALESCE(user_progress.learned_info, '[]')))
+                ORDER BY part, position
+            ) AS merged
+        )
+    """),
+}
+
+
+def add_learned_items(db: Session, session_id: str, date_key: str, items: List[Any]):
+    """date_key 행의 learned_info 배열에 items를 중복 없이 추가합니다. (커밋하지 않음)"""
+    items = list(dict.fromkeys(items))
+    if not items:
+        return
+
+    upsert = _UPSERT_SQL.get(db.bind.dialect.name)
+    if upsert is not None:
+        db.execute(upsert, {"session_id": session_id, "date": date_key, "items": json.dumps(items)})
+        return
+
+    # ON CONFLICT를 지원하지 않는 DB: 행 잠금 후 읽기-수정-쓰기
+    progress = db.query(UserProgress).filter(
+        UserProgress.session_id == session_id,
+        UserProgress.date == date_key
+    ).with_for_update().first()
+
+    if progress:
+        learned = json.loads(progress.learned_info) if progress.learned_info else []
+        added = [item for item in items if item not in learned]
+        if added:
+            progress.learned_info = json.dumps(learned + added)
+    else:
+        db.add(UserProgress(session_id=session_id, date=date_key, learned_info=json.dumps(items), stats=None))
+        db.flush()
+
+
+STATS_DATE = "__stats__"
+
+_STATS_ROW_SQL = text("""
+    INSERT INTO user_progress (session_id, date, learned_info, stats, created_at)
+    VALUES (:session_id, :date, NULL, NULL, CURRENT_TIMESTAMP)
+    ON CONFLICT (session_id, date) DO NOTHING
+""")
+
+
+def lock_stats_row(db: Session, session_id: str) -> UserProgress:
+    """세션의 '__stats__' 행을 (없으면 만들어서) 행 잠금으로 가져옵니다. (커밋하지 않음)
+
+    호출자는 반환된 행의 stats만 바꾸면 되고, 같은 세션의 동시 요청은 커밋까지 이 행에서 기다립니다.
+    """
+    params = {"session_id": session_id, "date": STATS_DATE}
+    if db.bind.dialect.name in _UPSERT_SQL:
+        db.execute(_STATS_ROW_SQL, params)
+    elif not db.query(UserProgress.id).filter_by(**params).first():
+        # ON CONFLICT를 지원하지 않는 DB: 세이브포인트 안에서 넣고, 먼저 만든 요청이 있으면 그 행을 사용
+        try:
+            with db.begin_nested():
+                db.add(UserProgress(session_id=session_id, date=STATS_DATE, learned_info=None, stats=None))
+        except IntegrityError:
+            pass
+
+    return db.query(UserProgress).filter_by(**params).with_for_update().populate_existing().one()
+
+
+def create_progress_indexes(engine):
+    """(session_id, date) 유니크 인덱스를 만듭니다. 기존 중복 행은 learned_info를 합쳐 하나로 정리합니다."""
+    with engine.begin() as conn:
+        duplicates = conn.execute(text("""
+            SELECT session_id, date FROM user_progress
+            GROUP BY session_id, date HAVING COUNT(*) > 1
+        """)).all()
+
+        for session_id, date_key in duplicates:
+            rows = conn.execute(text("""
+                SELECT id, learned_info, stats FROM user_progress
+                WHERE session_id = :session_id AND date = :date ORDER BY id
+            """), {"session_id": session_id, "date": date_key}).all()
+
+            merged = []
+            stats = None
+            for row in rows:
+                try:
+                    learned = json.loads(row.learned_info) if row.learned_info else []
+                except json.JSONDecodeError:
+                    learned = []
+                for item in learned:
+                    if item not in merged:
+                        merged.append(item)
+                stats = row.stats or stats
+
+            keep_id = rows[0].id
+            conn.execute(text("UPDATE user_progress SET learned_info = :learned, stats = :stats WHERE id = :id"), {
+                "learned": json.dumps(merged) if merged else rows[0].learned_info,
+                "stats": stats,
+                "id": keep_id
+            })
+            conn.execute(text("""
+                DELETE FROM user_progress
+                WHERE session_id = :session_id AND date = :date AND id <> :id
+            """), {"session_id": session_id, "date": date_key, "id": keep_id})
+
+        conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_INDEX_NAME} ON user_progress (session_id, date)"))
+
+
+_QUIZ_TOTAL_UPSERT_SQL = text("""
+    INSERT INTO quiz_score_totals (session_id, period, correct, total, attempts)
+    VALUES (:session_id, :period, :correct, :total, 1)
+    ON CONFLICT (session_id, period) DO UPDATE SET
+        correct = quiz_score_totals.correct + excluded.correct,
+        total = quiz_score_totals.total + excluded.total,
+        attempts = quiz_score_totals.attempts + 1
+    RETURNING attempts
+""")
+
+
+def _increment_quiz_total(db: Session, session_id: str, period: str, correct: int, total: int) -> int:
+    """집계 행을 원자적으로 증가시키고 증가 후 응시 횟수를 반환합니다."""
+    if db.bind.dialect.name in _UPSERT_SQL:
+        return db.execute(_QUIZ_TOTAL_UPSERT_SQL, {
+            "session_id": session_id, "period": period, "correct": correct, "total": total
+        }).scalar()
+
+    row = db.query(QuizScoreTotal).filter(
+        QuizScoreTotal.session_id == session_id,
+        QuizScoreTotal.period == period
+    ).with_for_update().first()
+    if not row:
+        row = QuizScoreTotal(session_id=session_id, period=period, correct=0, total=0, attempts=0)
+        db.add(row)
+    row.correct += correct
+    row.total += total
+    row.attempts += 1
+    db.flush()
+    return row.attempts
+
+
+def record_quiz_attempt(db: Session, session_id: str, date: str, correct: int, total: int, score: int) -> QuizAttempt:
+    """퀴즈 응시를 기록하고 날짜별/전체 카운터를 갱신합니다. (커밋하지 않음)
+
+    날짜별 카운터의 응시 횟수를 그대로 그날의 세션 번호로 사용하므로
+    동시에 제출해도 같은 번호가 두 번 나오지 않습니다.
+    """
+    session_number = _increment_quiz_total(db, session_id, date, correct, total)
+    _increment_quiz_total(db, session_id, ALL_TIME, correct, total)
+
+    attempt = QuizAttempt(
+        session_id=session_id,
+        date=date,
+        session_number=session_number,
+        correct=correct,
+        total=total,
+        score=score
+    )
+    db.add(attempt)
+    db.flush()
+    return attempt
+
+
+def get_quiz_totals(db: Session, session_id: str, periods: List[str]) -> Dict[str, dict]:
+    """요청한 period들의 {correct, total, attempts, score}를 한 번의 쿼리로 가져옵니다."""
+    rows = db.query(QuizScoreTotal).filter(
+        QuizScoreTotal.session_id == session_id,
+        QuizScoreTotal.period.in_(periods)
+    ).all()
+
+    totals = {period: {"correct": 0, "total": 0, "attempts": 0, "score": 0} for period in periods}
+    for row in rows:
+        totals[row.period] = {
+            "correct": row.correct,
+            "total": row.total,
+            "attempts": row.attempts,
+            "score": int((row.correct / row.total) * 100) if row.total > 0 else 0
+        }
+    return totals
+
+
+def migrate_legacy_quiz_progress(engine):
+    """user_progress의 '__quiz__{date}_{n}' 행을 quiz_attempts/quiz_score_totals로 옮깁니다.
+
+    옮긴 행은 삭제하므로 여러 번 실행해도 중복 집계되지 않습니다.
+    """
+    with engine.begin() as conn:
+        progress = UserProgress.__table__
+        rows = conn.execute(
+            select(progress.c.id, progress.c.session_id, progress.c.date, progress.c.stats, progress.c.created_at)
+            .where(progress.c.date.startswith("__quiz__", autoescape=True))
+            .order_by(progress.c.id)
+        ).all()
+        if not rows:
+            return 0
+
+        totals: Dict[tuple, List[int]] = {}
+        for row in rows:
+            date_part = row.date[len("__quiz__"):]
+            date_str, _, number = date_part.rpartition("_")
+            if not date_str:
+                date_str, number = date_part, "1"
+            try:
+                quiz_data = json.loads(row.stats) if row.stats else {}
+            except json.JSONDecodeError:
+                quiz_data = {}
+            correct = int(quiz_data.get("correct", 0))
+            total = int(quiz_data.get("total", 0))
+
+            conn.execute(QuizAttempt.__table__.insert().values(
+                session_id=row.session_id,
+                date=date_str,
+                session_number=int(number) if number.isdigit() else 1,
+                correct=correct,
+                total=total,
+                score=int(quiz_data.get("score", 0)),
+                created_at=row.created_at
+            ))
+            for period in (date_str, ALL_TIME):
+                counter = totals.setdefault((row.session_id, period), [0, 0, 0])
+                counter[0] += correct
+                counter[1] += total
+                counter[2] += 1
+
+        for (session_id, period), (correct, total, attempts) in totals.items():
+            existing = conn.execute(QuizScoreTotal.__table__.select().where(
+                QuizScoreTotal.session_id == session_id,
+                QuizScoreTotal.period == period
+            )).first()
+            if existing:
+                conn.execute(QuizScoreTotal.__table__.update().where(QuizScoreTotal.id == existing.id).values(
+                    correct=existing.correct + correct,
+                    total=existing.total + total,
+                    attempts=existing.attempts + attempts
+                ))
+            else:
+                conn.execute(QuizScoreTotal.__table__.insert().values(
+                    session_id=session_id, period=period, correct=correct, total=total, attempts=attempts
+                ))
+
+        conn.execute(UserProgress.__table__.delete().where(UserProgress.id.in_([row.id for row in rows])))
+        return len(rows)
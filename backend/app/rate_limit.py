@@ -0,0 +1,209 @@
+"""
+요청 제한(토큰 버킷)과 동일 요청 합치기(single-flight)
+
+인증 없이 열려 있거나, 클라이언트가 고른 session_id만으로 무거운 조회를 하는 엔드포인트용입니다.
+
+- rate_limit(route): 라우트별 토큰 버킷을 IP 단위, session_id 단위로 확인하는 의존성입니다.
+  버킷이 비면 429와 Retry-After 헤더로 응답합니다. 버킷은 프로세스 메모리에만 있으므로
+  gunicorn 워커마다 따로 셉니다.
+- single_flight(route, *params): 같은 인자(params)로 동시에 들어온 요청은 먼저 들어온 요청의 계산
+  하나를 함께 기다리고 같은 결과(또는 예외)를 받습니다. 결과는 캐시하지 않으므로 계산이 끝난 뒤의
+  요청은 새로 계산합니다. 동기(def) 핸들러에만 씁니다.
+
+한도는 "요청 수/초" 형식이며 (예: 30/60 = 60초에 30회, 처음부터 30회까지 연속 허용)
+RATE_LIMIT_<라우트>_IP, RATE_LIMIT_<라우트>_SESSION 환경 변수로 바꿀 수 있습니다. 0이면 해당 버킷을 끕니다.
+RATE_LIMIT=0이면 요청 제한 전체를 끕니다.
+
+클라이언트 IP는 기본적으로 연결 주소(request.client.host)입니다. X-Forwarded-For의 왼쪽 값은 클라이언트가
+마음대로 넣을 수 있으므로 쓰지 않습니다. 프록시(Railway 등) 뒤에서는 RATE_LIMIT_TRUSTED_PROXIES에
+신뢰하는 프록시 단계 수를 넣으면, 그 프록시들이 오른쪽에 덧붙인 값 중 가장 바깥쪽을 클라이언트로 봅니다.
+(프록시 한 단계면 가장 오른쪽 값)
+"""
+
+import functools
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "1") != "0"
+# X-Forwarded-For 오른쪽에서 신뢰하는 프록시 단계 수 (0이면 헤더를 보지 않음)
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+RATE_LIMIT_PRUNE_SECONDS = 60.0
+# 거절 로그는 라우트별로 이 간격마다 누적 건수 한 줄만 출력
+RATE_LIMIT_LOG_SECONDS = 60.0
+
+# 라우트별 기본 한도 {라우트: {"ip": "요청 수/초", "session": "요청 수/초"}}
+DEFAULT_RATE_LIMITS = {
+    "logs_simple": {"ip": "30/60"},
+    "logs_test": {"ip": "20/60"},
+    "terms_quiz": {"ip": "120/60", "session": "20/60"},
+    "user_stats": {"ip": "240/60", "session": "60/60"},
+}
+
+
+def _parse_limit(value: str) -> Optional[Tuple[float, float]]:
+    """"30/60" -> (용량 30, 초당 0.5개 충전), "0"이면 None"""
+    value = value.strip()
+    if value in ("", "0"):
+        return None
+    count, _, seconds = value.partition("/")
+    capacity = float(count)
+    if capacity <= 0:
+        return None
+    return capacity, capacity / float(seconds or 1)
+
+
+def _load_limits() -> Dict[str, Dict[str, Tuple[float, float]]]:
+    limits = {}
+    for route, scopes in DEFAULT_RATE_LIMITS.items():
+        limits[route] = {}
+        for scope in ("ip", "session"):
+            value = os.getenv(f"RATE_LIMIT_{route.upper()}_{scope.upper()}", scopes.get(scope, "0"))
+            parsed = _parse_limit(value)
+            if parsed is not None:
+                limits[route][scope] = parsed
+    return limits
+
+
+RATE_LIMITS = _load_limits()
+
+# (라우트, 범위, 키) -> [남은 토큰, 마지막 갱신 시각]
+_buckets: Dict[Tuple[str, str, str], list] = {}
+_buckets_lock = threading.Lock()
+_last_prune = time.monotonic()
+
+# 라우트 -> [누적 거절 수, 마지막 로그 이후 거절 수, 마지막 로그 시각]
+_rejections: Dict[str, list] = {}
+
+
+def _prune(now: float):
+    """가득 찬 것과 같아진(오래 안 쓴) 버킷 정리"""
+    global _last_prune
+    _last_prune = now
+    for key, bucket in list(_buckets.items()):
+        capacity, refill = RATE_LIMITS[key[0]][key[1]]
+        if bucket[0] + (now - bucket[1]) * refill >= capacity:
+            del _buckets[key]
+    if len(_buckets) >= RATE_LIMIT_MAX_KEYS:
+        # 키가 너무 많으면(IP 위조 등) 가장 오래 안 쓴 절반을 버림 (그 키들은 한도가 초기화됨)
+        for key in sorted(_buckets, key=lambda key: _buckets[key][1])[:len(_buckets) // 2]:
+            del _buckets[key]
+
+
+def _take(route: str, scope: str, key: str) -> float:
+    """토큰 하나를 씁니다. 허용이면 0, 아니면 다음 토큰까지 기다릴 초"""
+    capacity, refill = RATE_LIMITS[route][scope]
+    now = time.monotonic()
+    with _buckets_lock:
+        if now - _last_prune > RATE_LIMIT_PRUNE_SECONDS or len(_buckets) >= RATE_LIMIT_MAX_KEYS:
+            _prune(now)
+        bucket = _buckets.get((route, scope, key))
+        if bucket is None:
+            bucket = _buckets[(route, scope, key)] = [capacity, now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / refill
+
+
+def _record_rejection(route: str):
+    now = time.monotonic()
+    with _buckets_lock:
+        counter = _rejections.setdefault(route, [0, 0, float("-inf")])
+        counter[0] += 1
+        counter[1] += 1
+        if now - counter[2] < RATE_LIMIT_LOG_SECONDS:
+            return
+        total, recent = counter[0], counter[1]
+        counter[1], counter[2] = 0, now
+    print(f"🚫 요청 제한: {route} 최근 {recent}건 거절 (누적 {total}건)")
+
+
+def rejection_counts() -> Dict[str, int]:
+    """라우트별 누적 429 응답 수 (프로세스별)"""
+    with _buckets_lock:
+        return {route: counter[0] for route, counter in _rejections.items()}
+
+
+def client_ip(request: Request) -> str:
+    client = request.client.host if request.client else "unknown"
+    if RATE_LIMIT_TRUSTED_PROXIES > 0:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        # 신뢰하는 프록시가 덧붙인 값만 사용, 그보다 짧으면 프록시를 거치지 않은 요청
+        if len(forwarded) >= RATE_LIMIT_TRUSTED_PROXIES:
+            return forwarded[-RATE_LIMIT_TRUSTED_PROXIES]
+    return client
+
+
+def rate_limit(route: str):
+    """라우트 의존성: dependencies=[Depends(rate_limit("terms_quiz"))]"""
+    scopes = RATE_LIMITS[route]
+
+    async def check(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        keys = []
+        if "ip" in scopes:
+            keys.append(("ip", client_ip(request)))
+        session_id = request.path_params.get("session_id")
+        if "session" in scopes and session_id:
+            keys.append(("session", session_id))
+        for scope, key in keys:
+            wait = _take(route, scope, key)
+            if wait:
+                _record_rejection(route)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Too many requests ({scope}), retry after {math.ceil(wait)}s",
+                    headers={"Retry-After": str(math.ceil(wait))}
+                )
+
+    return check
+
+
+# (라우트, 인자...) -> 진행 중인 계산
+_inflight: Dict[tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def single_flight(route: str, *params: str):
+    """
+    동기 핸들러 데코레이터. params에 적은 인자가 같은 동시 요청은 계산 하나를 공유합니다.
+    FastAPI가 모든 인자를 키워드로 넘기므로 kwargs에서 키를 만듭니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            key = (route, *(kwargs.get(param) for param in params))
+            with _inflight_lock:
+                future = _inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = _inflight[key] = Future()
+            if not leader:
+                return future.result()
+
+            try:
+                result = func(**kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with _inflight_lock:
+                    del _inflight[key]
+
+        return wrapper
+
+    return decorator
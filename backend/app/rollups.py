@@ -0,0 +1,455 @@
+"""
+일별 활동 집계 (daily_activity_rollup)
+
+관리자 통계 화면이 볼 때마다 activity_logs 전체를 다시 세지 않도록
+날짜별 집계 행을 미리 만들어 둡니다.
+
+- 앱 안의 백그라운드 스레드가 ROLLUP_INTERVAL_SECONDS(기본 60초)마다 오늘 행을 갱신하고
+  아직 확정되지 않은 지난 날짜를 확정(finalized)합니다. gunicorn 워커가 여러 개여도 잠금 파일
+  (ROLLUP_LOCK_FILE)을 잡은 프로세스 하나만 갱신/확정하고, 나머지 워커는 자기 프로세스의 활성 세션
+  스케치만 오늘 행에 병합합니다. 잠금은 같은 호스트 안에서만 유효합니다.
+- 조회 쪽(get_rollups)은 이 프로세스에서 최근 갱신이 오래되었으면 직접 한 번 갱신하므로
+  스케줄러를 끈 환경(ROLLUP_SCHEDULER=0)에서도 값이 비지 않습니다. 단, 요청 안에서는 지난 날짜를
+  ROLLUP_REQUEST_FINALIZE_DAYS(기본 2)일까지만 확정합니다. 처음 배포 시 과거 전체 확정(backfill_rollups)은
+  init_db.py와 스케줄러가 맡습니다.
+- 날짜 경계는 APP_TIMEZONE(없으면 서버 로컬 시간) 기준입니다.
+
+활성 세션 수는 날짜별 HyperLogLog 스케치(session_sketch)로 관리합니다.
+로그를 쓸 때 이 프로세스의 오늘 스케치에 세션을 추가하고, 갱신 주기마다 저장된 스케치에 병합합니다.
+지난 날짜는 확정할 때 그날 로그의 세션 목록으로 스케치를 다시 만들고 정확한 수를 active_sessions에 기록합니다.
+7/30/90일 같은 기간의 활성 세션 수는 스케치들을 병합해 추정하며, exact=True면 로그에서 직접 셉니다.
+"""
+
+import math
+import os
+import tempfile
+import threading
+import time as time_module
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from sqlalchemy import case, distinct, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .hll import HyperLogLog, DEFAULT_PRECISION
+from .models import ActivityLog, DailyActivityRollup
+from .streaks import resolve_timezone, today_ordinal
+
+ROLLUP_INTERVAL_SECONDS = int(os.getenv("ROLLUP_INTERVAL_SECONDS", "60"))
+ROLLUP_SCHEDULER_ENABLED = os.getenv("ROLLUP_SCHEDULER", "1") != "0"
+# 요청 처리 중 한 번에 확정할 지난 날짜 수 (밀린 날짜는 다음 갱신에서 이어서 확정)
+ROLLUP_REQUEST_FINALIZE_DAYS = int(os.getenv("ROLLUP_REQUEST_FINALIZE_DAYS", "2"))
+# 갱신 담당 프로세스를 정하는 잠금 파일 (같은 호스트의 워커들이 공유)
+ROLLUP_LOCK_FILE = os.getenv("ROLLUP_LOCK_FILE", os.path.join(tempfile.gettempdir(), "rollup_scheduler.lock"))
+
+LOGIN_ACTIONS = ("로그인",)
+QUIZ_ACTIONS = ("퀴즈 완료",)
+LEARNING_ACTIONS = ("AI 정보 학습", "용어 학습", "일괄 학습")
+
+LOG_LEVELS = ("error", "warning", "info", "success")
+LOG_TYPES = ("user", "system", "security")
+
+COUNTER_COLUMNS = (
+    "active_sessions", "quiz_completions", "logins", "learning_events", "total_logs",
+    *(f"{level}_logs" for level in LOG_LEVELS),
+    *(f"{log_type}_logs" for log_type in LOG_TYPES),
+)
+
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# 표준 오차 1.04 / sqrt(2^p)
+SKETCH_STANDARD_ERROR = round(1.04 / math.sqrt(1 << DEFAULT_PRECISION), 4)
+
+_last_refresh = 0.0
+_refresh_lock = threading.Lock()
+
+# 아직 DB에 병합하지 않은 이 프로세스의 날짜별 활성 세션 스케치
+_pending_sketches: Dict[str, HyperLogLog] = {}
+_pending_lock = threading.Lock()
+
+# (기간 일수, 오늘) -> ((확정 행 수, 마지막 수정 시각), 확정된 날짜들만 병합한 스케치)
+# 다른 워커가 확정하거나 지운 행은 수/수정 시각이 달라지므로 다시 병합
+_window_cache: Dict[tuple, tuple] = {}
+# (기간 일수, 오늘) -> (갱신 시각, 추정값)
+_count_cache: Dict[tuple, tuple] = {}
+
+
+def invalidate_rollups():
+    """로그가 대량 삭제/복원되면 호출하여 다음 조회 때 다시 집계하도록 합니다."""
+    global _last_refresh
+    _last_refresh = 0.0
+    with _pending_lock:
+        _pending_sketches.clear()
+    _window_cache.clear()
+    _count_cache.clear()
+
+
+def track_active_session(session_id: Optional[str]):
+    """로그 작성 시 호출. 오늘 활성 세션 스케치에 세션을 추가합니다. (DB 접근 없음)"""
+    if not session_id:
+        return
+    day = date.fromordinal(today_ordinal()).isoformat()
+    with _pending_lock:
+        sketch = _pending_sketches.get(day)
+        if sketch is None:
+            sketch = _pending_sketches[day] = HyperLogLog()
+        sketch.add(session_id)
+
+
+def _take_pending(day: str) -> Optional[HyperLogLog]:
+    with _pending_lock:
+        return _pending_sketches.pop(day, None)
+
+
+def _restore_pending(day: str, sketch: Optional[HyperLogLog]):
+    if sketch is None:
+        return
+    with _pending_lock:
+        current = _pending_sketches.get(day)
+        _pending_sketches[day] = current.merge(sketch) if current else sketch
+
+
+def _drop_stale_pending(today: str):
+    # 날짜가 바뀌기 전에 쌓인 스케치는 확정 단계에서 로그로 다시 만들어지므로 버림
+    with _pending_lock:
+        for day in [day for day in _pending_sketches if day < today]:
+            del _pending_sketches[day]
+
+
+def _day_bounds(day: date):
+    start = datetime.combine(day, time.min, tzinfo=resolve_timezone())
+    return start, start + timedelta(days=1)
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def compute_day(db: Session, day: date) -> Dict[str, int]:
+    """하루치 로그를 created_at 범위 조회 한 번으로 집계합니다."""
+    start, end = _day_bounds(day)
+    row = db.query(
+        _count_if(or_(ActivityLog.action.in_(QUIZ_ACTIONS), ActivityLog.action.ilike("%quiz%"))).label("quiz_completions"),
+        _count_if(ActivityLog.action.in_(LOGIN_ACTIONS)).label("logins"),
+        _count_if(ActivityLog.action.in_(LEARNING_ACTIONS)).label("learning_events"),
+        func.count(ActivityLog.id).label("total_logs"),
+        *(_count_if(ActivityLog.log_level == level).label(f"{level}_logs") for level in LOG_LEVELS),
+        *(_count_if(ActivityLog.log_type == log_type).label(f"{log_type}_logs") for log_type in LOG_TYPES),
+    ).filter(
+        ActivityLog.created_at >= start,
+        ActivityLog.created_at < end
+    ).one()
+    return {column: int(getattr(row, column) or 0) for column in COUNTER_COLUMNS if column != "active_sessions"}
+
+
+def _day_session_ids(db: Session, day: date) -> List[str]:
+    start, end = _day_bounds(day)
+    rows = db.query(distinct(ActivityLog.session_id)).filter(
+        ActivityLog.created_at >= start,
+        ActivityLog.created_at < end,
+        ActivityLog.session_id.isnot(None)
+    )
+    return [row[0] for row in rows]
+
+
+def refresh_day(db: Session, day: date, finalized: bool = False, pending: Optional[HyperLogLog] = None) -> Dict[str, int]:
+    """하루치 집계 행을 다시 계산해 저장합니다. (커밋하지 않음)
+
+    확정 시에는 그날 로그의 세션 목록으로 스케치를 새로 만들고 정확한 수를 기록합니다.
+    오늘 행은 저장된 스케치에 pending 스케치를 병합하고 추정값을 기록합니다.
+    """
+    values = compute_day(db, day)
+    if finalized:
+        session_ids = _day_session_ids(db, day)
+        sketch = HyperLogLog.from_values(session_ids)
+        values["active_sessions"] = len(session_ids)
+    else:
+        stored = db.query(DailyActivityRollup.session_sketch).filter(
+            DailyActivityRollup.date == day.isoformat()
+        ).with_for_update().scalar()
+        sketch = HyperLogLog.from_bytes(stored)
+        if sketch.is_empty():
+            # 오늘 첫 갱신: 이미 쓰인 로그로 시작 (다른 워커가 쓴 로그 포함)
+            sketch.update(_day_session_ids(db, day))
+        if pending is not None:
+            sketch.merge(pending)
+        values["active_sessions"] = sketch.count()
+    values["session_sketch"] = sketch.to_bytes()
+    values["finalized"] = finalized
+    insert = _INSERT_BY_DIALECT.get(db.bind.dialect.name)
+    if insert is not None:
+        statement = insert(DailyActivityRollup).values(date=day.isoformat(), **values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["date"],
+            set_={**values, "updated_at": func.now()}
+        ))
+    else:
+        db.merge(DailyActivityRollup(date=day.isoformat(), **values))
+    return values
+
+
+def finalize_past_days(db: Session, today: date, limit: Optional[int] = None) -> int:
+    """
+    마지막으로 확정된 날 다음 날부터 어제까지 확정합니다. (처음에는 가장 오래된 로그 날짜부터)
+    limit이 있으면 그 일수까지만 확정하고, 나머지는 다음 호출에서 이어서 확정합니다.
+    """
+    last_finalized = db.query(func.max(DailyActivityRollup.date)).filter(
+        DailyActivityRollup.finalized.is_(True)
+    ).scalar()
+    if last_finalized:
+        day = date.fromisoformat(last_finalized) + timedelta(days=1)
+    else:
+        first_log = db.query(func.min(ActivityLog.created_at)).scalar()
+        if first_log is None:
+            return 0
+        if first_log.tzinfo is not None:
+            first_log = first_log.astimezone(resolve_timezone())
+        day = first_log.date()
+
+    finalized = 0
+    while day < today and (limit is None or finalized < limit):
+        refresh_day(db, day, finalized=True)
+        day += timedelta(days=1)
+        finalized += 1
+    return finalized
+
+
+def refresh_rollups(db: Session, finalize_limit: Optional[int] = None):
+    """지난 날짜를 확정(finalize_limit일까지)하고 오늘 행을 갱신한 뒤 커밋합니다."""
+    global _last_refresh
+    with _refresh_lock:
+        today = date.fromordinal(today_ordinal())
+        pending = _take_pending(today.isoformat())
+        try:
+            finalize_past_days(db, today, finalize_limit)
+            refresh_day(db, today, pending=pending)
+            db.commit()
+        except Exception:
+            db.rollback()
+            _restore_pending(today.isoformat(), pending)
+            raise
+        _drop_stale_pending(today.isoformat())
+        _last_refresh = time_module.monotonic()
+
+
+def merge_pending_sketch(db: Session):
+    """이 프로세스의 오늘 활성 세션 스케치만 저장된 오늘 행에 병합하고 커밋합니다. (로그 집계/확정 없음)"""
+    today = date.fromordinal(today_ordinal()).isoformat()
+    _drop_stale_pending(today)
+    pending = _take_pending(today)
+    if pending is None:
+        return
+    try:
+        row = db.query(DailyActivityRollup).filter(DailyActivityRollup.date == today).with_for_update().first()
+        if row is None:
+            # 오늘 행은 갱신 담당 프로세스가 처음 만들 때 그때까지의 로그로 시작하므로 병합은 다음 주기로 미룸
+            _restore_pending(today, pending)
+            return
+        sketch = HyperLogLog.from_bytes(row.session_sketch).merge(pending)
+        row.session_sketch = sketch.to_bytes()
+        row.active_sessions = sketch.count()
+        db.commit()
+    except Exception:
+        db.rollback()
+        _restore_pending(today, pending)
+        raise
+
+
+def _ensure_fresh(db: Session):
+    # 요청 경로에서는 확정 일수를 제한해 응답 시간이 로그 보관 기간에 비례하지 않게 함
+    if time_module.monotonic() - _last_refresh > ROLLUP_INTERVAL_SECONDS:
+        refresh_rollups(db, finalize_limit=ROLLUP_REQUEST_FINALIZE_DAYS)
+
+
+def backfill_rollups(engine) -> int:
+    """확정되지 않은 지난 날짜를 모두 확정합니다. (init_db.py, 최초 배포 시) 확정한 일수를 반환"""
+    db = Session(bind=engine)
+    try:
+        finalized = finalize_past_days(db, date.fromordinal(today_ordinal()))
+        db.commit()
+        return finalized
+    finally:
+        db.close()
+
+
+def get_rollups(db: Session, days: int, today: Optional[date] = None) -> List[Dict[str, object]]:
+    """오늘을 포함한 최근 days일의 집계를 오래된 날짜부터 반환합니다. (집계 행 days개만 읽음)"""
+    _ensure_fresh(db)
+
+    today = today or date.fromordinal(today_ordinal())
+    first_day = today - timedelta(days=days - 1)
+    rows = {row.date: row for row in db.query(DailyActivityRollup).filter(
+        DailyActivityRollup.date >= first_day.isoformat(),
+        DailyActivityRollup.date <= today.isoformat()
+    )}
+
+    result = []
+    for offset in range(days):
+        day = (first_day + timedelta(days=offset)).isoformat()
+        row = rows.get(day)
+        entry = {"date": day}
+        entry.update({column: getattr(row, column) if row else 0 for column in COUNTER_COLUMNS})
+        result.append(entry)
+    return result
+
+
+def get_rollup_totals(db: Session) -> Dict[str, int]:
+    """전체 기간 합계 (집계 행들의 SUM)"""
+    _ensure_fresh(db)
+    row = db.query(*(
+        func.coalesce(func.sum(getattr(DailyActivityRollup, column)), 0).label(column)
+        for column in COUNTER_COLUMNS if column != "active_sessions"
+    )).one()
+    return {column: int(value) for column, value in row._mapping.items()}
+
+
+def count_active_sessions(db: Session, days: int, exact: bool = False) -> int:
+    """오늘을 포함한 최근 days일의 고유 활성 세션 수
+
+    기본은 날짜별 스케치 병합 추정치(표준 오차 약 0.8%)입니다.
+    확정된 날짜들의 병합 결과와 최종 추정값은 캐시하므로 반복 조회는 DB를 거의 읽지 않습니다.
+    exact=True(감사용)는 activity_logs에서 COUNT(DISTINCT session_id)로 직접 셉니다.
+    """
+    today = date.fromordinal(today_ordinal())
+    first_day = today - timedelta(days=days - 1)
+    if exact:
+        start, _ = _day_bounds(first_day)
+        return db.query(func.count(distinct(ActivityLog.session_id))).filter(
+            ActivityLog.created_at >= start,
+            ActivityLog.session_id.isnot(None)
+        ).scalar() or 0
+
+    _ensure_fresh(db)
+    key = (days, today.isoformat())
+    cached = _count_cache.get(key)
+    if cached and cached[0] == _last_refresh:
+        return cached[1]
+
+    marker = tuple(db.query(func.count(DailyActivityRollup.date), func.max(DailyActivityRollup.updated_at)).filter(
+        DailyActivityRollup.date >= first_day.isoformat(),
+        DailyActivityRollup.date < today.isoformat(),
+        DailyActivityRollup.finalized.is_(True)
+    ).one())
+    cached_window = _window_cache.get(key)
+    window = cached_window[1] if cached_window and cached_window[0] == marker else None
+    if window is None:
+        window = HyperLogLog()
+        for (data,) in db.query(DailyActivityRollup.session_sketch).filter(
+            DailyActivityRollup.date >= first_day.isoformat(),
+            DailyActivityRollup.date < today.isoformat(),
+            DailyActivityRollup.session_sketch.isnot(None)
+        ):
+            window.merge(HyperLogLog.from_bytes(data))
+        _window_cache.pop(key, None)
+        # 날짜가 바뀌면 이전 키는 더 이상 쓰이지 않음
+        for stale in [cached for cached in _window_cache if cached[1] != key[1]]:
+            del _window_cache[stale]
+        _window_cache[key] = (marker, window)
+
+    today_sketch = HyperLogLog.from_bytes(db.query(DailyActivityRollup.session_sketch).filter(
+        DailyActivityRollup.date == today.isoformat()
+    ).scalar())
+    with _pending_lock:
+        pending = _pending_sketches.get(today.isoformat())
+        if pending is not None:
+            today_sketch.merge(pending)
+    estimate = HyperLogLog(registers=window.to_bytes()).merge(today_sketch).count()
+    _count_cache[key] = (_last_refresh, estimate)
+    return estimate
+
+
+class RollupScheduler:
+    """
+    오늘 집계를 주기적으로 갱신하는 백그라운드 스레드
+
+    잠금 파일을 잡은 프로세스(담당)만 refresh_rollups를 실행하고, 잡지 못한 프로세스는
+    자기 스케치만 병합합니다. 담당 프로세스가 종료되면 잠금이 풀리고 다음 주기에 다른 워커가 이어받습니다.
+    """
+
+    def __init__(self, interval: int = ROLLUP_INTERVAL_SECONDS, lock_path: str = ROLLUP_LOCK_FILE):
+        self.interval = interval
+        self.lock_path = lock_path
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+        self._leader = False
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rollup-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _try_lead(self) -> bool:
+        """잠금 파일을 잡았거나 이미 잡고 있으면 True"""
+        if self._leader:
+            return True
+        if fcntl is None:
+            # 파일 잠금을 쓸 수 없는 환경: 프로세스마다 갱신
+            self._leader = True
+            return True
+        try:
+            lock_file = open(self.lock_path, "a+")
+        except OSError as e:
+            print(f"⚠️ 집계 잠금 파일을 열 수 없어 이 프로세스에서 갱신합니다: {e}")
+            self._leader = True
+            return True
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self._leader = True
+        print(f"📊 일별 집계 갱신 담당 프로세스 (pid {os.getpid()})")
+        return True
+
+    def _release(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self._leader = False
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                db = SessionLocal()
+                try:
+                    if self._try_lead():
+                        refresh_rollups(db)
+                    else:
+                        merge_pending_sketch(db)
+                except Exception as e:
+                    db.rollback()
+                    print(f"⚠️ 일별 집계 갱신 실패: {e}")
+                finally:
+                    db.close()
+                self._stop.wait(self.interval)
+        finally:
+            self._release()
+
+
+rollup_scheduler = RollupScheduler()
+
+
+def start_rollup_scheduler():
+    if ROLLUP_SCHEDULER_ENABLED:
+        rollup_scheduler.start()
+
+
+def stop_rollup_scheduler():
+    rollup_scheduler.stop()
@@ -0,0 +1,78 @@
+"""
+API 라우터 등록 (지연 import 지원)
+
+라우터 모듈은 SQLAlchemy 모델/스키마 등 의존성이 커서 모두 import하면 콜드 스타트가 길어집니다.
+LAZY_ROUTERS=1(기본)이면 각 라우터 모듈은 해당 prefix로 첫 요청이 들어올 때 import되어 등록됩니다.
+/docs, /openapi.json, /debug/routes 요청 시에는 남은 라우터를 모두 등록합니다.
+gunicorn preload 모드에서는 마스터에서 한 번에 등록하는 편이 유리하므로 LAZY_ROUTERS=0으로 실행합니다.
+
+지연 로딩은 순수 ASGI 미들웨어로 처리합니다. 모듈 import는 스레드풀에서 하므로 이벤트 루프를 막지 않고,
+모든 라우터가 등록된 뒤에는 pending 확인 한 번 외에 아무 일도 하지 않습니다.
+"""
+
+import importlib
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+LAZY_ROUTERS = os.getenv("LAZY_ROUTERS", "1") != "0"
+
+# (모듈 경로, prefix, tags)
+RouterSpec = Tuple[str, str, Optional[List[str]]]
+
+
+class RouterRegistry:
+    def __init__(self, app, specs: Sequence[RouterSpec], lazy: bool = LAZY_ROUTERS):
+        self.app = app
+        self.pending = {prefix: (module, prefix, tags) for module, prefix, tags in specs}
+        self.lock = threading.Lock()
+        self.full_load_paths = {app.openapi_url, app.docs_url, app.redoc_url, "/debug/routes"}
+        if lazy:
+            app.add_middleware(LazyRouterMiddleware, registry=self)
+        else:
+            self.load_all()
+
+    def _load(self, prefix: str):
+        with self.lock:
+            spec = self.pending.get(prefix)
+            if spec is None:
+                return
+            module, prefix, tags = spec
+            router = importlib.import_module(module).router
+            self.app.include_router(router, prefix=prefix, tags=tags)
+            self.app.openapi_schema = None
+            # 등록이 끝난 뒤에 pending에서 빼야 같은 prefix의 동시 요청이 등록 전에 처리되지 않음
+            # (import 실패 시 pending에 남아 다음 요청에서 다시 시도)
+            del self.pending[prefix]
+
+    def load_all(self):
+        for prefix in list(self.pending):
+            self._load(prefix)
+
+    def prefixes_for_path(self, path: str) -> List[str]:
+        """path 요청 전에 등록해야 하는 prefix 목록"""
+        if path in self.full_load_paths:
+            return list(self.pending)
+        return [prefix for prefix in list(self.pending) if path == prefix or path.startswith(prefix + "/")]
+
+    def load_for_path(self, path: str):
+        for prefix in self.prefixes_for_path(path):
+            self._load(prefix)
+
+
+class LazyRouterMiddleware:
+    """요청 경로에 해당하는 라우터를 처리 전에 등록하는 ASGI 미들웨어"""
+
+    def __init__(self, app, registry: RouterRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if self.registry.pending and scope["type"] in ("http", "websocket"):
+            if self.registry.prefixes_for_path(scope["path"]):
+                # import는 수백 ms가 걸릴 수 있으므로 스레드풀에서 (다른 요청은 계속 처리)
+                # 다른 요청이 같은 prefix를 등록 중이면 _load의 lock에서 등록이 끝날 때까지 기다림
+                await run_in_threadpool(self.registry.load_for_path, scope["path"])
+        await self.app(scope, receive, send)
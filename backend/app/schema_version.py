@@ -0,0 +1,37 @@
+"""
+스키마 버전 확인
+
+테이블/인덱스 정의나 init_db.py의 데이터 이전 단계를 바꾸면 SCHEMA_VERSION을 1 올립니다.
+start.py는 DB의 schema_version 행이 이 값과 같으면 create_all과 init_db를 모두 건너뜁니다.
+이 모듈은 부팅 경로에서 가장 먼저 쓰이므로 app.database / app.models를 import하지 않습니다.
+"""
+
+from typing import Optional
+
+from sqlalchemy import text
+
+SCHEMA_VERSION = 4
+
+
+def read_schema_version(conn) -> Optional[int]:
+    """DB에 기록된 스키마 버전. 테이블이 없거나 읽을 수 없으면 None"""
+    try:
+        return conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar()
+    except Exception:
+        conn.rollback()
+        return None
+
+
+def write_schema_version(conn, version: int = SCHEMA_VERSION):
+    updated = conn.execute(text(
+        "UPDATE schema_version SET version = :version, applied_at = CURRENT_TIMESTAMP WHERE id = 1"
+    ), {"version": version}).rowcount
+    if not updated:
+        conn.execute(text(
+            "INSERT INTO schema_version (id, version, applied_at) VALUES (1, :version, CURRENT_TIMESTAMP)"
+        ), {"version": version})
+
+
+def is_schema_current(engine) -> bool:
+    with engine.connect() as conn:
+        return read_schema_version(conn) == SCHEMA_VERSION
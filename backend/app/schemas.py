@@ -77,6 +77,10 @@ class QuizResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class QuizTopicCount(BaseModel):
+    topic: str
+    count: int
+
 # User Progress Schemas
 class UserProgressCreate(BaseModel):
     session_id: str
@@ -95,6 +99,19 @@ class UserProgressResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class InfoLearnEvent(BaseModel):
+    date: str
+    info_index: int
+
+class TermLearnEvent(BaseModel):
+    term: str
+    date: str
+    info_index: int = 0
+
+class ProgressBatchRequest(BaseModel):
+    infos: List[InfoLearnEvent] = []
+    terms: List[TermLearnEvent] = []
+
 # Prompt Schemas
 class PromptCreate(BaseModel):
     title: str
@@ -111,6 +128,16 @@ class PromptResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class PromptSummary(BaseModel):
+    id: int
+    title: Optional[str] = None
+    category: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class PromptPage(BaseModel):
+    items: List[PromptSummary]
+    next_cursor: Optional[int] = None
+
 # Base Content Schemas
 class BaseContentCreate(BaseModel):
     title: str
@@ -127,6 +154,34 @@ class BaseContentResponse(BaseModel):
     class Config:
         from_attributes = True 
 
+class BaseContentSummary(BaseModel):
+    id: int
+    title: Optional[str] = None
+    category: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+class BaseContentPage(BaseModel):
+    items: List[BaseContentSummary]
+    next_cursor: Optional[int] = None
+
+# Search Schemas
+class SearchHit(BaseModel):
+    type: str
+    id: int
+    title: str
+    snippet: str
+    rank: float
+    date: Optional[str] = None
+    info_index: Optional[int] = None
+
+class SearchResponse(BaseModel):
+    query: str
+    backend: str
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchHit]
+
 # Term Schemas
 class TermResponse(BaseModel):
     id: int
@@ -0,0 +1,295 @@
+"""
+프롬프트 / 기본 컨텐츠 / AI 정보 전문 검색
+
+- PostgreSQL: 'simple' 설정의 tsvector 식 GIN 인덱스 + ts_rank_cd 랭킹
+- 그 외(SQLite 등 로컬/테스트): 순수 파이썬 역색인
+
+두 백엔드 모두 같은 토큰화를 씁니다. 영문/숫자는 단어 단위, 한글은 2-gram 단위이므로 단어 중간도
+검색됩니다. ("러닝"으로 "딥러닝" 검색) PostgreSQL은 DB 함수 search_tokens()로 같은 토큰을 만들어
+색인하고, 검색어는 tokenize() 결과를 AND로 묶습니다. 하이라이트도 두 백엔드 모두 highlight()로 만듭니다.
+
+대체 역색인은 검색 대상 테이블의 콘텐츠 버전(app/http_cache.py)이 바뀌면 다시 만들므로
+다른 워커의 쓰기도 최대 CONTENT_VERSION_TTL초 뒤에 반영됩니다.
+"""
+
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .http_cache import content_version_key
+from .models import Prompt, BaseContent, AIInfo
+
+# (검색 타입, 테이블, 제목 컬럼, 본문 컬럼, AI 정보 인덱스)
+SEARCH_SOURCES = [
+    ("prompt", "prompt", "title", "content", None),
+    ("base_content", "base_content", "title", "content", None),
+    ("ai_info", "ai_info", "info1_title", "info1_content", 0),
+    ("ai_info", "ai_info", "info2_title", "info2_content", 1),
+    ("ai_info", "ai_info", "info3_title", "info3_content", 2),
+]
+
+SEARCH_TYPES = ("prompt", "base_content", "ai_info")
+# 콘텐츠 버전을 확인할 테이블 (대체 역색인 재생성 기준)
+SEARCH_TABLES = ("prompt", "base_content", "ai_info")
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_LENGTH = 160
+TITLE_WEIGHT = 2.0
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """검색용 토큰화. 영문/숫자는 단어 단위, 한글은 2-gram 단위로 자릅니다."""
+    if not value:
+        return []
+    tokens = []
+    for chunk in _TOKEN_RE.findall(value.lower()):
+        if "가" <= chunk[0] <= "힣":
+            if len(chunk) == 1:
+                tokens.append(chunk)
+            else:
+                tokens.extend(chunk[i:i + 2] for i in range(len(chunk) - 1))
+        else:
+            tokens.append(chunk)
+    return tokens
+
+
+def query_words(query: str) -> List[str]:
+    """하이라이트/tsquery 생성을 위한 검색어 단어 목록"""
+    return [w for w in _WORD_RE.findall(query.lower()) if w]
+
+
+def highlight(value: Optional[str], words: List[str], length: int = SNIPPET_LENGTH) -> str:
+    """첫 번째 일치 위치 주변을 잘라 검색어를 <mark>로 감쌉니다."""
+    if not value:
+        return ""
+    if not words:
+        return value[:length]
+
+    pattern = re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)), re.IGNORECASE)
+    match = pattern.search(value)
+    start = max(0, match.start() - length // 4) if match else 0
+    fragment = value[start:start + length]
+    fragment = pattern.sub(lambda m: f"{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_END}", fragment)
+    if start > 0:
+        fragment = "..." + fragment
+    if start + length < len(value):
+        fragment = fragment + "..."
+    return fragment
+
+
+class InvertedIndex:
+    """순수 파이썬 역색인 (PostgreSQL이 아닌 환경용 대체 구현)"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[tuple, float]] = {}
+        self.documents: Dict[tuple, dict] = {}
+
+    def add(self, key: tuple, title: Optional[str], body: Optional[str], **extra):
+        weights: Dict[str, float] = {}
+        for token in tokenize(title):
+            weights[token] = weights.get(token, 0.0) + TITLE_WEIGHT
+        for token in tokenize(body):
+            weights[token] = weights.get(token, 0.0) + 1.0
+        if not weights:
+            return
+
+        length = sum(weights.values())
+        for token, weight in weights.items():
+            self.postings.setdefault(token, {})[key] = weight / length
+        self.documents[key] = {"title": title or "", "body": body or "", **extra}
+
+    def search(self, query: str, types: Optional[List[str]] = None, limit: int = 20, offset: int = 0) -> Tuple[int, List[dict]]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return 0, []
+
+        postings = [self.postings.get(token, {}) for token in tokens]
+        if not all(postings):
+            return 0, []
+
+        # 모든 검색어 토큰을 포함하는 문서만 (AND)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting.keys()
+        if types:
+            candidates = {key for key in candidates if key[0] in types}
+
+        total_docs = len(self.documents)
+        scored = []
+        for key in candidates:
+            score = 0.0
+            for posting in postings:
+                idf = math.log(1 + total_docs / len(posting))
+                score += posting[key] * idf
+            scored.append((score, key))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        words = query_words(query)
+        results = []
+        for score, key in scored[offset:offset + limit]:
+            doc = self.documents[key]
+            results.append({
+                "type": key[0],
+                "id": key[1],
+                "info_index": doc.get("info_index"),
+                "date": doc.get("date"),
+                "title": highlight(doc["title"], words, length=len(doc["title"]) or SNIPPET_LENGTH),
+                "snippet": highlight(doc["body"], words),
+                "rank": round(score, 6),
+            })
+        return len(scored), results
+
+
+# (콘텐츠 버전, 역색인)
+_index: Optional[Tuple[tuple, InvertedIndex]] = None
+_index_generation = 0
+_index_lock = threading.Lock()
+
+
+def invalidate_search_index():
+    """검색 대상 테이블이 변경되면 호출하여 이 프로세스의 대체 역색인을 다시 만들도록 합니다."""
+    global _index, _index_generation
+    with _index_lock:
+        _index = None
+        _index_generation += 1
+
+
+def _build_index(db: Session) -> InvertedIndex:
+    index = InvertedIndex()
+    for row in db.query(Prompt.id, Prompt.title, Prompt.content):
+        index.add(("prompt", row.id), row.title, row.content)
+    for row in db.query(BaseContent.id, BaseContent.title, BaseContent.content):
+        index.add(("base_content", row.id), row.title, row.content)
+    for info in db.query(AIInfo):
+        for info_index in range(3):
+            title = getattr(info, f"info{info_index + 1}_title")
+            content = getattr(info, f"info{info_index + 1}_content")
+            index.add(("ai_info", info.id, info_index), title, content, date=info.date, info_index=info_index)
+    return index
+
+
+def get_search_index(db: Session) -> InvertedIndex:
+    global _index
+    # 만들기 전에 버전을 읽으므로, 만드는 중에 커밋된 쓰기는 다음 검색에서 버전이 달라져 다시 만들어짐
+    version = content_version_key(*SEARCH_TABLES)
+    cached = _index
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _index_lock:
+        cached = _index
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+        generation = _index_generation
+        index = _build_index(db)
+        if version is not None and generation == _index_generation:
+            _index = (version, index)
+    return index
+
+
+# tokenize()와 같은 토큰(영문/숫자 단어, 한글 2-gram)을 공백으로 이어 반환하는 DB 함수 (식 인덱스용으로 IMMUTABLE)
+_SEARCH_TOKENS_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_tokens(value text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT coalesce(string_agg(
+        CASE WHEN chunk ~ '^[가-힣]{2,}$'
+             THEN (SELECT string_agg(substr(chunk, i, 2), ' ' ORDER BY i)
+                   FROM generate_series(1, char_length(chunk) - 1) AS i)
+             ELSE chunk END,
+        ' '), '')
+    FROM (SELECT m[1] AS chunk FROM regexp_matches(lower(coalesce(value, '')), '([0-9a-z]+|[가-힣]+)', 'g') AS m) AS chunks
+$$
+"""
+
+
+def _document_sql(title_column: str, body_column: str) -> str:
+    return f"to_tsvector('simple', search_tokens({title_column}) || ' ' || search_tokens({body_column}))"
+
+
+def create_search_indexes(engine):
+    """PostgreSQL 전문 검색용 토큰 함수와 GIN 인덱스를 생성합니다. (다른 DB에서는 아무 작업도 하지 않음)"""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        conn.execute(text(_SEARCH_TOKENS_FUNCTION))
+        for _, table, title_column, body_column, _ in SEARCH_SOURCES:
+            # 이전 접두어 검색용 인덱스 (토큰화가 달라 더 이상 쓰이지 않음)
+            conn.execute(text(f"DROP INDEX IF EXISTS ix_{table}_{title_column}_fts"))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{title_column}_search "
+                f"ON {table} USING gin ({_document_sql(title_column, body_column)})"
+            ))
+
+
+def _search_postgres(db: Session, query: str, types: Optional[List[str]], limit: int, offset: int) -> Tuple[int, List[dict]]:
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return 0, []
+    # 토큰은 영문/숫자/한글만 포함하므로 tsquery 문법 문자가 없음
+    tsquery = " & ".join(tokens)
+
+    branches = []
+    for search_type, table, title_column, body_column, info_index in SEARCH_SOURCES:
+        if types and search_type not in types:
+            continue
+        document = _document_sql(title_column, body_column)
+        date_column = "date" if search_type == "ai_info" else "NULL"
+        branches.append(
+            f"SELECT '{search_type}' AS type, id, {title_column} AS title, {body_column} AS body, "
+            f"{date_column} AS date, {'NULL' if info_index is None else info_index} AS info_index, "
+            f"ts_rank_cd({document}, q.query) AS rank "
+            f"FROM {table}, q WHERE {document} @@ q.query"
+        )
+    if not branches:
+        return 0, []
+
+    hits_sql = " UNION ALL ".join(branches)
+    sql = text(f"""
+        WITH q AS (SELECT to_tsquery('simple', :tsquery) AS query),
+        hits AS ({hits_sql}),
+        page AS (
+            SELECT * FROM hits ORDER BY rank DESC, type, id, info_index LIMIT :limit OFFSET :offset
+        )
+        SELECT page.type, page.id, page.date, page.info_index, page.rank, page.title, page.body,
+               (SELECT count(*) FROM hits) AS total
+        FROM page
+        ORDER BY page.rank DESC, page.type, page.id, page.info_index
+    """)
+    params = {"tsquery": tsquery, "limit": limit, "offset": offset}
+    rows = db.execute(sql, params).all()
+    if not rows:
+        # 마지막 페이지를 넘긴 경우에도 전체 건수는 알려줌
+        count_sql = text(f"WITH q AS (SELECT to_tsquery('simple', :tsquery) AS query), hits AS ({hits_sql}) SELECT count(*) FROM hits")
+        total = db.execute(count_sql, {"tsquery": tsquery}).scalar() if offset else 0
+        return total, []
+
+    # 2-gram 토큰은 원문 단어와 달라 ts_headline으로는 강조되지 않으므로 대체 역색인과 같은 highlight() 사용
+    words = query_words(query)
+    results = [{
+        "type": row.type,
+        "id": row.id,
+        "info_index": row.info_index,
+        "date": row.date,
+        "title": highlight(row.title, words, length=len(row.title or "") or SNIPPET_LENGTH),
+        "snippet": highlight(row.body, words),
+        "rank": float(row.rank),
+    } for row in rows]
+    return rows[0].total, results
+
+
+def search(db: Session, query: str, types: Optional[List[str]] = None, limit: int = 20, offset: int = 0) -> Tuple[str, int, List[dict]]:
+    """검색을 실행하고 (사용한 백엔드, 전체 건수, 결과 목록)을 반환합니다."""
+    if db.bind.dialect.name == "postgresql":
+        total, results = _search_postgres(db, query, types, limit, offset)
+        return "postgres", total, results
+    total, results = get_search_index(db).search(query, types, limit, offset)
+    return "inverted_index", total, results
@@ -0,0 +1,62 @@
+"""
+큰 목록 응답용 빠른 JSON 직렬화
+
+읽기 전용 목록 엔드포인트는 ORM 객체마다 Pydantic 모델을 만들고 jsonable_encoder를 거치는 대신
+필요한 컬럼만 조회해 dict로 만든 뒤 FastJSONResponse로 바로 반환합니다.
+(response_model은 OpenAPI 문서용으로 그대로 두며, Response를 직접 반환하면 FastAPI가 검증/인코딩을 건너뜁니다.)
+orjson이 설치되어 있으면 사용하고, 없으면 표준 json으로 같은 형식을 만듭니다.
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, List
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+_ZERO_OFFSET = timedelta(0)
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        # Pydantic/orjson(OPT_UTC_Z)과 같이 UTC는 Z로 표기
+        if value.utcoffset() == _ZERO_OFFSET:
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson(없으면 표준 json)으로 직렬화하는 JSONResponse"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def schema_columns(model, schema) -> list:
+    """응답 스키마의 필드 순서대로 모델 컬럼을 반환합니다. (스키마와 조회 컬럼을 함께 유지)"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_to_dicts(rows: Iterable) -> List[dict]:
+    """컬럼 조회 결과(Row)를 dict 목록으로 변환합니다."""
+    rows = list(rows)
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,115 @@
+"""
+연속 학습일(streak) 계산
+
+학습한 날짜(AI 정보 또는 용어를 하나라도 학습한 날, 학습 달력 app/activity_calendar.py와 같은 기준)를
+date.toordinal() 정수로 바꿔 정렬된 배열 하나로 다루고,
+현재/최대 연속일과 월별 활동 비트맵을 한 번의 순회(O(일수))로 계산합니다.
+세션의 학습 날짜는 쿼리 한 번으로 읽으며 날짜별 추가 조회는 하지 않습니다.
+
+"오늘"은 tz 인자 → APP_TIMEZONE 환경변수 → 서버 로컬 시간 순으로 정합니다.
+"""
+
+import os
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from .activity_calendar import parse_activity_date
+from .models import UserProgress
+
+APP_TIMEZONE = os.getenv("APP_TIMEZONE")
+
+# 비어 있는 learned_info 값 (학습하지 않은 날로 취급)
+_EMPTY_LEARNED = ("", "[]")
+
+
+def resolve_timezone(tz: Optional[str] = None) -> Optional[ZoneInfo]:
+    name = tz or APP_TIMEZONE
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def today_ordinal(tz: Optional[str] = None) -> int:
+    """주어진 시간대 기준 오늘 날짜의 ordinal"""
+    return datetime.now(resolve_timezone(tz)).date().toordinal()
+
+
+def today_str(tz: Optional[str] = None) -> str:
+    return date.fromordinal(today_ordinal(tz)).isoformat()
+
+
+def to_ordinal(date_key: str) -> Optional[int]:
+    """user_progress.date 값('YYYY-MM-DD' 또는 '__terms__YYYY-MM-DD_n')을 ordinal 정수로 변환합니다. 날짜가 아니면 None"""
+    day = parse_activity_date(date_key)
+    return day.toordinal() if day is not None else None
+
+
+def ordinal_to_str(ordinal: Optional[int]) -> Optional[str]:
+    """ordinal 정수를 'YYYY-MM-DD' 문자열로 변환합니다. (None이면 None)"""
+    return date.fromordinal(ordinal).isoformat() if ordinal else None
+
+
+def active_day_ordinals(date_keys: Iterable[str]) -> List[int]:
+    """날짜 키 목록을 중복 없는 정렬된 ordinal 배열로 만듭니다."""
+    return sorted({o for o in map(to_ordinal, date_keys) if o is not None})
+
+
+def compute_streaks(days: List[int], today: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """정렬된 ordinal 배열에서 현재/최대 연속일을 계산합니다.
+
+    현재 연속일은 마지막 학습일이 오늘 또는 어제일 때만 이어지는 것으로 봅니다.
+    (오늘 아직 학습하지 않았어도 하루가 끝나기 전까지는 끊기지 않음)
+    """
+    if not days:
+        return {"current_streak": 0, "max_streak": 0, "last_learned_ordinal": None}
+
+    max_streak = run = 1
+    for previous, current in zip(days, days[1:]):
+        run = run + 1 if current == previous + 1 else 1
+        if run > max_streak:
+            max_streak = run
+
+    if today is None:
+        today = today_ordinal()
+    current_streak = run if today - days[-1] <= 1 else 0
+
+    return {"current_streak": current_streak, "max_streak": max_streak, "last_learned_ordinal": days[-1]}
+
+
+def month_bitmaps(days: List[int]) -> Dict[str, int]:
+    """'YYYY-MM' -> 활동 비트맵 (1일이 최하위 비트)"""
+    bitmaps: Dict[str, int] = {}
+    for ordinal in days:
+        day = date.fromordinal(ordinal)
+        key = f"{day.year:04d}-{day.month:02d}"
+        bitmaps[key] = bitmaps.get(key, 0) | (1 << (day.day - 1))
+    return bitmaps
+
+
+def load_active_days(db: Session, session_id: str) -> List[int]:
+    """세션의 AI 정보/용어 학습 날짜를 한 번의 쿼리로 읽어 ordinal 배열로 반환합니다."""
+    rows = db.query(UserProgress.date).filter(
+        UserProgress.session_id == session_id,
+        or_(
+            ~UserProgress.date.startswith("__", autoescape=True),
+            UserProgress.date.startswith("__terms__", autoescape=True)
+        ),
+        UserProgress.learned_info.isnot(None),
+        UserProgress.learned_info.notin_(_EMPTY_LEARNED)
+    )
+    return active_day_ordinals(row.date for row in rows)
+
+
+def get_streak_summary(db: Session, session_id: str, tz: Optional[str] = None) -> Dict[str, object]:
+    """두 통계 엔드포인트가 공유하는 연속 학습 요약"""
+    days = load_active_days(db, session_id)
+    summary = compute_streaks(days, today_ordinal(tz))
+    summary["last_learned_date"] = ordinal_to_str(summary.pop("last_learned_ordinal"))
+    return summary
@@ -0,0 +1,101 @@
+"""
+테이블 통계와 대량 삭제 (관리자 시스템 화면용)
+
+- 행 수는 기본적으로 PostgreSQL 통계(pg_stat_user_tables.n_live_tup, 없으면 pg_class.reltuples)를
+  쿼리 한 번으로 읽은 추정치입니다. 추정치가 EXACT_COUNT_THRESHOLD(기본 10000)행보다 작은 테이블은
+  COUNT(*)도 싸므로 정확히 셉니다. exact=True면 모든 테이블을 정확히 셉니다. (큰 테이블은 전체 스캔)
+- PostgreSQL이 아니면(SQLite 등) 항상 정확히 셉니다.
+- 모든 조회는 호출자가 넘긴 연결 하나로, 테이블 수와 관계없이 쿼리 1~2번으로 끝납니다.
+- 테이블 목록(inspector)은 TABLE_NAMES_TTL초(기본 300초) 동안 캐시하고, 테이블을 만든 뒤에는 refresh=True로 다시 읽습니다.
+
+대량 삭제(truncate_tables)는 PostgreSQL에서 TRUNCATE ... RESTART IDENTITY 한 문장으로 처리합니다.
+행 단위 DELETE와 달리 WAL/dead tuple이 행 수에 비례해 늘지 않습니다. SQLite는 DELETE로 대신합니다.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.orm import Session
+
+from .database import get_engine
+
+EXACT_COUNT_THRESHOLD = int(os.getenv("EXACT_COUNT_THRESHOLD", "10000"))
+TABLE_NAMES_TTL = float(os.getenv("TABLE_NAMES_TTL", "300"))
+
+_table_names: Optional[List[str]] = None
+_table_names_loaded_at = 0.0
+_table_names_lock = threading.Lock()
+
+_PG_ESTIMATES_SQL = text("""
+    SELECT c.relname, c.reltuples, s.n_live_tup
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+    WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'p') AND c.relname IN :tables
+""").bindparams(bindparam("tables", expanding=True))
+
+
+def get_table_names(refresh: bool = False) -> List[str]:
+    """DB에 있는 테이블 목록 (캐시)"""
+    global _table_names, _table_names_loaded_at
+    with _table_names_lock:
+        if refresh or _table_names is None or time.monotonic() - _table_names_loaded_at > TABLE_NAMES_TTL:
+            _table_names = inspect(get_engine()).get_table_names()
+            _table_names_loaded_at = time.monotonic()
+        return _table_names
+
+
+def _exact_counts(conn, tables: Sequence[str]) -> Dict[str, int]:
+    if not tables:
+        return {}
+    quote = conn.dialect.identifier_preparer.quote
+    # 테이블 이름은 모델 정의에서 온 값만 사용
+    columns = ", ".join(f"(SELECT COUNT(*) FROM {quote(table)}) AS c{index}" for index, table in enumerate(tables))
+    row = conn.execute(text(f"SELECT {columns}")).one()
+    return {table: int(row[index]) for index, table in enumerate(tables)}
+
+
+def _pg_estimates(conn, tables: Sequence[str]) -> Dict[str, int]:
+    estimates = {}
+    for name, reltuples, live_tuples in conn.execute(_PG_ESTIMATES_SQL, {"tables": list(tables)}):
+        # n_live_tup은 통계 수집기가 계속 갱신, reltuples는 VACUUM/ANALYZE 때만 갱신 (-1: 분석 전)
+        if live_tuples is not None and (live_tuples > 0 or reltuples is None or reltuples <= 0):
+            estimates[name] = int(live_tuples)
+        elif reltuples is not None and reltuples >= 0:
+            estimates[name] = int(reltuples)
+    return estimates
+
+
+def table_row_counts(conn, tables: Sequence[str], exact: bool = False) -> Dict[str, Dict]:
+    """{테이블: {"rows": 행 수, "estimated": 추정치 여부}}"""
+    if exact or conn.dialect.name != "postgresql":
+        return {table: {"rows": count, "estimated": False} for table, count in _exact_counts(conn, tables).items()}
+
+    estimates = _pg_estimates(conn, tables)
+    small = [table for table in tables if estimates.get(table, 0) < EXACT_COUNT_THRESHOLD]
+    counts = {table: {"rows": count, "estimated": True} for table, count in estimates.items()}
+    for table, count in _exact_counts(conn, small).items():
+        counts[table] = {"rows": count, "estimated": False}
+    return {table: counts[table] for table in tables if table in counts}
+
+
+def truncate_tables(db: Session, tables: Sequence[str]) -> float:
+    """
+    tables를 모두 비우고 걸린 시간(초)을 반환합니다. (커밋은 호출자가 함, 롤백 가능)
+    PostgreSQL은 TRUNCATE 한 문장(시퀀스 초기화 포함), 그 외는 테이블마다 DELETE합니다.
+    SQLite는 AUTOINCREMENT가 아니므로 빈 테이블의 id가 다시 1부터 시작합니다.
+    """
+    started = time.perf_counter()
+    conn = db.connection()
+    quote = conn.dialect.identifier_preparer.quote
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"TRUNCATE TABLE {', '.join(quote(table) for table in tables)} RESTART IDENTITY"))
+    else:
+        for table in tables:
+            conn.execute(text(f"DELETE FROM {quote(table)}"))
+    # 세션에 남은 객체는 지워진 행을 가리키므로 떼어냄
+    db.expunge_all()
+    return time.perf_counter() - started
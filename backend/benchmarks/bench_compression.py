@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+응답 압축 벤치마크 (대역폭 vs CPU)
+큰 JSON 응답과 비슷한 한국어 페이로드(프롬프트 목록, 로그 목록, 학습 용어, 백업)를 만들어
+gzip 레벨 / brotli 품질별 압축 크기, 압축·해제 시간, 링크 속도별 예상 전송 시간(압축 시간 포함)을 비교합니다.
+마지막으로 CompressionMiddleware를 통해 스트리밍 백업이 청크 단위로 압축되는지 확인합니다.
+
+사용법: python benchmarks/bench_compression.py [행 수]   (기본 5000, DB 불필요)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.compression import CompressionMiddleware, brotli
+from app.serialization import dumps
+
+# 예상 전송 시간을 계산할 링크 속도 (Mbps)
+LINK_SPEEDS = (5, 50)
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 11)
+
+def make_payloads(rows: int):
+    now = datetime(2024, 1, 1)
+    prompts = [
+        {"id": i, "title": f"프롬프트 {i}", "content": f"{i}번 프롬프트 예시 본문입니다. 역할과 출력 형식을 지정하세요. " * 8,
+         "category": f"카테고리{i % 10}", "created_at": now}
+        for i in range(rows)
+    ]
+    logs = {
+        "logs": [
+            {"id": str(i), "timestamp": now - timedelta(seconds=i), "type": "user", "level": "info", "user": f"user{i % 50}",
+             "action": "학습 완료", "details": f"{i % 30}일차 AI 정보 학습을 완료했습니다.", "ip": "10.0.0.1",
+             "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+            for i in range(rows)
+        ],
+        "total": rows, "skip": 0, "limit": rows
+    }
+    terms = [
+        {"term": f"용어{i}", "description": f"용어{i}는 인공지능 모델 학습에서 자주 쓰이는 개념입니다.",
+         "learned_date": (now + timedelta(days=i // 30)).strftime("%Y-%m-%d"), "info_index": i % 3}
+        for i in range(rows)
+    ]
+    terms_by_date = {}
+    for term in terms:
+        terms_by_date.setdefault(term["learned_date"], []).append(term)
+    learned = {"terms": terms, "terms_by_date": terms_by_date, "total_terms": rows, "learned_dates": sorted(terms_by_date)}
+    backup = json.dumps({
+        "backup_info": {"created_at": now.isoformat(), "version": "1.0.0"},
+        "data": {"prompt": json.loads(dumps(prompts)), "activity_logs": json.loads(dumps(logs["logs"]))}
+    }, indent=2, ensure_ascii=False).encode("utf-8")
+    return [
+        ("GET /api/prompt/", dumps(prompts)),
+        ("GET /api/logs/", dumps(logs)),
+        ("GET /api/ai-info/learned-terms", dumps(learned)),
+        ("POST /api/system/backup", backup),
+    ]
+
+def codecs():
+    for level in GZIP_LEVELS:
+        yield (
+            f"gzip-{level}",
+            lambda data, level=level: zlib.compress(data, level, wbits=31),
+            lambda data: zlib.decompress(data, wbits=31),
+        )
+    if brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            yield f"br-{quality}", lambda data, quality=quality: brotli.compress(data, quality=quality), brotli.decompress
+
+def timed(function, data, repeat: int = 3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def transfer_ms(size: int, mbps: int) -> float:
+    return size * 8 / (mbps * 1_000_000) * 1000
+
+async def stream_through_middleware(payload: bytes, chunk_size: int = 64 * 1024):
+    """CompressionMiddleware에 청크 스트리밍 응답을 흘려 보내고 (전송된 본문 청크 수, 압축 크기)를 반환합니다."""
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        for start in range(0, len(payload), chunk_size):
+            await send({"type": "http.response.body", "body": payload[start:start + chunk_size], "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await CompressionMiddleware(streaming_app)(scope, receive, send)
+    bodies = [message["body"] for message in sent if message["type"] == "http.response.body"]
+    headers = dict(sent[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    assert zlib.decompress(b"".join(bodies), wbits=31) == payload
+    return len([body for body in bodies if body]), sum(len(body) for body in bodies)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"📦 페이로드 생성 중... (행 {rows}개, brotli: {'사용' if brotli is not None else '미설치'})")
+    payloads = make_payloads(rows)
+
+    speed_columns = "".join(f"{f'{mbps}Mbps 전송':>14}" for mbps in LINK_SPEEDS)
+    for name, payload in payloads:
+        print(f"\n{name}  원본 {len(payload):,} B")
+        print(f"  {'코덱':<10}{'압축 크기':>14}{'비율':>8}{'압축':>10}{'해제':>10}{'MB/s':>8}{speed_columns}")
+        baseline = "".join(f"{transfer_ms(len(payload), mbps):>12.0f}ms" for mbps in LINK_SPEEDS)
+        print(f"  {'(없음)':<10}{len(payload):>12,} B{'1.00':>8}{'-':>10}{'-':>10}{'-':>8}{baseline}")
+        for codec, compress, decompress in codecs():
+            compressed, compress_time = timed(compress, payload)
+            _, decompress_time = timed(decompress, compressed)
+            throughput = len(payload) / compress_time / 1_000_000
+            # 전송 시간 = 서버 압축 + 네트워크 + 클라이언트 해제
+            speeds = "".join(
+                f"{compress_time * 1000 + transfer_ms(len(compressed), mbps) + decompress_time * 1000:>12.0f}ms"
+                for mbps in LINK_SPEEDS
+            )
+            print(
+                f"  {codec:<10}{len(compressed):>12,} B{len(compressed) / len(payload):>8.2f}"
+                f"{compress_time * 1000:>8.1f}ms{decompress_time * 1000:>8.1f}ms{throughput:>8.0f}{speeds}"
+            )
+
+    backup = payloads[-1][1]
+    chunks, size = asyncio.run(stream_through_middleware(backup))
+    print(f"\n✅ 스트리밍 백업: 미들웨어가 {chunks}개 청크로 나눠 전송 ({len(backup):,} B → {size:,} B, Content-Length 없음)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+프롬프트/기본 컨텐츠 목록 API 벤치마크
+전체 목록(/)과 키셋 페이지 목록(/list)의 응답 크기와 지연시간을 비교합니다.
+
+사용법: python benchmarks/bench_listing.py [행 수]   (기본 10000, 임시 SQLite 사용)
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_listing.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+logging.disable(logging.INFO)
+
+from fastapi.testclient import TestClient
+
+from app.database import engine, SessionLocal
+from app.models import Base, Prompt, BaseContent
+from app.main import app
+
+def seed(rows: int):
+    Base.metadata.create_all(bind=engine)
+    body = "프롬프트 예시 본문입니다. " * 40
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        db.bulk_insert_mappings(Prompt, [
+            {"title": f"프롬프트 {i}", "content": body, "category": f"cat{i % 10}", "created_at": now}
+            for i in range(rows)
+        ])
+        db.bulk_insert_mappings(BaseContent, [
+            {"title": f"기본 컨텐츠 {i}", "content": body, "category": f"cat{i % 10}", "created_at": now}
+            for i in range(rows)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def measure(client: TestClient, url: str, repeat: int = 5):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+        size = len(response.content)
+    timings.sort()
+    return size, timings[len(timings) // 2]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"📦 {rows}개 행 생성 중... ({DB_PATH})")
+    seed(rows)
+
+    client = TestClient(app)
+    print(f"{'엔드포인트':<40} {'응답 크기':>14} {'지연(median)':>14}")
+    print("-" * 70)
+    for prefix in ("/api/prompt", "/api/base-content"):
+        for url in (f"{prefix}/", f"{prefix}/list?limit=50", f"{prefix}/list?limit=200"):
+            size, latency = measure(client, url)
+            print(f"{url:<40} {size:>12,} B {latency * 1000:>11.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+큰 목록 엔드포인트 JSON 직렬화 벤치마크
+엔드포인트마다 행 수(기본 10000)만큼 데이터를 만들고 세 가지 방식을 비교합니다.
+  - 기존: ORM 객체 조회 → Pydantic 모델 검증 → jsonable_encoder → json.dumps (FastAPI 기본 경로)
+  - dict+json: 필요한 컬럼만 조회해 dict로 변환 → jsonable_encoder → json.dumps
+  - dict+orjson: 현재 핸들러 그대로 (FastJSONResponse)
+
+사용법: python benchmarks/bench_serialization.py [행 수] [반복 횟수]   (기본 10000행 5회, 임시 SQLite 사용)
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_serialization.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+logging.disable(logging.INFO)
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.database import engine, SessionLocal
+from app.models import Base, Term, Prompt, Quiz, ActivityLog, AIInfo, UserProgress
+from app.schemas import TermResponse, PromptResponse, QuizResponse
+from app import serialization
+from app.api import ai_info, logs, prompt, quiz, term
+
+SESSION_ID = "bench-session"
+TERMS_PER_INFO = 10
+ADMIN = SimpleNamespace(username="admin", role="admin")
+
+def seed(rows: int):
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now()
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Term, [
+            {"term": f"용어 {i}", "description": f"용어 {i}에 대한 설명입니다. " * 3, "created_at": now}
+            for i in range(rows)
+        ])
+        db.bulk_insert_mappings(Prompt, [
+            {"title": f"프롬프트 {i}", "content": "프롬프트 예시 본문입니다. " * 10, "category": f"cat{i % 10}", "created_at": now}
+            for i in range(rows)
+        ])
+        db.bulk_insert_mappings(Quiz, [
+            {
+                "topic": "bench", "question": f"질문 {i}", "option1": "보기 1", "option2": "보기 2",
+                "option3": "보기 3", "option4": "보기 4", "correct": i % 4, "explanation": "해설입니다.", "created_at": now
+            }
+            for i in range(rows)
+        ])
+        db.bulk_insert_mappings(ActivityLog, [
+            {
+                "username": f"user{i % 50}", "action": "학습", "details": f"상세 {i}", "log_type": "user",
+                "log_level": "info", "ip_address": "127.0.0.1", "user_agent": "bench", "created_at": now - timedelta(seconds=i)
+            }
+            for i in range(rows)
+        ])
+        # 학습 용어: 날짜마다 info 3개 x 용어 TERMS_PER_INFO개, 전체 용어 수가 rows가 되도록 날짜 생성
+        days = max(1, rows // (3 * TERMS_PER_INFO))
+        start = datetime(2020, 1, 1)
+        dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+        info_terms = lambda date, idx: json.dumps([
+            {"term": f"{date}-{idx}-{n}", "description": f"설명 {n}"} for n in range(TERMS_PER_INFO)
+        ], ensure_ascii=False)
+        db.bulk_insert_mappings(AIInfo, [
+            {
+                "date": date,
+                "info1_title": "제목", "info1_content": "내용", "info1_terms": info_terms(date, 0),
+                "info2_title": "제목", "info2_content": "내용", "info2_terms": info_terms(date, 1),
+                "info3_title": "제목", "info3_content": "내용", "info3_terms": info_terms(date, 2),
+            }
+            for date in dates
+        ])
+        db.bulk_insert_mappings(UserProgress, [
+            {"session_id": SESSION_ID, "date": date, "learned_info": "[0, 1, 2]"}
+            for date in dates
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+class StandardResponse(JSONResponse):
+    """비교용: FastAPI 기본 경로와 같이 jsonable_encoder 후 json.dumps"""
+
+    def __init__(self, content, *args, **kwargs):
+        super().__init__(jsonable_encoder(content), *args, **kwargs)
+
+def plain_request(path: str) -> Request:
+    """조건부 헤더가 없는 GET 요청 (conditional_response가 304 없이 매번 build()를 호출)"""
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+def legacy_list(model, schema, **filters):
+    def run(db):
+        objects = db.query(model).filter_by(**filters).all()
+        return JSONResponse(jsonable_encoder([schema.model_validate(obj) for obj in objects])).body
+    return run
+
+def legacy_logs(db):
+    logs_data = [
+        {
+            "id": str(log.id), "timestamp": log.created_at.isoformat(), "type": log.log_type, "level": log.log_level,
+            "user": log.username, "action": log.action, "details": log.details, "ip": log.ip_address, "user_agent": log.user_agent
+        }
+        for log in db.query(ActivityLog).order_by(ActivityLog.created_at.desc()).all()
+    ]
+    return JSONResponse(jsonable_encoder({"logs": logs_data, "total": len(logs_data)})).body
+
+def endpoints(rows: int):
+    """(이름, 핸들러 모듈, 현재 핸들러 호출, 기존 방식 또는 None)"""
+    return [
+        ("GET /api/term/all", term, lambda db: term.get_all_terms(plain_request("/api/term/all"), db=db), legacy_list(Term, TermResponse)),
+        ("GET /api/prompt/", prompt, lambda db: prompt.get_all_prompts(plain_request("/api/prompt/"), db=db), legacy_list(Prompt, PromptResponse)),
+        ("GET /api/quiz/{topic}", quiz, lambda db: quiz.get_quiz_by_topic("bench", plain_request("/api/quiz/bench"), db=db), legacy_list(Quiz, QuizResponse, topic="bench")),
+        (
+            "GET /api/logs/",
+            logs,
+            lambda db: logs.get_logs(
+                skip=0, limit=rows, log_type=None, log_level=None, username=None, action=None,
+                start_date=None, end_date=None, current_user=ADMIN, db=db
+            ),
+            legacy_logs,
+        ),
+        ("GET /api/ai-info/learned-terms/{id}", ai_info, lambda db: ai_info.get_learned_terms(SESSION_ID, db=db), None),
+    ]
+
+def measure(run, repeat: int):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            # 핸들러의 디버그 출력은 숨김
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                result = run(db)
+                timings.append(time.perf_counter() - start)
+        finally:
+            db.close()
+        size = len(result if isinstance(result, bytes) else result.body)
+    timings.sort()
+    return size, timings[len(timings) // 2]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"📦 엔드포인트별 {rows}개 행 생성 중... ({DB_PATH})")
+    seed(rows)
+    print(f"orjson: {'사용' if serialization.orjson is not None else '미설치 (표준 json 대체)'}\n")
+
+    print(f"{'엔드포인트':<38} {'응답 크기':>12} {'기존':>10} {'dict+json':>10} {'dict+orjson':>12}")
+    print("-" * 88)
+    for name, module, handler, legacy in endpoints(rows):
+        size, fast = measure(handler, repeat)
+        module.FastJSONResponse = StandardResponse
+        try:
+            _, standard = measure(handler, repeat)
+        finally:
+            module.FastJSONResponse = serialization.FastJSONResponse
+        legacy_text = f"{measure(legacy, repeat)[1] * 1000:>8.1f}ms" if legacy else f"{'-':>10}"
+        print(f"{name:<38} {size:>10,} B {legacy_text} {standard * 1000:>8.1f}ms {fast * 1000:>10.1f}ms")
+
+if __name__ == "__main__":
+    main()
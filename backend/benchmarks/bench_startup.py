@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+콜드 스타트 벤치마크
+새 인터프리터에서 `import app.main`과 startup 이벤트(백그라운드 작업 시작 포함, 실제 부팅과 같은 설정)까지
+걸리는 시간을 여러 번 재고, 마지막 실행의 -X importtime 결과로 가장 오래 걸린 모듈을 보여줍니다.
+import와 startup을 합친 시간의 중앙값이 목표 시간을 넘거나 import만으로 DB 엔진/무거운 의존성이
+로드되면 종료 코드 1로 실패합니다.
+
+사용법: python benchmarks/bench_startup.py [반복 횟수] [--target-ms 1500]
+(DATABASE_URL 없이 실행하여 import 단계에서 DB 설정을 요구하지 않는지도 함께 확인합니다.)
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import app.main 만으로는 로드되면 안 되는 모듈 (첫 사용 시 로드)
+LAZY_MODULES = ("jose", "psycopg2", "feedparser", "deep_translator")
+
+PROBE = f"""
+import asyncio, sys, time, json
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+database = sys.modules.get("app.database")
+engine_created = database is not None and database._engine is not None
+loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]
+# uvicorn/gunicorn 워커가 요청을 받기 전에 실행하는 startup 이벤트 (app/background.py)
+startup_started = time.perf_counter()
+asyncio.run(app.main.app.router.startup())
+ready = time.perf_counter()
+asyncio.run(app.main.app.router.shutdown())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - startup_started) * 1000,
+    "engine_created": engine_created,
+    "loaded": loaded,
+}}))
+"""
+
+def run_probe(importtime: bool):
+    env = {key: value for key, value in os.environ.items() if key != "DATABASE_URL"}
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", PROBE]
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit("❌ DATABASE_URL 없이 app.main을 import하지 못했습니다.")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def parse_importtime(stderr: str):
+    """(모듈, 자체 시간 us, 누적 시간 us) 목록"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("repeat", nargs="?", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=float(os.getenv("STARTUP_TARGET_MS", "1500")))
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = []
+    startup_timings = []
+    probe = None
+    for _ in range(args.repeat):
+        probe, _ = run_probe(importtime=False)
+        timings.append(probe["import_ms"] + probe["startup_ms"])
+        startup_timings.append(probe["startup_ms"])
+    timings.sort()
+    startup_timings.sort()
+    median = timings[len(timings) // 2]
+
+    _, stderr = run_probe(importtime=True)
+    rows = parse_importtime(stderr)
+
+    print(f"🚀 import app.main + startup: 중앙값 {median:.0f}ms (최소 {timings[0]:.0f}ms, 최대 {timings[-1]:.0f}ms, {args.repeat}회)")
+    print(f"   그중 startup 이벤트: 중앙값 {startup_timings[len(startup_timings) // 2]:.1f}ms")
+    print(f"\n누적 시간 상위 {args.top}개 최상위 패키지 (-X importtime)")
+    top_level = [row for row in rows if "." not in row[0]]
+    for name, self_us, cumulative_us in sorted(top_level, key=lambda row: -row[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:>8.1f}ms  {name}")
+    print("\n앱 모듈 자체 시간")
+    for name, self_us, cumulative_us in sorted((row for row in rows if row[0].startswith("app")), key=lambda row: -row[1]):
+        print(f"  {self_us / 1000:>8.1f}ms  {name}")
+
+    failures = []
+    if median > args.target_ms:
+        failures.append(f"중앙값 {median:.0f}ms가 목표 {args.target_ms:.0f}ms를 넘었습니다.")
+    if probe["engine_created"]:
+        failures.append("import만으로 DB 엔진이 생성되었습니다.")
+    if probe["loaded"]:
+        failures.append(f"지연 로딩 대상 모듈이 import 시점에 로드되었습니다: {', '.join(probe['loaded'])}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"\n✅ 목표 {args.target_ms:.0f}ms 이내, DB 엔진/지연 로딩 모듈 미로드")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+복원 메모리 프로파일
+크기가 다른 백업 파일(기본 2만 행, 8만 행)을 만들어 스트리밍 복원(app/backup.py)의 최대 메모리를 tracemalloc으로 재고,
+파일 전체를 json.load 하는 기존 방식과 비교합니다. 백업이 4배 커져도 스트리밍 복원의 최대 메모리가
+1.5배 이상 늘면 종료 코드 1로 실패합니다.
+
+사용법: python benchmarks/profile_restore_memory.py [작은 백업 행 수]   (임시 SQLite 사용)
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+WORK_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'profile_restore.db')}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine, SessionLocal
+from app.models import Base, ActivityLog, Prompt
+from app.backup import BackupStream, restore_tables
+
+MAX_GROWTH = 1.5
+
+def write_backup(path: str, rows: int, compress: bool = False):
+    """레코드를 하나씩 써서 백업 파일을 만듭니다. (생성 중에도 메모리를 쓰지 않음)"""
+    opener = gzip.open if compress else open
+    now = datetime(2024, 1, 1)
+    with opener(path, "wt", encoding="utf-8") as out:
+        out.write('{"backup_info": ')
+        json.dump({"created_at": now.isoformat(), "description": "profile", "version": "1.0.0",
+                   "tables_included": ["activity_logs", "prompt"]}, out)
+        out.write(', "data": {"activity_logs": [')
+        for i in range(rows):
+            if i:
+                out.write(", ")
+            json.dump({
+                "id": i + 1, "username": f"user{i % 50}", "action": "학습 완료", "details": f"{i % 30}일차 AI 정보 학습",
+                "log_type": "user", "log_level": "info", "session_id": f"s{i % 500}",
+                "created_at": (now + timedelta(seconds=i)).isoformat()
+            }, out, ensure_ascii=False)
+        out.write('], "prompt": [')
+        for i in range(rows // 10):
+            if i:
+                out.write(", ")
+            json.dump({"id": i + 1, "title": f"프롬프트 {i}", "content": "프롬프트 본문입니다. " * 20, "category": "c",
+                       "created_at": now.isoformat()}, out, ensure_ascii=False)
+        out.write("]}}")
+
+def profile(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function()
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, peak, time.perf_counter() - start
+
+def streaming_restore(path: str):
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as file:
+            backup = BackupStream(file)
+            restored = restore_tables(db, backup)
+            db.commit()
+        return restored, backup.size
+    finally:
+        db.close()
+
+def full_load(path: str):
+    """비교용: 기존 방식처럼 파일 전체를 읽고 디코딩"""
+    with open(path, "rb") as file:
+        content = file.read()
+    data = json.loads(gzip.decompress(content) if content[:2] == b"\x1f\x8b" else content.decode("utf-8"))
+    return len(data["data"])
+
+def main():
+    small_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    Base.metadata.create_all(bind=engine)
+
+    results = {}
+    print(f"{'백업':<28}{'파일 크기':>14}{'스트리밍 최대 메모리':>22}{'시간':>10}{'json.load 최대 메모리':>24}")
+    print("-" * 98)
+    for label, rows, compress in (("작은 백업", small_rows, False), ("큰 백업 (4배)", small_rows * 4, False),
+                                  ("큰 백업 (4배, gzip)", small_rows * 4, True)):
+        path = os.path.join(WORK_DIR, f"backup_{rows}.json" + (".gz" if compress else ""))
+        write_backup(path, rows, compress)
+        (restored, size), peak, elapsed = profile(lambda: streaming_restore(path))
+        _, full_peak, _ = profile(lambda: full_load(path))
+
+        db = SessionLocal()
+        try:
+            counts = (db.query(ActivityLog).count(), db.query(Prompt).count())
+        finally:
+            db.close()
+        assert counts == (rows, rows // 10), counts
+
+        results[label] = peak
+        print(f"{label:<28}{size:>12,} B{peak / 1024 / 1024:>19.1f} MB{elapsed:>9.1f}s{full_peak / 1024 / 1024:>21.1f} MB")
+
+    growth = results["큰 백업 (4배)"] / results["작은 백업"]
+    print(f"\n백업 4배 증가 시 스트리밍 복원 최대 메모리 {growth:.2f}배")
+    if growth > MAX_GROWTH:
+        print(f"❌ 최대 메모리가 {MAX_GROWTH}배를 넘게 늘었습니다.")
+        sys.exit(1)
+    print("✅ 최대 메모리가 백업 크기와 관계없이 일정합니다.")
+
+if __name__ == "__main__":
+    main()
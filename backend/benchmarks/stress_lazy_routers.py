@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+라우터 지연 로딩 동시 첫 요청 테스트
+LAZY_ROUTERS=1(기본)로 새로 import한 앱에, 아직 등록되지 않은 라우터의 첫 요청을 여러 개 동시에 보냅니다.
+등록이 끝나기 전에 처리된 요청은 catch-all OPTIONS 라우트에 걸려 405가 되므로,
+200이 아닌 응답이 하나라도 있으면 종료 코드 1로 실패합니다. (app/routers.py)
+
+사용법: python benchmarks/stress_lazy_routers.py [동시 요청 수]   (임시 SQLite 사용)
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from collections import Counter
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress_lazy_routers.db')}"
+os.environ["LAZY_ROUTERS"] = "1"
+os.environ["ROLLUP_SCHEDULER"] = "0"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from main import app, routers
+
+# 라우터마다 인증 없이 200을 돌려주는 경로
+PATHS = ("/api/prompt/list", "/api/quiz/topics", "/api/base-content/", "/api/logs/test")
+
+
+async def first_requests(concurrency: int) -> Counter:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.get(path) for path in PATHS for _ in range(concurrency)
+        ))
+    return Counter((response.request.url.path, response.status_code) for response in responses)
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    from app.database import get_engine
+    from app.models import Base
+    Base.metadata.create_all(bind=get_engine())
+
+    pending_before = len(routers.pending)
+    results = asyncio.run(first_requests(concurrency))
+
+    print(f"등록 대기 라우터 {pending_before}개 -> {len(routers.pending)}개, 경로마다 동시 첫 요청 {concurrency}개")
+    failed = False
+    for path in PATHS:
+        codes = {status: count for (request_path, status), count in results.items() if request_path == path}
+        print(f"  {path:<24} {codes}")
+        failed = failed or set(codes) != {200}
+
+    if failed:
+        print("❌ 라우터 등록 전에 처리된 요청이 있습니다.")
+        sys.exit(1)
+    print("✅ 모든 동시 첫 요청이 등록된 라우트로 처리되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
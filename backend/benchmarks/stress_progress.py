@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+학습 기록 동시 쓰기 스트레스 테스트
+여러 스레드가 같은 (session_id, date) 행에 서로 다른 항목을 동시에 추가한 뒤
+유실된 항목이 없는지 확인합니다. 비교를 위해 기존 읽기-수정-쓰기 방식도 함께 실행합니다.
+행을 미리 만들지 않은 새 행 경우와, 새 세션들에 학습 API를 동시에 호출하는 경우(통계 행 생성 포함)도 확인합니다.
+
+사용법: python benchmarks/stress_progress.py [스레드 수] [스레드당 항목 수]
+DATABASE_URL이 설정되어 있으면 해당 DB(PostgreSQL 권장)를, 없으면 임시 SQLite를 사용합니다.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress_progress.db')}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+
+from app.database import engine, SessionLocal
+from app.models import Base, UserProgress
+from app.progress import add_learned_items, create_progress_indexes
+
+def legacy_add(db, session_id, date_key, item):
+    """기존 방식: 읽고, json.loads, append, json.dumps, commit"""
+    progress = db.query(UserProgress).filter(
+        UserProgress.session_id == session_id,
+        UserProgress.date == date_key
+    ).first()
+    learned = json.loads(progress.learned_info) if progress.learned_info else []
+    time.sleep(0.001)  # 두 탭의 클릭이 겹치는 구간
+    if item not in learned:
+        learned.append(item)
+        progress.learned_info = json.dumps(learned)
+
+def upsert_add(db, session_id, date_key, item):
+    add_learned_items(db, session_id, date_key, [item])
+
+def run(name, writer, threads, per_thread, seed=True):
+    session_id = f"stress-{uuid.uuid4().hex[:8]}"
+    date_key = "2025-01-01"
+    errors = []
+
+    if seed:
+        db = SessionLocal()
+        db.add(UserProgress(session_id=session_id, date=date_key, learned_info="[]"))
+        db.commit()
+        db.close()
+
+    def worker(worker_id):
+        db = SessionLocal()
+        try:
+            for i in range(per_thread):
+                item = f"term-{worker_id}-{i}"
+                while True:
+                    try:
+                        writer(db, session_id, date_key, item)
+                        db.commit()
+                        break
+                    except OperationalError:
+                        # SQLite "database is locked" - 재시도
+                        db.rollback()
+                        time.sleep(0.005)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    progress = db.query(UserProgress).filter(
+        UserProgress.session_id == session_id,
+        UserProgress.date == date_key
+    ).one()
+    stored = json.loads(progress.learned_info)
+    db.close()
+
+    expected = {f"term-{n}-{i}" for n in range(threads) for i in range(per_thread)}
+    lost = len(expected - set(stored)) + len(stored) - len(set(stored))
+    print(f"{name:<22} 기대 {len(expected):>5}개 / 저장 {len(stored):>5}개 / 유실·중복 {lost:>5}개 / 오류 {len(errors)}건 / {elapsed:.2f}s")
+    return lost + len(errors)
+
+def run_endpoint(sessions, per_session):
+    """새 세션마다 같은 날짜의 서로 다른 항목을 학습 API로 동시에 기록 (learned_info 행과 '__stats__' 행을 동시에 생성)"""
+    import httpx
+    from main import app
+
+    date_key = "2026-10-19"
+    session_ids = [f"stress-api-{uuid.uuid4().hex[:8]}" for _ in range(sessions)]
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post(f"/api/user-progress/{session_id}/{date_key}/{i}")
+                for session_id in session_ids for i in range(per_session)
+            ), return_exceptions=True)
+
+    start = time.perf_counter()
+    responses = asyncio.run(post_all())
+    elapsed = time.perf_counter() - start
+    errors = [r for r in responses if isinstance(r, Exception) or r.status_code != 200]
+
+    lost = 0
+    db = SessionLocal()
+    for session_id in session_ids:
+        rows = {p.date: p for p in db.query(UserProgress).filter(UserProgress.session_id == session_id)}
+        stored = json.loads(rows[date_key].learned_info) if date_key in rows else []
+        stats = json.loads(rows["__stats__"].stats) if "__stats__" in rows and rows["__stats__"].stats else {}
+        if sorted(stored) != list(range(per_session)) or stats.get("total_learned") != per_session:
+            lost += 1
+    db.close()
+
+    print(f"{'API (새 세션)':<22} 세션 {sessions}개 x 동시 요청 {per_session}개 / 불일치 세션 {lost}개 / 오류 {len(errors)}건 / {elapsed:.2f}s")
+    for error in errors[:3]:
+        print(f"   {error!r}" if isinstance(error, Exception) else f"   {error.status_code} {error.text[:200]}")
+    return lost + len(errors)
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    Base.metadata.create_all(bind=engine)
+    create_progress_indexes(engine)
+
+    print(f"🗄️ {engine.dialect.name}, 스레드 {threads}개 x 항목 {per_thread}개")
+    run("read-modify-write", legacy_add, threads, per_thread)
+    failed = run("upsert", upsert_add, threads, per_thread)
+    failed += run("upsert (새 행)", upsert_add, threads, per_thread, seed=False)
+    failed += run_endpoint(10, 4)
+
+    if failed:
+        print("❌ upsert 경로에서 업데이트가 유실되었거나 오류가 발생했습니다.")
+        sys.exit(1)
+    print("✅ upsert 경로: 유실된 업데이트와 오류 없음")
+
+if __name__ == "__main__":
+    main()
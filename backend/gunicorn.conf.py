@@ -0,0 +1,97 @@
+"""
+gunicorn 설정 (start.py의 SERVER_MODE=workers 운영 모드)
+
+- 워커 수: WEB_CONCURRENCY, 없으면 CPU 수 * 2 + 1 (MAX_WORKERS로 상한, 기본 8)
+- preload_app: 마스터에서 앱을 한 번 import한 뒤 fork (워커는 fork 직후 엔진 풀을 비움)
+- 워커 교체: WORKER_MAX_REQUESTS 요청마다(지터 포함), 또는 RSS가 WORKER_MAX_MEMORY_MB를 넘으면
+- DB 연결: 전체 연결 수가 DB_MAX_CONNECTIONS(Supabase pooler 한도)를 넘지 않도록
+  워커별 pool_size / max_overflow를 나눠 DB_POOL_SIZE / DB_MAX_OVERFLOW로 전달
+  워커마다 백그라운드 스레드(헬스 probe, 일별 집계, 자동 백업)가 같은 풀에서 연결을 하나씩 쓸 수 있으므로
+  워커당 최소 연결 수는 요청용 1개 + 백그라운드 몫입니다. 예산으로 이만큼 줄 수 없는 워커 수는 줄입니다.
+"""
+
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY") or min(multiprocessing.cpu_count() * 2 + 1, int(os.getenv("MAX_WORKERS", "8"))))
+preload_app = True
+# preload 시 마스터에서 라우터를 모두 등록해 두고 워커는 fork로 공유 (app/routers.py)
+os.environ.setdefault("LAZY_ROUTERS", "0")
+
+max_requests = int(os.getenv("WORKER_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+worker_max_memory_mb = int(os.getenv("WORKER_MAX_MEMORY_MB", "512"))
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+loglevel = "info"
+
+# 워커별 DB 연결 수 = 전체 예산 / 워커 수 (절반은 상시 풀, 나머지는 overflow)
+db_max_connections = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+# 헬스 probe 1개 + 켜진 스케줄러 스레드 (app/background.py와 같은 기본값)
+background_connections = 1 + (os.getenv("ROLLUP_SCHEDULER", "1") != "0") + (os.getenv("AUTO_BACKUP", "0") == "1")
+min_connections_per_worker = 1 + background_connections
+max_workers_for_budget = db_max_connections // min_connections_per_worker
+if max_workers_for_budget < 1:
+    raise RuntimeError(
+        f"DB_MAX_CONNECTIONS={db_max_connections}로는 워커 1개에 필요한 연결 {min_connections_per_worker}개"
+        f"(요청 1 + 백그라운드 {background_connections})를 줄 수 없습니다."
+    )
+if workers > max_workers_for_budget:
+    print(
+        f"⚠️ 워커 {workers}개는 DB 연결 예산({db_max_connections}, 워커당 최소 {min_connections_per_worker})을 넘으므로 "
+        f"{max_workers_for_budget}개로 줄입니다.",
+        file=sys.stderr
+    )
+    workers = max_workers_for_budget
+connections_per_worker = db_max_connections // workers
+os.environ.setdefault("DB_POOL_SIZE", str(max(1, (connections_per_worker + 1) // 2)))
+os.environ.setdefault("DB_MAX_OVERFLOW", str(connections_per_worker - int(os.environ["DB_POOL_SIZE"])))
+
+
+def when_ready(server):
+    server.log.info(
+        f"워커 {workers}개, 워커당 DB 연결 최대 {connections_per_worker}개 "
+        f"(pool {os.environ['DB_POOL_SIZE']} + overflow {os.environ['DB_MAX_OVERFLOW']}, 백그라운드 몫 {background_connections}), "
+        f"{max_requests}요청 / {worker_max_memory_mb}MB마다 워커 교체"
+    )
+
+
+def post_fork(server, worker):
+    # preload로 마스터에서 만든 엔진의 연결을 자식이 공유하지 않도록 풀을 비움
+    from app.database import dispose_engine
+    dispose_engine()
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _watch_memory(worker):
+    while True:
+        time.sleep(10)
+        rss = _rss_mb()
+        if rss > worker_max_memory_mb:
+            worker.log.info(f"워커 {worker.pid} 메모리 {rss:.0f}MB > {worker_max_memory_mb}MB, 교체합니다.")
+            # UvicornWorker는 SIGTERM을 받으면 진행 중인 요청을 마치고 종료, 마스터가 새 워커를 띄움
+            os.kill(worker.pid, signal.SIGTERM)
+            return
+
+
+def post_worker_init(worker):
+    if worker_max_memory_mb > 0:
+        threading.Thread(target=_watch_memory, args=(worker,), name="memory-watchdog", daemon=True).start()
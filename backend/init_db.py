@@ -25,8 +25,9 @@ def init_database():
             
         print(f"📡 데이터베이스 연결 중: {database_url[:50]}...")
         
-        # SQLAlchemy 엔진 생성
-        engine = create_engine(database_url)
+        # SQLAlchemy 엔진 생성 (연결이 멈추면 부팅이 막히지 않도록 연결 제한 시간 설정, start.py가 전체 시간도 제한)
+        connect_args = {"connect_timeout": 10} if database_url.startswith("postgres") else {}
+        engine = create_engine(database_url, connect_args=connect_args)
         
         # 연결 테스트
         with engine.connect() as conn:
@@ -42,6 +43,45 @@ def init_database():
         Base.metadata.create_all(bind=engine)
         print("✅ 모든 테이블 생성 완료")
         
+        # 학습 기록 upsert용 유니크 인덱스 (기존 중복 행 정리 포함)
+        from app.progress import create_progress_indexes, migrate_legacy_quiz_progress
+        create_progress_indexes(engine)
+        
+        # 기존 '__quiz__' 진행 행을 퀴즈 응시 기록/집계 테이블로 이전
+        migrated = migrate_legacy_quiz_progress(engine)
+        if migrated:
+            print(f"✅ 퀴즈 기록 {migrated}건 이전 완료")
+        
+        # 통계 JSON에 있던 성취 목록을 성취 테이블로 이전
+        from app.achievements import migrate_legacy_achievements
+        migrated = migrate_legacy_achievements(engine)
+        if migrated:
+            print(f"✅ 성취 {migrated}건 이전 완료")
+        
+        # 학습 달력이 비어 있으면 기존 학습 기록으로 채움 (최초 배포 시 한 번)
+        from app.activity_calendar import backfill_activity_calendars
+        with engine.connect() as conn:
+            has_calendars = conn.execute(text("SELECT 1 FROM activity_calendars LIMIT 1")).first()
+        if not has_calendars:
+            filled = backfill_activity_calendars(engine)
+            if filled:
+                print(f"✅ 학습 달력 {filled}개 생성 완료")
+        
+        # 일별 활동 집계의 지난 날짜 확정 (최초 배포 시 로그 전체 기간, 이후에는 밀린 날짜만)
+        from app.rollups import backfill_rollups
+        finalized = backfill_rollups(engine)
+        if finalized:
+            print(f"✅ 일별 집계 {finalized}일 확정 완료")
+        
+        # 증분 백업용 backup_history 컬럼과 created_at 인덱스 추가
+        from app.backup import migrate_backup_history
+        migrate_backup_history(engine)
+        
+        # 전문 검색 인덱스 생성 (PostgreSQL 전용)
+        from app.search import create_search_indexes
+        create_search_indexes(engine)
+        print("✅ 검색 인덱스 확인 완료")
+        
         # 세션 생성
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         db = SessionLocal()
@@ -81,6 +121,12 @@ def init_database():
             db.commit()
             print("✅ 데이터베이스 초기화 완료")
             
+            # 스키마 버전 기록 (버전이 같으면 다음 부팅부터 초기화를 건너뜀)
+            from app.schema_version import SCHEMA_VERSION, write_schema_version
+            with engine.begin() as conn:
+                write_schema_version(conn, SCHEMA_VERSION)
+            print(f"✅ 스키마 버전 {SCHEMA_VERSION} 기록")
+            
             # 테이블 현황 출력
             user_count = db.query(User).count()
             log_count = db.query(ActivityLog).count()
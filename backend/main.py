@@ -3,8 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from datetime import datetime
 import os
+import time
 
-from app.api import ai_info, quiz, prompt, base_content, term, auth, logs, system, user_progress
+from app.compression import CompressionMiddleware
+from app.health import router as health_router
+from app.background import start_background_jobs, stop_background_jobs
+from app.routers import RouterRegistry
 
 app = FastAPI()
 
@@ -18,22 +22,31 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# 헬스체크 엔드포인트
+# gzip/brotli 응답 압축 (app/compression.py)
+app.add_middleware(CompressionMiddleware)
+
+@app.on_event("startup")
+def on_startup():
+    # 일별 집계 갱신(ROLLUP_SCHEDULER=0 이면 비활성화), 자동 백업(AUTO_BACKUP=1 일 때만)
+    # 무거운 모듈은 별도 스레드에서 import하므로 부팅을 늦추지 않음 (app/background.py)
+    start_background_jobs()
+    
+    # start.py에서 시작한 경우 전체 부팅 시간 출력
+    boot_started_at = os.getenv("BOOT_STARTED_AT")
+    if boot_started_at:
+        print(f"⏱️ 앱 시작 완료 (부팅 후 {time.time() - float(boot_started_at):.2f}s)")
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_background_jobs()
+
+# 헬스체크 엔드포인트 (/health/live, /health/ready, /health → app/health.py)
+app.include_router(health_router)
+
 @app.get("/")
 async def root():
     return {"message": "AI Mastery Hub Backend is running", "status": "healthy", "version": "1.0.0"}
 
-@app.get("/health")
-async def health_check():
-    try:
-        from app.database import engine
-        # 데이터베이스 연결 테스트
-        with engine.connect() as conn:
-            result = conn.execute("SELECT 1")
-        return {"status": "healthy", "database": "connected", "timestamp": "2024-01-01T00:00:00Z"}
-    except Exception as e:
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e), "timestamp": "2024-01-01T00:00:00Z"}
-
 @app.get("/debug/routes")
 async def debug_routes():
     """등록된 모든 라우트를 확인하는 디버깅 엔드포인트"""
@@ -83,12 +96,16 @@ async def not_found_handler(request: Request, exc: HTTPException):
         content={"error": "Not found", "path": str(request.url)}
     )
 
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(logs.router, prefix="/api/logs", tags=["Activity Logs"])
-app.include_router(system.router, prefix="/api/system", tags=["System Management"])
-app.include_router(user_progress.router, prefix="/api/user-progress", tags=["User Progress"])
-app.include_router(ai_info.router, prefix="/api/ai-info")
-app.include_router(quiz.router, prefix="/api/quiz")
-app.include_router(prompt.router, prefix="/api/prompt")
-app.include_router(base_content.router, prefix="/api/base-content")
-app.include_router(term.router, prefix="/api/term")
+# 라우터는 첫 요청 시 import (LAZY_ROUTERS=0 이면 즉시 등록, app/routers.py 참고)
+routers = RouterRegistry(app, [
+    ("app.api.auth", "/api/auth", ["Authentication"]),
+    ("app.api.logs", "/api/logs", ["Activity Logs"]),
+    ("app.api.system", "/api/system", ["System Management"]),
+    ("app.api.user_progress", "/api/user-progress", ["User Progress"]),
+    ("app.api.ai_info", "/api/ai-info", None),
+    ("app.api.quiz", "/api/quiz", None),
+    ("app.api.prompt", "/api/prompt", None),
+    ("app.api.base_content", "/api/base-content", None),
+    ("app.api.term", "/api/term", None),
+    ("app.api.search", "/api/search", ["Search"]),
+])
@@ -1,41 +1,94 @@
 #!/usr/bin/env python3
 """
 Railway 배포를 위한 시작 스크립트
-데이터베이스 초기화를 확실히 하고 서버를 시작합니다.
+DB의 스키마 버전이 코드와 같으면 초기화를 건너뛰고, 다를 때만 init_db를 실행한 뒤 서버를 시작합니다.
+FORCE_DB_INIT=1 이면 버전과 관계없이 초기화합니다. 초기화가 DB_INIT_TIMEOUT초(기본 120초) 안에 끝나지 않으면
+기다리지 않고 서버를 시작합니다. (서버 프로세스로 바뀌면서 초기화 연결이 끊기므로 진행 중인 트랜잭션은 롤백됨)
+
+SERVER_MODE=workers (ENVIRONMENT=production이면 기본값)는 gunicorn + uvicorn 워커 여러 개로 실행합니다.
+워커 수/교체 주기/DB 풀 크기는 gunicorn.conf.py를 참고하세요. SERVER_MODE=single은 uvicorn 단일 프로세스입니다.
 """
 
 import os
 import sys
-import subprocess
+import threading
 import time
+from contextlib import contextmanager
+
+BOOT_STARTED_AT = time.time()
+DB_INIT_TIMEOUT = float(os.getenv("DB_INIT_TIMEOUT", "120"))
+
+# 부팅 단계별 소요 시간 (단계 이름, 초)
+boot_phases = []
 
-def run_database_init():
-    """데이터베이스 초기화 실행"""
+@contextmanager
+def boot_phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        boot_phases.append((name, elapsed))
+        print(f"⏱️ {name}: {elapsed * 1000:.0f}ms")
+
+def print_boot_summary():
+    total = time.time() - BOOT_STARTED_AT
+    print("⏱️ 부팅 단계별 시간:")
+    for name, elapsed in boot_phases:
+        print(f"   - {name}: {elapsed * 1000:.0f}ms")
+    print(f"   = 서버 실행 전까지 {total * 1000:.0f}ms")
+
+def schema_is_current():
+    """schema_version 행 하나를 읽어 코드의 SCHEMA_VERSION과 비교합니다."""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        return False
+    try:
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+        from app.schema_version import SCHEMA_VERSION, is_schema_current
+        
+        connect_args = {"connect_timeout": 10} if database_url.startswith("postgres") else {}
+        engine = create_engine(database_url, poolclass=NullPool, connect_args=connect_args)
+        try:
+            current = is_schema_current(engine)
+        finally:
+            engine.dispose()
+        print(f"🔢 스키마 버전 {'일치' if current else '불일치'} (코드: {SCHEMA_VERSION})")
+        return current
+    except Exception as e:
+        print(f"⚠️ 스키마 버전 확인 실패: {e}")
+        return False
+
+def _init_database():
     try:
         print("🗄️ 데이터베이스 초기화 시작...")
-        result = subprocess.run(
-            [sys.executable, "init_db.py"], 
-            capture_output=True, 
-            text=True, 
-            timeout=120  # 2분 타임아웃
-        )
+        from init_db import init_database
         
-        if result.returncode == 0:
+        if init_database():
             print("✅ 데이터베이스 초기화 성공")
-            print(result.stdout)
             return True
-        else:
-            print("⚠️ 데이터베이스 초기화 실패 (서버는 계속 시작)")
-            print(f"오류: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print("⏰ 데이터베이스 초기화 타임아웃 (서버는 계속 시작)")
+        print("⚠️ 데이터베이스 초기화 실패 (서버는 계속 시작)")
         return False
+    
     except Exception as e:
         print(f"⚠️ 데이터베이스 초기화 오류: {e} (서버는 계속 시작)")
         return False
 
+def run_database_init(timeout=DB_INIT_TIMEOUT):
+    """
+    데이터베이스 초기화 실행 (같은 프로세스의 스레드에서 init_db 실행, 최대 timeout초 대기)
+    성공하면 True, 실패하면 False, 시간 안에 끝나지 않으면 None을 반환합니다.
+    """
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(ok=_init_database()), name="db-init", daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        print(f"⚠️ 데이터베이스 초기화가 {timeout:g}초 안에 끝나지 않았습니다. (서버는 계속 시작)")
+        return None
+    return result.get("ok", False)
+
 def create_tables_directly():
     """SQLAlchemy를 사용해 직접 테이블 생성 시도"""
     try:
@@ -57,18 +110,44 @@ def main():
     print(f"🐍 Python 경로: {sys.executable}")
     print(f"🌍 환경변수 DATABASE_URL: {'설정됨' if os.getenv('DATABASE_URL') else '설정되지 않음'}")
     
-    # 데이터베이스 초기화 시도 1: init_db.py 스크립트 실행
-    if not run_database_init():
-        print("🔄 대체 방법으로 테이블 생성 시도...")
-        # 데이터베이스 초기화 시도 2: 직접 테이블 생성
-        create_tables_directly()
+    with boot_phase("스키마 버전 확인"):
+        current = os.getenv("FORCE_DB_INIT") != "1" and schema_is_current()
+    
+    if current:
+        print("⏭️ 스키마가 최신입니다. 데이터베이스 초기화를 건너뜁니다.")
+    else:
+        with boot_phase("데이터베이스 초기화"):
+            initialized = run_database_init()
+        # 시간 초과면 DB가 응답하지 않는 것이므로 직접 생성도 시도하지 않음
+        if initialized is False:
+            print("🔄 대체 방법으로 테이블 생성 시도...")
+            with boot_phase("직접 테이블 생성"):
+                create_tables_directly()
     
     # 환경변수에서 포트 가져오기 (Railway는 PORT 환경변수 사용)
     port = os.getenv("PORT", "8000")
     host = "0.0.0.0"
     
+    print_boot_summary()
     print(f"🌐 서버 시작: {host}:{port}")
     
+    # 앱 시작 이벤트에서 전체 부팅 시간을 출력할 수 있도록 시작 시각 전달
+    os.environ["BOOT_STARTED_AT"] = str(BOOT_STARTED_AT)
+    
+    # 운영 모드: gunicorn이 uvicorn 워커 여러 개를 관리 (gunicorn이 없으면 단일 프로세스로 실행)
+    default_mode = "workers" if os.getenv("ENVIRONMENT") == "production" else "single"
+    if os.getenv("SERVER_MODE", default_mode) == "workers":
+        try:
+            import gunicorn  # noqa: F401
+            print("👥 멀티 워커 모드 (gunicorn.conf.py)")
+            os.execvp(sys.executable, [
+                sys.executable, "-m", "gunicorn",
+                "app.main:app",
+                "--config", "gunicorn.conf.py"
+            ])
+        except ImportError:
+            print("⚠️ gunicorn이 설치되어 있지 않아 단일 프로세스로 실행합니다.")
+    
     # Railway 환경에서는 reload 비활성화
     reload_option = "--reload" if os.getenv("ENVIRONMENT") == "development" else "--no-reload"
     
@@ -100,4 +179,4 @@ def main():
             sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()